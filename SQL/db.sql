@@ -2,6 +2,7 @@
 CREATE TABLE users (
     id INT PRIMARY KEY,
     username VARCHAR(50) NOT NULL UNIQUE,
+    -- Stored case-folded by the app, so UNIQUE also ignores the case
     email VARCHAR(100) NOT NULL UNIQUE,
     password VARCHAR(255) NOT NULL,
     first_name VARCHAR(50),
@@ -72,6 +73,27 @@ CREATE TABLE reviews (
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+-- Indexes for the foreign keys used to filter reviews, cities and places
+CREATE INDEX ix_cities_country_code ON cities (country_code);
+CREATE INDEX ix_places_city_id ON places (city_id);
+CREATE INDEX ix_places_user_id ON places (user_id);
+CREATE INDEX ix_reviews_place_id ON reviews (place_id);
+CREATE INDEX ix_reviews_user_id ON reviews (user_id);
+
+-- Indexes for the keyset pagination of the lists, in (created_at, id) order
+CREATE INDEX ix_user_created_at_id ON users (created_at, id);
+CREATE INDEX ix_city_created_at_id ON cities (created_at, id);
+CREATE INDEX ix_place_created_at_id ON places (created_at, id);
+CREATE INDEX ix_amenity_created_at_id ON amenities (created_at, id);
+CREATE INDEX ix_review_created_at_id ON reviews (created_at, id);
+
+-- Version of each model, incremented by the transactions writing to it,
+-- which the ETags of the lists are derived from
+CREATE TABLE collection_versions (
+    model VARCHAR(32) PRIMARY KEY,
+    version INT NOT NULL
+);
+
 -- Insert initial data into Users table
 INSERT INTO users (id, username, email, password, first_name, last_name)
 VALUES (1, 'johndoe', 'john@example.com', 'hashedpassword', 'John', 'Doe');
@@ -0,0 +1,5 @@
+""" Micro benchmarks for the persistence layer.
+
+Run them from the project root, for example:
+    python -m benchmarks.memory_store
+"""
@@ -0,0 +1,50 @@
+""" Import time of amenities saved one by one and with save_many.
+
+For the file and pickle repositories, times ITEMS saves, each persisted
+on its own, against one save_many of the same number of amenities.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.models.amenity import Amenity
+from src.persistence.file import DataManager
+from src.persistence.pickled import PickleRepository
+
+ITEMS = 2_000
+
+
+def open_repos(directory: str) -> dict:
+    """A new repository of each kind in directory"""
+    return {
+        "file": DataManager(filename=os.path.join(directory, "data.jsonl")),
+        "pickle": PickleRepository(os.path.join(directory, "data.pkl")),
+    }
+
+
+def timed(write) -> float:
+    """Seconds taken by write"""
+    start = time.perf_counter()
+    write()
+    return time.perf_counter() - start
+
+
+def main(items: int = ITEMS) -> None:
+    """Print the import time of both paths for each repository"""
+    print("repository      one by one    save_many")
+    with tempfile.TemporaryDirectory() as single, \
+            tempfile.TemporaryDirectory() as bulk:
+        for (name, repo), many in zip(
+            open_repos(single).items(), open_repos(bulk).values()
+        ):
+            amenities = [Amenity(f"amenity {i}") for i in range(items)]
+            one_by_one = timed(lambda: [repo.save(a) for a in amenities])
+            amenities = [Amenity(f"amenity {i}") for i in range(items)]
+            batched = timed(lambda: many.save_many(amenities))
+            print(f"{name:10} {one_by_one:14.3f}s {batched:11.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ITEMS)
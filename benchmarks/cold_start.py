@@ -0,0 +1,62 @@
+""" Cold start of the file repository holding 100k users.
+
+Writes a snapshot of users sharing one bcrypt hash, then times a new
+repository loading it through from_record, and the constructor path the
+file repository used to take on a sample of the users, extrapolated to
+all of them: User.__init__ hashes the stored hash again.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.models.user import User
+from src.persistence.file import DataManager
+
+USERS = 100_000
+SAMPLE = 20
+
+
+def write_snapshot(filename: str, count: int) -> list:
+    """Write a snapshot of count users and return their records"""
+    password = User("a@example.com", "A", "B", "secret").password
+    now = datetime.now().isoformat()
+    records = [
+        {"id": f"{i:036}", "email": f"user{i}@example.com",
+         "first_name": "First", "last_name": "Last", "password": password,
+         "is_admin": False, "created_at": now, "updated_at": now}
+        for i in range(count)
+    ]
+    with open(filename, "w") as file:
+        for record in records:
+            file.write(json.dumps({"model": "user", "data": record}) + "\n")
+    return records
+
+
+def main(count: int = USERS) -> None:
+    """Print the cold start time of both paths"""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "data.jsonl")
+        records = write_snapshot(filename, count)
+
+        start = time.perf_counter()
+        repo = DataManager(filename=filename)
+        hydrated = time.perf_counter() - start
+        assert repo.count("user") == count
+
+    start = time.perf_counter()
+    for record in records[:SAMPLE]:
+        User(record["email"], record["first_name"], record["last_name"],
+             record["password"], id=record["id"])
+    constructed = (time.perf_counter() - start) / SAMPLE * count
+
+    print(f"from_record:  {hydrated:10.2f}s for {count} users")
+    print(f"constructors: {constructed:10.2f}s for {count} users "
+          f"(extrapolated from {SAMPLE})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else USERS)
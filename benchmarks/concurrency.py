@@ -0,0 +1,119 @@
+""" Multi-threaded stress benchmark of the ModelStore and its locks.
+
+Runs 1 to 16 reader threads against a store holding 100k reviews while a
+writer thread keeps adding, moving and removing reviews, and prints the
+read throughput for each thread count.
+
+Under the GIL the in-memory reads are CPU bound and can't run in
+parallel, so their throughput is bounded by one core (more threads only
+win a bigger share of it from the writer); it scales on free-threaded
+builds. The second table holds the read lock across a 1 ms wait, the
+way a request waiting on I/O would, and compares RWLock with a plain
+mutex: readers sharing the lock scale with the threads, a mutex doesn't.
+"""
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from src.persistence.locks import RWLock
+from src.persistence.store import ModelStore
+
+REVIEWS = 100_000
+PLACES = 1_000
+DURATION = 1.0
+THREADS = (1, 2, 4, 8, 16)
+
+
+class Review:
+    """Minimal review indexed by place_id and user_id"""
+
+    def __init__(self, id: str, place_id: str) -> None:
+        """Initialize a review of a place"""
+        self.id = id
+        self.place_id = place_id
+        self.user_id = "u"
+
+
+def run(threads: int, read, write=None) -> float:
+    """Reads per second of threads readers calling read for DURATION"""
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def reader(n: int) -> None:
+        """Call read until stopped"""
+        while not stop.is_set():
+            read(n)
+            counts[n] += 1
+
+    def writer() -> None:
+        """Call write until stopped"""
+        i = 0
+        while not stop.is_set():
+            write(i)
+            i += 1
+
+    workers = [threading.Thread(target=reader, args=(n,))
+               for n in range(threads)]
+    if write:
+        workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    time.sleep(DURATION)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    return sum(counts) / DURATION
+
+
+def main(size: int = REVIEWS) -> None:
+    """Print the read throughput for each number of threads"""
+    store = ModelStore()
+    for i in range(size):
+        store.add(Review(str(i), f"p{i % PLACES}"))
+
+    def read(n: int) -> None:
+        """Look up the reviews of a place and a page of reviews"""
+        store.lookup("review", place_id=f"p{n % PLACES}")
+        store.page_after("review", 20)
+
+    def write(i: int) -> None:
+        """Add, move and remove a review"""
+        review = Review(f"w{i}", "p1")
+        store.add(review)
+        review.place_id = "p2"
+        store.replace(review)
+        store.remove(review)
+
+    print("in-memory reads with a concurrent writer")
+    for threads in THREADS:
+        print(f"{threads:3} threads: {run(threads, read, write):12.0f}/s")
+
+    rwlock, mutex = RWLock(), threading.Lock()
+
+    @contextmanager
+    def exclusive():
+        """Hold the mutex like a reader would hold the read lock"""
+        with mutex:
+            yield
+
+    def slow_read(lock):
+        """Read holding lock while waiting on I/O"""
+        def read(n: int) -> None:
+            """Wait 1 ms under the lock"""
+            with lock():
+                time.sleep(0.001)
+        return read
+
+    print("reads holding the lock across 1 ms of I/O")
+    print("            RWLock        mutex")
+    for threads in THREADS:
+        shared = run(threads, slow_read(rwlock.read))
+        serialized = run(threads, slow_read(exclusive))
+        print(f"{threads:3} threads: {shared:8.0f}/s {serialized:8.0f}/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REVIEWS)
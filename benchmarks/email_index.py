@@ -0,0 +1,109 @@
+""" Latency of finding a user by email, as signup and login do.
+
+Stores USERS users, built with User.from_record so that no password is
+hashed, in a ModelStore and in a SQLite database, and prints the p50 and
+p99 of get_unique / DBRepository.get_by_email against the scan of every
+user that User.create used to do (fewer of those, they are slow).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from flask import Flask
+
+from src import db
+from src.config import TestingConfig
+from src.models.user import User
+from src.persistence.db import DBRepository
+from src.persistence.store import ModelStore
+
+USERS = 1_000_000
+LOOKUPS = 2_000
+SCANS = 5
+
+
+def users(count: int) -> list:
+    """count users with distinct emails"""
+    return [
+        User.from_record({
+            "id": f"{i:08d}",
+            "email": f"User{i}@Example.com",
+            "password": "hash",
+            "first_name": "First",
+            "last_name": "Last",
+            "is_admin": False,
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+        })
+        for i in range(count)
+    ]
+
+
+def percentiles(find, emails: list) -> str:
+    """p50 and p99 of find over emails"""
+    times = []
+    for email in emails:
+        before = time.perf_counter()
+        find(email)
+        times.append(time.perf_counter() - before)
+    times.sort()
+    p50 = times[len(times) // 2] * 1e6
+    p99 = times[len(times) * 99 // 100] * 1e6
+    return f"{p50:12.1f}us {p99:12.1f}us"
+
+
+def main(count: int = USERS) -> None:
+    """Print the lookup latency of each path"""
+    rng = random.Random(0)
+    emails = [f"user{rng.randrange(count)}@example.com"
+              for _ in range(LOOKUPS)]
+    objs = users(count)
+
+    store = ModelStore()
+    for user in objs:
+        store.add(user)
+
+    def scan(email: str):
+        """What User.create did: compare every stored user"""
+        return next(
+            (u for u in store.all("user") if u.email.lower() == email), None
+        )
+
+    print("path                        p50             p99")
+    print(f"{'store scan':18}", percentiles(scan, emails[:SCANS]))
+    print(f"{'store email index':18}", percentiles(
+        lambda email: store.get_unique("user", "email", email), emails
+    ))
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config.from_object(TestingConfig)
+        app.config["SQLALCHEMY_DATABASE_URI"] = (
+            f"sqlite:///{os.path.join(directory, 'users.db')}"
+        )
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.bulk_insert_mappings(
+                User, [user.to_record() | {
+                    "created_at": user.created_at,
+                    "updated_at": user.updated_at,
+                } for user in objs]
+            )
+            db.session.commit()
+            repo = DBRepository()
+
+            def lookup(email: str):
+                """get_by_email in its own session, like a request"""
+                user = repo.get_by_email(email)
+                db.session.remove()
+                return user
+
+            print(f"{'sqlite email index':18}", percentiles(lookup, emails))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else USERS)
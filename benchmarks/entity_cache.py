@@ -0,0 +1,84 @@
+""" Latency of reads by id through the entity cache, against the database.
+
+Stores OBJECTS amenities in a SQLite file and reads READS of them by id,
+most of them from a hot set like the detail pages of popular places, with
+the session ended every READS_PER_REQUEST reads as a request would. Prints
+the p50 and p99 of DBRepository.get alone and behind CachedRepository, and
+the cache metrics.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from flask import Flask
+
+from src import db
+from src.config import TestingConfig
+from src.models.amenity import Amenity
+from src.persistence.cache import CachedRepository
+from src.persistence.db import DBRepository
+
+OBJECTS = 20_000
+READS = 20_000
+READS_PER_REQUEST = 10
+HOT = 0.05
+HOT_READS = 0.9
+CACHE_SIZE = 2_000
+
+
+def workload(ids: list, reads: int) -> list:
+    """Ids to read, HOT_READS of them among the first HOT of ids"""
+    rng = random.Random(0)
+    hot = ids[: max(1, int(len(ids) * HOT))]
+    return [
+        rng.choice(hot) if rng.random() < HOT_READS else rng.choice(ids)
+        for _ in range(reads)
+    ]
+
+
+def latencies(repo, keys: list) -> list:
+    """Sorted seconds taken by each read of keys"""
+    times = []
+    for i, key in enumerate(keys):
+        before = time.perf_counter()
+        repo.get("amenity", key)
+        times.append(time.perf_counter() - before)
+        if i % READS_PER_REQUEST == READS_PER_REQUEST - 1:
+            db.session.remove()
+    return sorted(times)
+
+
+def main(objects: int = OBJECTS, reads: int = READS) -> None:
+    """Print the read latency with and without the cache"""
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config.from_object(TestingConfig)
+        app.config["SQLALCHEMY_DATABASE_URI"] = (
+            f"sqlite:///{os.path.join(directory, 'cache.db')}"
+        )
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            backend = DBRepository()
+            amenities = [Amenity(f"amenity {i}") for i in range(objects)]
+            backend.save_many(amenities)
+            ids = [amenity.id for amenity in amenities]
+            db.session.remove()
+
+            keys = workload(ids, reads)
+            cached = CachedRepository(backend, CACHE_SIZE)
+            print("repository            p50        p99")
+            for name, repo in (("DBRepository", backend),
+                               ("CachedRepository", cached)):
+                times = latencies(repo, keys)
+                p50 = times[len(times) // 2] * 1e6
+                p99 = times[len(times) * 99 // 100] * 1e6
+                print(f"{name:16} {p50:8.0f}us {p99:8.0f}us")
+            print(cached.metrics)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
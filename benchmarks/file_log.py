@@ -0,0 +1,67 @@
+""" Writes per second of the file repository, logged against rewritten.
+
+For stores of growing size, times amenity inserts followed by a rewrite
+of the whole file, which is what every write used to cost, and the same
+inserts appended to the write-ahead log, with the compactions they
+trigger running in the background, and the compaction metrics.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.models.amenity import Amenity
+from src.persistence.file import DataManager
+
+SIZES = (1_000, 10_000, 100_000)
+WRITES = 50_000
+
+
+def open_repo(directory: str, size: int) -> DataManager:
+    """Repository in directory holding size amenities"""
+    repo = DataManager(filename=os.path.join(directory, f"{size}.jsonl"))
+    for i in range(size):
+        repo.save(Amenity(f"amenity {i}"), save_to_file=False)
+    repo._save_to_file()
+    return repo
+
+
+def writes_per_second(write, count: int) -> float:
+    """Rate of count calls to write"""
+    start = time.perf_counter()
+    for i in range(count):
+        write(i)
+    return count / (time.perf_counter() - start)
+
+
+def main(sizes: tuple = SIZES) -> None:
+    """Print the write rate of both paths for each store size"""
+    print("   objects  rewritten/s     logged/s  compactions"
+          "  reclaimed  duration")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            repo = open_repo(directory, size)
+
+            def rewrite(i: int) -> None:
+                """Insert and rewrite the whole file"""
+                repo.save(Amenity(f"rewritten {i}"), save_to_file=False)
+                repo._save_to_file()
+
+            # Rewrites are slow on big stores, fewer are enough
+            rewritten = writes_per_second(rewrite, max(10, WRITES // size))
+
+            logged = writes_per_second(
+                lambda i: repo.save(Amenity(f"logged {i}")), WRITES
+            )
+
+            repo.flush()
+            metrics = repo.compaction_metrics
+            print(f"{size:10} {rewritten:12.1f} {logged:12.0f}"
+                  f" {metrics['compactions']:12}"
+                  f" {metrics['bytes_reclaimed'] / 2**20:9.1f}MiB"
+                  f" {metrics['last_duration'] * 1000:8.0f}ms")
+
+
+if __name__ == "__main__":
+    main(tuple(map(int, sys.argv[1:])) or SIZES)
@@ -0,0 +1,75 @@
+""" Benchmark of the GeoIndex used by GET /places/search.
+
+Indexes 1M places clustered around 500 cities and measures radius,
+bounding box and k-nearest-neighbour queries, checking a sample of them
+against a brute-force haversine scan.
+"""
+
+import random
+import sys
+import time
+
+from src.persistence.geo import GeoIndex, haversine_km
+
+PLACES = 1_000_000
+CITIES = 500
+QUERIES = 1_000
+
+
+def build(size: int, rng: random.Random) -> tuple[GeoIndex, dict]:
+    """Index size random places around random city centers"""
+    centers = [
+        (rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(CITIES)
+    ]
+    points = {}
+    index = GeoIndex()
+    for i in range(size):
+        lat, lng = rng.choice(centers)
+        lat = max(-90.0, min(90.0, rng.gauss(lat, 0.3)))
+        lng = (rng.gauss(lng, 0.3) + 180) % 360 - 180
+        points[str(i)] = (lat, lng)
+        index.add(str(i), lat, lng)
+    return index, points
+
+
+def timed(func, args: list) -> float:
+    """Average latency of func over args, in microseconds"""
+    start = time.perf_counter()
+    for arg in args:
+        func(*arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def main(size: int = PLACES) -> None:
+    """Print the latency of each query type"""
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    index, points = build(size, rng)
+    print(f"indexed {size} places in {time.perf_counter() - start:.1f}s")
+
+    centers = [points[str(rng.randrange(size))] for _ in range(QUERIES)]
+
+    radius = [(lat, lng, 2.0) for lat, lng in centers]
+    bbox = [(lat - 0.02, lng - 0.02, lat + 0.02, lng + 0.02)
+            for lat, lng in centers]
+    nearest = [(lat, lng, 10) for lat, lng in centers]
+
+    print(f"radius 2km: {timed(index.within_radius, radius):8.1f}us")
+    print(f"bbox:       {timed(index.within_bbox, bbox):8.1f}us")
+    print(f"10-nearest: {timed(index.nearest, nearest):8.1f}us")
+
+    start = time.perf_counter()
+    for lat, lng, km in radius[:5]:
+        expected = sorted(
+            (haversine_km(lat, lng, plat, plng), key)
+            for key, (plat, plng) in points.items()
+            if haversine_km(lat, lng, plat, plng) <= km
+        )
+        assert index.within_radius(lat, lng, km) == expected
+    brute = (time.perf_counter() - start) / 5 * 1e6
+    print(f"brute force radius 2km: {brute:8.1f}us (results match)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PLACES)
@@ -0,0 +1,78 @@
+""" Write latency of the file and pickle repositories per durability
+setting.
+
+Every setting runs in its own process, configured through GROUP_COMMIT
+and FSYNC like the application. It saves 1000 amenities into a store
+already holding 5000 and prints the latency seen by the caller (p50,
+p99) and the time until everything is on disk, flush() included.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SETTINGS = (
+    ("false", "os"),
+    ("false", "always"),
+    ("true", "os"),
+    ("true", "batch"),
+    ("true", "always"),
+)
+STORED = 5_000
+WRITES = 1_000
+
+
+def run(repository: str, directory: str) -> None:
+    """Time the writes in this process, as configured by the environment"""
+    from src.models.amenity import Amenity
+
+    if repository == "file":
+        from src.persistence.file import DataManager
+        repo = DataManager(filename=os.path.join(directory, "data.jsonl"))
+    else:
+        from src.persistence.pickled import PickleRepository
+        repo = PickleRepository(os.path.join(directory, "data.pkl"))
+
+    for i in range(STORED):
+        repo.save(Amenity(f"stored {i}"), save_to_file=False)
+    repo.flush()
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(WRITES):
+        amenity = Amenity(f"amenity {i}")
+        before = time.perf_counter()
+        repo.save(amenity)
+        latencies.append(time.perf_counter() - before)
+    repo.flush()
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[len(latencies) * 99 // 100] * 1e6
+    print(f"{p50:10.0f}us {p99:10.0f}us {total:8.2f}s")
+
+
+def main() -> None:
+    """Run every setting in a new process"""
+    print("repository group fsync        p50        p99    total")
+    for repository in ("file", "pickle"):
+        for group, fsync in SETTINGS:
+            with tempfile.TemporaryDirectory() as directory:
+                env = dict(os.environ, GROUP_COMMIT=group, FSYNC=fsync)
+                result = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.group_commit",
+                     repository, directory],
+                    env=env, capture_output=True, text=True, check=True,
+                )
+            line = result.stdout.strip().splitlines()[-1]
+            print(f"{repository:10} {group:5} {fsync:6} {line}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(*sys.argv[1:])
+    else:
+        main()
@@ -0,0 +1,97 @@
+""" Serialization of a list endpoint's body: PLACES places to JSON.
+
+Builds PLACES places in memory and times, best of ROUNDS, the body of a
+list response as Flask's default provider writes it from to_dict, with
+the compact separators it uses for responses, and as ModelJSONProvider
+writes it from the places themselves, with orjson when it is installed
+and with the standard json module.
+"""
+
+import gc
+import sys
+import time
+from unittest import mock
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src import json_provider
+from src.json_provider import ModelJSONProvider
+from src.models.place import Place
+from src.persistence.ratings import rating_aggregates
+
+PLACES = 10_000
+ROUNDS = 5
+
+
+def make_places(count: int) -> list:
+    """count places with the fields of a real listing"""
+    return [
+        Place({
+            "name": f"Place {i}",
+            "description": "A quiet apartment close to the beach " * 3,
+            "address": f"{i} Rambla República de México",
+            "city_id": f"city-{i % 50}",
+            "user_id": f"user-{i % 500}",
+            "latitude": -34.9 + i * 1e-5,
+            "longitude": -56.1 - i * 1e-5,
+            "price_per_night": 40 + i % 200,
+            "number_of_rooms": 1 + i % 4,
+            "number_of_bathrooms": 1 + i % 2,
+            "max_guests": 2 + i % 6,
+        })
+        for i in range(count)
+    ]
+
+
+def best(encode, places: list) -> tuple[float, int]:
+    """Best seconds taken by encode(places) and the size of its body"""
+    times = []
+    gc.disable()
+    try:
+        for _ in range(ROUNDS):
+            before = time.perf_counter()
+            body = encode(places)
+            times.append(time.perf_counter() - before)
+    finally:
+        gc.enable()
+    return min(times), len(body)
+
+
+def main(places: int = PLACES) -> None:
+    """Print the time to serialize places with each provider"""
+    app = Flask(__name__)
+    default, provider = DefaultJSONProvider(app), ModelJSONProvider(app)
+
+    with app.app_context():
+        objs = make_places(places)
+        rating_aggregates()
+
+        results = [
+            ("default, to_dict", best(
+                lambda objs: default.dumps(
+                    [p.to_dict() for p in objs], separators=(",", ":")
+                ),
+                objs,
+            )),
+            ("provider, json", None),
+            ("provider, orjson", None),
+        ]
+        with mock.patch.object(json_provider, "orjson", None):
+            results[1] = ("provider, json", best(provider.dumps, objs))
+        if json_provider.orjson is not None:
+            results[2] = ("provider, orjson", best(provider.dumps, objs))
+        else:
+            results.pop()
+
+    baseline = results[0][1][0]
+    print(f"{places} places        time      bytes  speedup")
+    for name, (seconds, size) in results:
+        print(
+            f"{name:18} {seconds * 1e3:7.1f}ms {size:10} "
+            f"{baseline / seconds:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+""" Benchmark of the id-keyed ModelStore used by MemoryRepository.
+
+Fills the store with 1k to 1M places and measures the average latency of
+get, update, delete and save. With the store keyed by id the latency must
+stay flat while the table grows.
+"""
+
+import random
+import sys
+import time
+from uuid import uuid4
+
+from src.persistence.store import ModelStore
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+OPERATIONS = 10_000
+
+
+class Place:
+    """Lightweight stand-in for the Place model"""
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, name: str) -> None:
+        """Create a place with a random id"""
+        self.id = str(uuid4())
+        self.name = name
+
+
+def timed(func, args: list) -> float:
+    """Average latency of func over args, in microseconds"""
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def run(size: int) -> dict:
+    """Benchmark every operation on a store holding size places"""
+    store = ModelStore()
+    places = [Place(f"place {i}") for i in range(size)]
+    for place in places:
+        store.add(place)
+
+    sample = random.sample(places, min(OPERATIONS, size))
+
+    return {
+        "get": timed(lambda p: store.get("place", p.id), sample),
+        "update": timed(store.replace, sample),
+        "delete": timed(store.remove, sample),
+        "save": timed(store.add, sample),
+    }
+
+
+def main(sizes=SIZES) -> None:
+    """Print the latency table"""
+    print(f"{'rows':>10} {'get':>8} {'update':>8} {'delete':>8} {'save':>8}")
+    for size in sizes:
+        result = run(size)
+        print(f"{size:>10} " + " ".join(
+            f"{result[op]:>6.2f}us"
+            for op in ("get", "update", "delete", "save")
+        ))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,63 @@
+""" Bytes written per change by the pickle repository, whole file against
+shards.
+
+Fills a store with reviews and a few amenities, then updates amenities
+one by one and compares the size of a pickle of the whole store, which
+every write used to cost, with the bytes the sharded checkpoints write,
+and the time of both.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+from src.models.amenity import Amenity
+from src.models.review import Review
+from src.persistence.pickled import PickleRepository
+
+REVIEWS = 100_000
+AMENITIES = 100
+WRITES = 200
+
+
+def main(reviews: int = REVIEWS) -> None:
+    """Print the write amplification of both checkpoints"""
+    with tempfile.TemporaryDirectory() as directory:
+        repo = PickleRepository(os.path.join(directory, "data.pkl"))
+        for i in range(reviews):
+            repo.save(Review(f"place {i % 1000}", f"user {i}", "Nice", 4.0),
+                      save_to_file=False)
+        amenities = [Amenity(f"amenity {i}") for i in range(AMENITIES)]
+        for amenity in amenities:
+            repo.save(amenity, save_to_file=False)
+        repo.flush()
+
+        start = time.perf_counter()
+        whole = len(pickle.dumps(
+            {m: repo.get_all(m) for m in ("review", "amenity", "country")},
+            protocol=5,
+        ))
+        whole_time = time.perf_counter() - start
+
+        before = dict(repo.checkpoint_metrics)
+        start = time.perf_counter()
+        for i in range(WRITES):
+            amenity = amenities[i % AMENITIES]
+            amenity.name = f"renamed {i}"
+            repo.update(amenity)
+        repo.flush()
+        sharded_time = (time.perf_counter() - start) / WRITES
+        sharded = (repo.checkpoint_metrics["bytes_written"]
+                   - before["bytes_written"]) / WRITES
+
+    print(f"whole store: {whole / 1024:10.1f} KiB {whole_time * 1000:8.1f}ms"
+          " per write")
+    print(f"shards:      {sharded / 1024:10.1f} KiB "
+          f"{sharded_time * 1000:8.1f}ms per write")
+    print(f"write amplification divided by {whole / sharded:.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REVIEWS)
@@ -0,0 +1,72 @@
+""" Memory used by 1M reviews stored as models and as compact records.
+
+Fills a ModelStore with reviews of 10k places written by 100k users, the
+ids being decoded strings as they would be when read from a file, and
+measures the memory allocated with tracemalloc, once keeping the model
+instances and once keeping compact records.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from src.models.review import Review
+from src.persistence.store import ModelStore
+
+REVIEWS = 1_000_000
+PLACES = 10_000
+USERS = 100_000
+
+
+def fill(store: ModelStore, size: int) -> None:
+    """Add size reviews to the store"""
+    places = [str(uuid.UUID(int=i)) for i in range(PLACES)]
+    users = [str(uuid.UUID(int=PLACES + i)) for i in range(USERS)]
+    start = datetime(2024, 1, 1)
+
+    for i in range(size):
+        review = Review(
+            # Copies, like the strings decoded from every line of a file
+            place_id="".join(places[i % PLACES]),
+            user_id="".join(users[i % USERS]),
+            comment="Great place, would stay again",
+            rating=float(i % 5 + 1),
+        )
+        review.id = str(uuid.uuid4())
+        review.created_at = review.updated_at = start + timedelta(seconds=i)
+        store.add(review)
+
+
+def measure(compact: bool, size: int) -> int:
+    """Bytes allocated by a store holding size reviews"""
+    gc.collect()
+    tracemalloc.start()
+    store = ModelStore(compact=compact)
+    fill(store, size)
+    gc.collect()
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return used
+
+
+def main(size: int = REVIEWS) -> None:
+    """Print the memory used by each representation"""
+    results = {}
+    for compact in (False, True):
+        start = time.perf_counter()
+        results[compact] = measure(compact, size)
+        name = "records" if compact else "models "
+        print(f"{name}: {results[compact] / 2**20:8.1f} MiB "
+              f"({results[compact] / size:6.0f} B/review, "
+              f"{time.perf_counter() - start:.1f}s)")
+
+    saved = 1 - results[True] / results[False]
+    print(f"compact records use {saved:.0%} less memory")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REVIEWS)
@@ -0,0 +1,66 @@
+""" Benchmark of the TextIndex used by GET /places/search?q=.
+
+Indexes 500k documents drawn from a Zipf-distributed vocabulary and
+measures query latency against a naive scan tokenizing every document.
+"""
+
+import random
+import sys
+import time
+from itertools import accumulate
+
+from src.persistence.text import TextIndex, tokenize
+
+DOCUMENTS = 500_000
+VOCABULARY = 20_000
+WORDS = 30
+QUERIES = 200
+
+
+def build(size: int, rng: random.Random) -> tuple[TextIndex, dict]:
+    """Index size random documents"""
+    words = [f"w{i}" for i in range(VOCABULARY)]
+    weights = list(accumulate(1 / (rank + 1) for rank in range(VOCABULARY)))
+    texts = {}
+    index = TextIndex()
+    for i in range(size):
+        text = " ".join(rng.choices(words, cum_weights=weights, k=WORDS))
+        texts[str(i)] = text
+        index.add(str(i), text)
+    return index, texts
+
+
+def main(size: int = DOCUMENTS) -> None:
+    """Print the latency of indexed and scanned queries"""
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    index, texts = build(size, rng)
+    print(f"indexed {size} documents in {time.perf_counter() - start:.1f}s")
+
+    # Two mid-frequency words per query
+    queries = [
+        f"w{rng.randrange(50, 2000)} w{rng.randrange(50, 2000)}"
+        for _ in range(QUERIES)
+    ]
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, 20)
+    indexed = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"indexed query: {indexed:10.1f}us")
+
+    start = time.perf_counter()
+    for query in queries[:5]:
+        terms = set(tokenize(query))
+        matches = {
+            doc_id for doc_id, text in texts.items()
+            if terms & set(tokenize(text))
+        }
+        assert matches == set(index.scores(query))
+    scan = (time.perf_counter() - start) / 5 * 1e6
+    print(f"scanned query: {scan:10.1f}us (matches agree)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DOCUMENTS)
@@ -0,0 +1,31 @@
+"""add the collection_versions table behind the ETags of the lists
+
+Revision ID: 3b7e91c4d2f6
+Revises: 670c2d5a237e
+Create Date: 2026-10-17 11:02:17.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c4d2f6'
+down_revision: Union[str, None] = '670c2d5a237e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are added by the first write to each model
+    op.create_table(
+        'collection_versions',
+        sa.Column('model', sa.String(32), primary_key=True),
+        sa.Column('version', sa.Integer, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('collection_versions')
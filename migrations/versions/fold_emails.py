@@ -0,0 +1,49 @@
+"""store the emails of the users case-folded
+
+Revision ID: 670c2d5a237e
+Revises: aa9ec569d8a8
+Create Date: 2026-10-17 09:12:40.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '670c2d5a237e'
+down_revision: Union[str, None] = 'aa9ec569d8a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Expression index on lower(email) that compared the emails before User
+# folded them on write
+FOLDED_INDEX = 'ix_users_email_folded'
+
+users = sa.table('users', sa.column('id'), sa.column('email'))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    indexes = sa.inspect(bind).get_indexes('users')
+    if any(index['name'] == FOLDED_INDEX for index in indexes):
+        op.drop_index(FOLDED_INDEX, table_name='users')
+
+    # Like store.normalize_email. Two accounts differing only by case make
+    # the unique email column fail here and have to be merged first.
+    rows = bind.execute(sa.select(users.c.id, users.c.email)).all()
+    for user_id, email in rows:
+        folded = email.strip().casefold()
+        if folded != email:
+            bind.execute(
+                users.update()
+                .where(users.c.id == user_id)
+                .values(email=folded)
+            )
+
+
+def downgrade() -> None:
+    # The original case of the emails is gone; they stay folded, which
+    # the unique email column still accepts
+    pass
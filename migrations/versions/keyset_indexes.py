@@ -0,0 +1,38 @@
+"""index the keyset pagination of every table
+
+Revision ID: aa9ec569d8a8
+Revises: 18c39446000d
+Create Date: 2026-10-17 03:35:26.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aa9ec569d8a8'
+down_revision: Union[str, None] = '18c39446000d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index of Base.__table_args__ for each table, which keyset pagination
+# reads in (created_at, id) order
+KEYSET_INDEXES = {
+    'ix_user_created_at_id': 'users',
+    'ix_city_created_at_id': 'cities',
+    'ix_place_created_at_id': 'places',
+    'ix_review_created_at_id': 'reviews',
+    'ix_amenity_created_at_id': 'amenity',
+    'ix_placeamenity_created_at_id': 'place_amenity',
+}
+
+
+def upgrade() -> None:
+    for name, table in KEYSET_INDEXES.items():
+        op.create_index(name, table, ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    for name, table in KEYSET_INDEXES.items():
+        op.drop_index(name, table_name=table)
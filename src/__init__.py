@@ -6,6 +6,7 @@ from flask_bcrypt import Bcrypt
 import os
 from dotenv import load_dotenv
 from src.config import DevelopmentConfig, ProductionConfig, TestingConfig
+from src.json_provider import ModelJSONProvider
 
 load_dotenv()
 
@@ -19,6 +20,7 @@ def create_app(config_class=None) -> Flask:
     print("Creating app...")
     app = Flask(__name__)
     app.url_map.strict_slashes = False
+    app.json = ModelJSONProvider(app)
     
     env = os.getenv('ENV', 'development')
 
@@ -51,8 +53,25 @@ def register_extensions(app: Flask) -> None:
     db.init_app(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
+
+    from src.compression import init_compression
+
+    # Registered first, so that it runs after every other after_request
+    init_compression(app)
+
+    # Imports the models, so that create_all knows their tables
+    from src.persistence import backend
+    from src.persistence.db import DBRepository
+    from src.persistence.reference import reference_data
+    from src.persistence.unit_of_work import init_unit_of_work
+
     with app.app_context():
         db.create_all()
+        # Countries and cities are served from memory from the start
+        reference_data()
+
+    if isinstance(backend, DBRepository):
+        init_unit_of_work(app)
     print("Extensions registered")
 
 def register_routes(app: Flask) -> None:
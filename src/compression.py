@@ -0,0 +1,152 @@
+""" This module exports the response compression of the app.
+
+Responses at least COMPRESSION_MIN_SIZE bytes long are compressed with
+the best encoding the client accepts among zstd and brotli, when their
+libraries are installed, and gzip, at COMPRESSION_LEVEL. That level is
+on the scale of gzip, 1 (fastest) to 9 (smallest); CODEC_LEVELS maps it
+to the brotli quality (0-11) and zstd level (1-22) with a comparable
+trade-off. The encoded body of a response with an ETag is kept in an LRU
+of COMPRESSION_CACHE_SIZE entries keyed by the URL, the ETag and the
+encoding, so an unchanged payload is never compressed twice. """
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Flask, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = frozenset((
+    "application/json",
+    "text/html",
+    "text/plain",
+))
+
+# COMPRESSION_LEVEL 1 to 9 -> level of each codec. Brotli 5 and zstd 6
+# cost about what gzip 6 does; level 9 asks each codec for its smallest
+# output, short of the ultra levels of zstd (20-22).
+CODEC_LEVELS = {
+    "gzip": (1, 2, 3, 4, 5, 6, 7, 8, 9),
+    "br": (0, 1, 2, 3, 4, 5, 7, 9, 11),
+    "zstd": (1, 2, 3, 4, 5, 6, 9, 13, 19),
+}
+
+# Compressed responses, their hits on the cache and the bytes saved
+compression_metrics = {"compressed": 0, "cache_hits": 0, "bytes_saved": 0}
+
+
+def encodings() -> list[str]:
+    """Encodings available, preferred first"""
+    available = []
+    if zstandard is not None:
+        available.append("zstd")
+    if brotli is not None:
+        available.append("br")
+    available.append("gzip")
+    return available
+
+
+def codec_level(encoding: str, level: int) -> int:
+    """Level of encoding for a COMPRESSION_LEVEL, clamped to 1-9"""
+    return CODEC_LEVELS[encoding][min(max(level, 1), 9) - 1]
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """data encoded with encoding at level, a COMPRESSION_LEVEL"""
+    level = codec_level(encoding, level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # No timestamp, the same payload always gives the same bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class EncodedBodies:
+    """Bounded LRU of the compressed bodies of tagged responses"""
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty cache of at most size bodies"""
+        self.size = size
+        self.__bodies: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: tuple) -> bytes | None:
+        """Body cached under key, or None"""
+        with self.__lock:
+            body = self.__bodies.get(key)
+            if body is not None:
+                self.__bodies.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        """Cache body under key, evicting the least recently used"""
+        if self.size <= 0:
+            return
+        with self.__lock:
+            self.__bodies[key] = body
+            self.__bodies.move_to_end(key)
+            while len(self.__bodies) > self.size:
+                self.__bodies.popitem(last=False)
+
+
+def _compress_response(response):
+    """Encode the body of response if the client accepts it and it is
+    big enough to be worth it"""
+    config = current_app.config
+    response.vary.add("Accept-Encoding")
+
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    encoding = request.accept_encodings.best_match(encodings())
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < config["COMPRESSION_MIN_SIZE"]:
+        return response
+
+    etag, weak = response.get_etag()
+    bodies: EncodedBodies = current_app.extensions["compression"]
+    key = (request.full_path, etag, encoding)
+    body = bodies.get(key) if etag else None
+    if body is None:
+        body = compress(data, encoding, config["COMPRESSION_LEVEL"])
+        if etag:
+            bodies.put(key, body)
+    else:
+        compression_metrics["cache_hits"] += 1
+
+    compression_metrics["compressed"] += 1
+    compression_metrics["bytes_saved"] += len(data) - len(body)
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    if etag and not weak:
+        # The encoded body is another representation of the same content
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    """Compress the responses of app as set by its COMPRESSION_* config"""
+    app.extensions["compression"] = EncodedBodies(
+        app.config["COMPRESSION_CACHE_SIZE"]
+    )
+    app.after_request(_compress_response)
@@ -16,6 +16,25 @@ class Config:
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'hohohoitsasecret')
     JWT_ACCESS_TOKEN_EXPIRES = 3600
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///hbnb.db')
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 500))
+    SEARCH_USE_FTS5 = os.getenv('SEARCH_USE_FTS5', 'true').lower() == 'true'
+    # Responses smaller than this many bytes are sent uncompressed
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    # From 1 (fastest) to 9 (smallest), the gzip level, mapped to the
+    # brotli quality and zstd level by compression.CODEC_LEVELS
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    # Compressed bodies of responses with an ETag kept for reuse
+    COMPRESSION_CACHE_SIZE = int(os.getenv('COMPRESSION_CACHE_SIZE', 256))
+    # Seconds clients may cache the countries, which almost never change
+    COUNTRIES_MAX_AGE = int(os.getenv('COUNTRIES_MAX_AGE', 86400))
+    # Seconds before a worker reads the countries and cities of the
+    # database again, to see those written by other workers; 0 never
+    REFERENCE_DATA_TTL = float(os.getenv('REFERENCE_DATA_TTL', 60))
+    # Objects kept by the read-through entity cache, 0 to disable it
+    ENTITY_CACHE_SIZE = int(os.getenv('ENTITY_CACHE_SIZE', 0))
+    # Seconds a cached object is served, 0 to keep it until it is written
+    ENTITY_CACHE_TTL = float(os.getenv('ENTITY_CACHE_TTL', 0))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -3,14 +3,15 @@ Amenity controller module
 """
 
 from flask import abort, request
+from src.controllers.bulk import create_many
+from src.controllers.conditional import conditional, object_etag
+from src.controllers.pagination import paginate
 from src.models.amenity import Amenity
 
 
 def get_amenities():
-    """Returns all amenities"""
-    amenities: list[Amenity] = Amenity.get_all()
-
-    return [amenity.to_dict() for amenity in amenities]
+    """Returns a page of amenities"""
+    return paginate(Amenity)
 
 
 def create_amenity():
@@ -27,6 +28,11 @@ def create_amenity():
     return amenity.to_dict(), 201
 
 
+def create_amenities():
+    """Creates the amenities of a list, reporting the invalid ones"""
+    return create_many(Amenity)
+
+
 def get_amenity_by_id(amenity_id: str):
     """Returns a amenity by ID"""
     amenity: Amenity | None = Amenity.get(amenity_id)
@@ -34,7 +40,7 @@ def get_amenity_by_id(amenity_id: str):
     if not amenity:
         abort(404, f"Amenity with ID {amenity_id} not found")
 
-    return amenity.to_dict()
+    return conditional(object_etag("amenity", amenity), amenity.to_dict)
 
 
 def update_amenity(amenity_id: str):
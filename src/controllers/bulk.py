@@ -0,0 +1,26 @@
+"""
+Bulk creation helper shared by the controllers
+"""
+
+from flask import abort, request
+
+
+def create_many(model):
+    """
+    Creates the objects of the JSON list in the request body with a
+    single bulk write.
+
+    Invalid items don't fail the others: the response lists the created
+    objects and an error per invalid item, with its index in the list,
+    and is a 207 instead of a 201 when there are errors.
+    """
+    items = request.get_json()
+
+    if not isinstance(items, list):
+        abort(400, "The body must be a list")
+
+    objs, errors = model.create_many(items)
+
+    body = {"created": [obj.to_dict() for obj in objs], "errors": errors}
+
+    return body, 207 if errors else 201
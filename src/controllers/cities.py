@@ -3,14 +3,15 @@ Cities controller module
 """
 
 from flask import request, abort
+from src.controllers.conditional import conditional, object_etag
+from src.controllers.include import to_dicts
+from src.controllers.pagination import paginate
 from src.models.city import City
 
 
 def get_cities():
-    """Returns all cities"""
-    cities: list[City] = City.get_all()
-
-    return [city.to_dict() for city in cities]
+    """Returns a page of cities"""
+    return paginate(City)
 
 
 def create_city():
@@ -34,7 +35,9 @@ def get_city_by_id(city_id: str):
     if not city:
         abort(404, f"City with ID {city_id} not found")
 
-    return city.to_dict()
+    return conditional(
+        object_etag("city", city), lambda: to_dicts(City, [city])[0]
+    )
 
 
 def update_city(city_id: str):
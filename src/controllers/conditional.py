@@ -0,0 +1,85 @@
+"""
+Conditional GET helpers shared by the controllers
+
+Responses carry a weak ETag: derived from Model.version() for a single
+object, and from the versions of the collections a list shows, as the
+repository reads them (Repository.collection_version): the committed
+rows of each table for the database, the write counters of the process
+for the other repositories (see src/persistence/versions.py). A request
+whose If-None-Match holds the current tag gets 304 Not Modified before
+anything is serialized.
+"""
+
+import hashlib
+from flask import abort, current_app, make_response, request
+from src.persistence.relations import RELATIONS, parse_include
+
+# Models whose objects change the dictionaries of another model: the
+# rating of a place is computed from its reviews
+DEPENDENCIES = {
+    "place": ("review",),
+}
+
+
+def include_tree(model_name: str) -> dict:
+    """Relations of the include query parameter, 400 if one is unknown"""
+    try:
+        return parse_include(model_name, request.args.get("include"))
+    except ValueError as e:
+        abort(400, str(e))
+
+
+def shown_models(model_name: str, tree: dict) -> set[str]:
+    """Models whose writes can change the dictionaries of model_name
+    objects with the relations of tree"""
+    models = {model_name, *DEPENDENCIES.get(model_name, ())}
+    for name, subtree in tree.items():
+        models |= shown_models(RELATIONS[model_name][name].model, subtree)
+    return models
+
+
+def versions(models) -> list[tuple[str, tuple]]:
+    """Versions of models, in a stable order"""
+    from src.persistence import repo
+
+    return [(m, repo.collection_version(m)) for m in sorted(models)]
+
+
+def make_etag(*parts) -> str:
+    """Short digest of parts"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+
+def collection_etag(model_name: str) -> str:
+    """Tag of a list of model_name objects, changed by any write to the
+    models it shows"""
+    models = shown_models(model_name, include_tree(model_name))
+    return make_etag(model_name, versions(models))
+
+
+def object_etag(model_name: str, obj) -> str:
+    """Tag of a single object, changed with its version and, when the
+    request includes related objects, by any write to their models"""
+    tree = include_tree(model_name)
+    if not tree:
+        return make_etag(model_name, obj.version())
+
+    related = set().union(*(
+        shown_models(RELATIONS[model_name][name].model, subtree)
+        for name, subtree in tree.items()
+    ))
+    return make_etag(model_name, obj.version(), versions(related))
+
+
+def conditional(etag: str, build, weak: bool = True):
+    """
+    Response of the view result returned by build tagged with etag, or an
+    empty 304 when If-None-Match already holds etag: build is not called.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(build())
+
+    response.set_etag(etag, weak=weak)
+    return response
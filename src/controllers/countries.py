@@ -1,16 +1,28 @@
 """ Countries controller module. """
 
-from flask import abort
+from flask import abort, current_app
+from src.controllers.conditional import collection_etag, conditional
 from src.models.base import Base
 from src.models.city import City
 from src.models.country import Country
+from src.persistence.reference import reference_data
+
+
+def cached_response(build):
+    """
+    Response of the reference data returned by build, or 304 when the
+    client holds the current version, with the ETag of the countries and
+    a long-lived Cache-Control.
+    """
+    response = conditional(reference_data().etag, build, weak=False)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config["COUNTRIES_MAX_AGE"]
+    return response
 
 
 def get_countries():
     """Returns all countries"""
-    countries: list[Country] = Country.get_all()
-
-    return [country.to_dict() for country in countries]
+    return cached_response(Country.get_all)
 
 
 def get_country_by_code(code: str):
@@ -20,7 +32,7 @@ def get_country_by_code(code: str):
     if not country:
         abort(404, f"Country with ID {code} not found")
 
-    return country.to_dict()
+    return cached_response(country.to_dict)
 
 
 def get_country_cities(code: str):
@@ -30,10 +42,6 @@ def get_country_cities(code: str):
     if not country:
         abort(404, f"Country with ID {code} not found")
 
-    cities: list[City] = City.get_all()
-
-    country_cities = [
-        city.to_dict() for city in cities if city.country_code == country.code
-    ]
-
-    return country_cities
+    return conditional(
+        collection_etag("city"), lambda: City.find_by_country(country.code)
+    )
@@ -0,0 +1,43 @@
+"""
+Relationship expansion helper shared by the controllers
+"""
+
+from flask import abort, request
+from src.persistence.relations import parse_include
+
+
+def to_dicts(model, objs: list) -> list[dict]:
+    """
+    Serializes objs, with the related objects asked for by the include
+    query parameter, such as ?include=city,city.country,host,reviews.
+
+    The relations are read by the repository for all the objects at
+    once, so the number of queries doesn't grow with the page size.
+    """
+    objs = to_response(model, objs)
+
+    if objs and not isinstance(objs[0], dict):
+        return [obj.to_dict() for obj in objs]
+
+    return objs
+
+
+def to_response(model, objs: list) -> list:
+    """
+    objs as the body of a list response: the objects themselves, which
+    the JSON provider of the app encodes directly (see json_provider.py),
+    or their dictionaries when the include query parameter expands them.
+    """
+    from src.persistence import repo
+
+    model_name = model.__name__.lower()
+
+    try:
+        include = parse_include(model_name, request.args.get("include"))
+    except ValueError as e:
+        abort(400, str(e))
+
+    if not include:
+        return objs
+
+    return repo.expand(model_name, objs, include)
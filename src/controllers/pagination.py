@@ -0,0 +1,93 @@
+"""
+Pagination helpers shared by the list controllers
+"""
+
+import base64
+import json
+from datetime import datetime
+from flask import abort, current_app, request
+from src.controllers.conditional import collection_etag, conditional
+from src.controllers.include import to_response
+
+
+def get_page_args() -> tuple[int, int]:
+    """
+    Reads the limit and offset query parameters.
+
+    A missing limit defaults to PAGE_SIZE and any limit is capped to
+    MAX_PAGE_SIZE, so a single request never serializes the full table.
+    """
+    max_size = current_app.config["MAX_PAGE_SIZE"]
+
+    try:
+        limit = int(request.args.get("limit", current_app.config["PAGE_SIZE"]))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        abort(400, "limit and offset must be integers")
+
+    if limit < 0 or offset < 0:
+        abort(400, "limit and offset must not be negative")
+
+    return min(limit, max_size), offset
+
+
+def encode_cursor(obj) -> str:
+    """Opaque cursor pointing right after obj in (created_at, id) order"""
+    raw = json.dumps([obj.created_at.isoformat(), obj.id])
+
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str] | None:
+    """(created_at, id) encoded in a cursor, None for an empty cursor"""
+    if not cursor:
+        return None
+
+    try:
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(created_at), obj_id
+    except (ValueError, TypeError):
+        abort(400, "Invalid cursor")
+
+
+def paginate(model):
+    """
+    Returns a page of a model's objects as a response.
+
+    With a cursor query parameter (empty for the first page) the page is
+    read with keyset pagination over (created_at, id), and the cursor of
+    the next page is sent in the X-Next-Cursor header. Otherwise the page
+    is read with LIMIT/OFFSET, and the total number of objects is sent in
+    the X-Total-Count header. The include query parameter expands the
+    related objects (see include.py). Unchanged pages get 304 (see
+    conditional.py).
+    """
+    return conditional(
+        collection_etag(model.__name__.lower()), lambda: read_page(model)
+    )
+
+
+def read_page(model):
+    """Page of a model's objects selected by the query parameters, as a
+    view result"""
+    limit, offset = get_page_args()
+
+    if "cursor" in request.args:
+        after = decode_cursor(request.args["cursor"])
+        objs = model.get_page(limit, after)
+
+        headers = {"X-Limit": str(limit)}
+        if objs and len(objs) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(objs[-1])
+
+        return to_response(model, objs), 200, headers
+
+    objs = model.get_all(limit=limit, offset=offset)
+
+    headers = {
+        "X-Total-Count": str(model.count()),
+        "X-Limit": str(limit),
+        "X-Offset": str(offset),
+    }
+
+    return to_response(model, objs), 200, headers
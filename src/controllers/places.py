@@ -2,15 +2,148 @@
 Places controller module
 """
 
+import heapq
+import math
 from flask import abort, request
+from src.controllers.bulk import create_many
+from src.controllers.conditional import (
+    collection_etag,
+    conditional,
+    object_etag,
+)
+from src.controllers.include import to_dicts
+from src.controllers.pagination import get_page_args, paginate
 from src.models.place import Place
+from src.persistence.geo import place_index
+from src.persistence.text import search_place_ids
 
 
 def get_places():
-    """Returns all places"""
-    places: list[Place] = Place.get_all()
-
-    return [place.to_dict() for place in places], 200
+    """Returns a page of places"""
+    return paginate(Place)
+
+
+# Ranges of the float query parameters, finite numbers for the others
+FLOAT_RANGES = {
+    "lat": (-90, 90),
+    "lng": (-180, 180),
+    "south": (-90, 90),
+    "north": (-90, 90),
+    "west": (-180, 180),
+    "east": (-180, 180),
+    "radius_km": (0, math.inf),
+}
+
+
+def check_float(name: str, value: float) -> float:
+    """value of the float query parameter name, 400 unless it is finite
+    and in the range of the parameter"""
+    low, high = FLOAT_RANGES.get(name, (-math.inf, math.inf))
+    if not math.isfinite(value):
+        abort(400, f"{name} must be a finite number")
+    if not low <= value <= high:
+        if high == math.inf:
+            abort(400, f"{name} must be at least {low}")
+        abort(400, f"{name} must be between {low} and {high}")
+    return value
+
+
+def get_float_args(*names: str) -> list[float]:
+    """Reads required float query parameters"""
+    try:
+        values = [float(request.args[name]) for name in names]
+    except KeyError as e:
+        abort(400, f"Missing parameter: {e}")
+    except ValueError:
+        abort(400, f"{', '.join(names)} must be numbers")
+
+    return [check_float(name, value) for name, value in zip(names, values)]
+
+
+def search_places():
+    """
+    Searches places by text, around a point or inside a bounding box
+
+    - q: places whose name, description, address or review comments
+      match the words of q, best BM25 score first
+    - lat, lng, radius_km: places within radius_km, nearest first
+    - lat, lng, k: the k places nearest to the point
+    - bbox=south,west,north,east: places inside the box (west > east
+      for boxes crossing the antimeridian)
+
+    q can be combined with a geographic filter to rank the places found
+    in the area. Distances are haversine kilometers, returned as
+    distance_km, and text relevance is returned as score.
+    """
+    return conditional(collection_etag("place"), find_places)
+
+
+def find_places():
+    """Places matching the search parameters, as a view result"""
+    limit, _ = get_page_args()
+    query = request.args.get("q")
+
+    if "bbox" in request.args:
+        try:
+            south, west, north, east = map(
+                float, request.args["bbox"].split(",")
+            )
+        except ValueError:
+            abort(400, "bbox must be south,west,north,east")
+
+        south, west, north, east = (
+            check_float(name, value) for name, value in zip(
+                ("south", "west", "north", "east"), (south, west, north, east)
+            )
+        )
+
+        found = [(None, key) for key in place_index().within_bbox(
+            south, west, north, east
+        )]
+    elif query is not None and "lat" not in request.args:
+        found = None
+    else:
+        lat, lng = get_float_args("lat", "lng")
+
+        if "radius_km" in request.args:
+            (radius_km,) = get_float_args("radius_km")
+            found = place_index().within_radius(lat, lng, radius_km)
+        elif "k" in request.args:
+            k = request.args["k"]
+            if not k.isdigit() or int(k) < 1:
+                abort(400, "k must be a positive integer")
+            k = min(int(k), limit)
+            found = place_index().nearest(lat, lng, k)
+        else:
+            abort(400, "Missing parameter: radius_km or k")
+
+    scores = None
+    if query is not None:
+        scores = search_place_ids(query)
+        if found is None:
+            found = [(None, key) for key in scores]
+        else:
+            found = [(d, key) for d, key in found if key in scores]
+
+    total = len(found)
+    if scores is not None:
+        found = heapq.nlargest(
+            limit, found, key=lambda match: scores[match[1]]
+        )
+
+    matches = [
+        (distance, key, place)
+        for distance, key in found[:limit]
+        if (place := Place.get(key))
+    ]
+    places = to_dicts(Place, [place for _, _, place in matches])
+    for (distance, key, _), place_dict in zip(matches, places):
+        if distance is not None:
+            place_dict["distance_km"] = distance
+        if scores is not None:
+            place_dict["score"] = scores[key]
+
+    return places, 200, {"X-Total-Count": str(total)}
 
 
 def create_place():
@@ -27,6 +160,11 @@ def create_place():
     return place.to_dict(), 201
 
 
+def create_places():
+    """Creates the places of a list, reporting the invalid ones"""
+    return create_many(Place)
+
+
 def get_place_by_id(place_id: str):
     """Returns a place by ID"""
     place: Place | None = Place.get(place_id)
@@ -34,7 +172,10 @@ def get_place_by_id(place_id: str):
     if not place:
         abort(404, f"Place with ID {place_id} not found")
 
-    return place.to_dict(), 200
+    return conditional(
+        object_etag("place", place),
+        lambda: (to_dicts(Place, [place])[0], 200),
+    )
 
 
 def update_place(place_id: str):
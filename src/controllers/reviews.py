@@ -3,14 +3,23 @@ Reviews controller module
 """
 
 from flask import abort, request
+from src.controllers.bulk import create_many
+from src.controllers.conditional import (
+    collection_etag,
+    conditional,
+    object_etag,
+)
+from src.controllers.include import to_dicts, to_response
+from src.controllers.pagination import paginate
+from src.models.place import Place
 from src.models.review import Review
+from src.models.user import User
+from src.persistence.ratings import rating_aggregates
 
 
 def get_reviews():
-    """Returns all reviews"""
-    reviews = Review.get_all()
-
-    return [review.to_dict() for review in reviews], 200
+    """Returns a page of reviews"""
+    return paginate(Review)
 
 
 def create_review(place_id: str):
@@ -30,22 +39,47 @@ def create_review(place_id: str):
     return review.to_dict(), 201
 
 
+def create_reviews():
+    """Creates the reviews of a list, reporting the invalid ones"""
+    return create_many(Review)
+
+
 def get_reviews_from_place(place_id: str):
     """Returns all reviews from a specific place"""
-    reviews = Review.get_all()
-
-    return [
-        review.to_dict() for review in reviews if review.place_id == place_id
-    ], 200
+    return conditional(
+        collection_etag("review"),
+        lambda: (to_response(Review, Review.find(place_id=place_id)), 200),
+    )
 
 
 def get_reviews_from_user(user_id: str):
     """Returns all reviews from a specific user"""
-    reviews = Review.get_all()
+    return conditional(
+        collection_etag("review"),
+        lambda: (to_response(Review, Review.find(user_id=user_id)), 200),
+    )
+
 
-    return [
-        review.to_dict() for review in reviews if review.user_id == user_id
-    ], 200
+def get_place_rating(place_id: str):
+    """Returns the rating stats of a specific place"""
+    if not Place.get(place_id):
+        abort(404, f"Place with ID {place_id} not found")
+
+    return conditional(
+        collection_etag("review"),
+        lambda: (rating_aggregates().place(place_id).to_dict(), 200),
+    )
+
+
+def get_user_rating(user_id: str):
+    """Returns the rating stats of the reviews from a specific user"""
+    if not User.get(user_id):
+        abort(404, f"User with ID {user_id} not found")
+
+    return conditional(
+        collection_etag("review"),
+        lambda: (rating_aggregates().user(user_id).to_dict(), 200),
+    )
 
 
 def get_review_by_id(review_id: str):
@@ -55,7 +89,10 @@ def get_review_by_id(review_id: str):
     if not review:
         abort(404, f"Review with ID {review_id} not found")
 
-    return review.to_dict(), 200
+    return conditional(
+        object_etag("review", review),
+        lambda: (to_dicts(Review, [review])[0], 200),
+    )
 
 
 def update_review(review_id: str):
@@ -3,14 +3,14 @@ Users controller module
 """
 
 from flask import abort, request
+from src.controllers.conditional import conditional, object_etag
+from src.controllers.pagination import paginate
 from src.models.user import User
 
 
 def get_users():
-    """Returns all users"""
-    users: list[User] = User.get_all()
-
-    return [user.to_dict() for user in users]
+    """Returns a page of users"""
+    return paginate(User)
 
 
 def create_user():
@@ -37,7 +37,9 @@ def get_user_by_id(user_id: str):
     if not user:
         abort(404, f"User with ID {user_id} not found")
 
-    return user.to_dict(), 200
+    return conditional(
+        object_etag("user", user), lambda: (user.to_dict(), 200)
+    )
 
 
 def update_user(user_id: str):
@@ -0,0 +1,84 @@
+""" This module exports the JSON provider of the app.
+
+Controllers can return the models themselves: the provider encodes them
+from Model.to_json, which leaves the datetimes to the encoder instead of
+building the strings of to_dict first, and converts a list of objects of
+one model with Model.to_json_many, which reads what they share (the
+ratings of places) at once. orjson is used when it is installed, encoding
+datetimes (as ISO 8601, like to_dict) and dicts in C; the standard json
+module is the fallback.
+
+Both write the same values, but not always the same text: orjson spells
+some floats differently (0.00001 where json writes 1e-05, 1e16 for
+1e+16), and keys that aren't strings are accepted only through
+OPT_NON_STR_KEYS, which dumps sets. """
+
+from datetime import date, datetime
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode(obj: Any) -> Any:
+    """JSON value of the objects json can't encode: models (Country has
+    no to_json), datetimes and whatever Flask's default provider knows"""
+    to_json = getattr(obj, "to_json", None)
+    if to_json is not None:
+        return to_json()
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class ModelJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider encoding the models and datetimes directly, with orjson
+    when it is installed.
+
+    The output holds the values of to_dict, with sorted keys and
+    non-ASCII characters written as UTF-8 instead of escape sequences;
+    with orjson some floats are spelled differently than by json.
+    """
+
+    default = staticmethod(encode)
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize obj, with orjson unless kwargs ask for something
+        only json does"""
+        if type(obj) is list and obj:
+            model = type(obj[0])
+            to_json_many = getattr(model, "to_json_many", None)
+            if to_json_many is not None and all(type(o) is model for o in obj):
+                # A list endpoint: the objects are converted together
+                obj = to_json_many(obj)
+
+        indent = kwargs.pop("indent", None)
+        kwargs.pop("separators", None)
+        if orjson is None or kwargs or indent not in (None, 2):
+            if indent is not None:
+                kwargs["indent"] = indent
+            else:
+                kwargs.setdefault("separators", (",", ":"))
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """Deserialize JSON, with orjson unless kwargs are given"""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
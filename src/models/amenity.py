@@ -7,6 +7,13 @@ from src.models.base import Base
 class Amenity(Base):
     """Amenity representation"""
 
+    json_fields = (
+        "id",
+        "name",
+        "created_at",
+        "updated_at",
+    )
+
     name: str
 
     def __init__(self, name: str, **kw) -> None:
@@ -63,6 +70,14 @@ class PlaceAmenity(Base):
     place_id: str
     amenity_id: str
 
+    json_fields = (
+        "id",
+        "place_id",
+        "amenity_id",
+        "created_at",
+        "updated_at",
+    )
+
     def __init__(self, place_id: str, amenity_id: str, **kw) -> None:
         """Dummy init"""
         super().__init__(**kw)
@@ -89,16 +104,9 @@ class PlaceAmenity(Base):
         """Get a PlaceAmenity object by place_id and amenity_id"""
         from src.persistence import repo
 
-        place_amenities: list[PlaceAmenity] = repo.get_all("placeamenity")
-
-        for place_amenity in place_amenities:
-            if (
-                place_amenity.place_id == place_id
-                and place_amenity.amenity_id == amenity_id
-            ):
-                return place_amenity
-
-        return None
+        return repo.find_one(
+            "placeamenity", place_id=place_id, amenity_id=amenity_id
+        )
 
     @staticmethod
     def create(data: dict) -> "PlaceAmenity":
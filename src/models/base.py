@@ -1,20 +1,75 @@
 """ Abstract base class for all models. """
 
 from datetime import datetime
+from inspect import signature
+from operator import attrgetter, itemgetter
 from typing import Any, Optional
 from uuid import uuid4
 from abc import ABC, abstractmethod
 from sqlalchemy import DateTime, String, Column
+from sqlalchemy.orm import configure_mappers, declared_attr
 from sqlalchemy.sql import func
 from src import db
 
-class Base(db.Model):
+
+class RecordMixin:
+    """Conversion of the models to and from the attributes the file
+    repositories persist"""
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Any":
+        """
+        Build an instance from its persisted attributes, as read back from
+        a file, without calling the constructor: nothing is validated or
+        recomputed (User.__init__ would hash the hashed password again).
+
+        Datetime columns may be given as ISO strings.
+        """
+        datetimes = _datetime_columns(cls)
+        obj = cls._sa_class_manager.new_instance()
+        # Filled like SQLAlchemy loads a row, without attribute events
+        obj.__dict__.update(record)
+        for name in datetimes:
+            value = record.get(name)
+            if isinstance(value, str):
+                obj.__dict__[name] = datetime.fromisoformat(value)
+        return obj
+
+    def to_record(self) -> dict:
+        """Persisted attributes, datetimes as ISO strings, as read back by
+        from_record"""
+        from src.persistence.records import fields_of
+
+        record = {}
+        for name in fields_of(self):
+            value = getattr(self, name, None)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            record[name] = value
+        return record
+
+
+class Base(RecordMixin, db.Model):
 
     __abstract__ = True
+
+    # Keys of to_dict read as they are by to_json, datetimes included
+    json_fields: tuple[str, ...] = ()
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    # Stamped in Python with microseconds, like the other repositories
+    # do, so that two updates within a second get different ETags
+    updated_at = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=datetime.now)
+
+    @declared_attr
+    def __table_args__(cls):
+        """Index serving the keyset pagination of every table"""
+        return (
+            db.Index(
+                f"ix_{cls.__name__.lower()}_created_at_id", "created_at", "id"
+            ),
+        )
 
     def __init__(
         self,
@@ -35,26 +90,144 @@ class Base(db.Model):
 
     @classmethod
     def get(cls, id) -> "Any | None":
-        from src.persistence import db
+        from src.persistence import repo
+
+        return repo.get(cls.__name__.lower(), id)
+
+    @classmethod
+    def get_all(cls, limit: int | None = None, offset: int = 0) -> list["Any"]:
+        from src.persistence import repo
 
-        return db.get(cls.__name__.lower(), id)
+        return repo.get_all(cls.__name__.lower(), limit, offset)
 
     @classmethod
-    def get_all(cls) -> list["Any"]:
-        from src.persistence import db
+    def count(cls) -> int:
+        from src.persistence import repo
 
-        return db.get_all(cls.__name__.lower())
+        return repo.count(cls.__name__.lower())
+
+    @classmethod
+    def get_page(cls, limit: int, after: tuple | None = None) -> list["Any"]:
+        from src.persistence import repo
+
+        return repo.get_page(cls.__name__.lower(), limit, after)
+
+    @classmethod
+    def find(cls, **criteria) -> list["Any"]:
+        from src.persistence import repo
+
+        return repo.find(cls.__name__.lower(), **criteria)
+
+    @classmethod
+    def find_one(cls, **criteria) -> "Any | None":
+        from src.persistence import repo
+
+        return repo.find_one(cls.__name__.lower(), **criteria)
 
     @classmethod
     def delete(cls, id) -> bool:
-        from src.persistence import db
+        from src.persistence import repo
 
         obj = cls.get(id)
 
         if not obj:
             return False
 
-        return db.delete(obj)
+        return repo.delete(obj)
+
+    @classmethod
+    def build(cls, data: dict) -> "Any":
+        """Validate data and return the new object, not saved yet"""
+        return cls(**data)
+
+    @classmethod
+    def on_saved(cls, obj) -> None:
+        """Update what is derived from the objects once obj is saved"""
+
+    @classmethod
+    def create_many(cls, items: list) -> tuple[list["Any"], list[dict]]:
+        """
+        Create the objects described by items with one bulk write. Invalid
+        items are reported instead of failing the others, as are items
+        with an id: ids are assigned here, so none is already stored.
+
+        Returns the created objects and the errors, as
+        {"index": position of the item, "error": message}.
+        """
+        from src.persistence import repo
+
+        objs, errors = [], []
+        for index, data in enumerate(items):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("Item must be an object")
+                if "id" in data:
+                    raise ValueError("Field 'id' can't be set")
+                objs.append(cls.build(data))
+            except KeyError as e:
+                errors.append({"index": index, "error": f"Missing field: {e}"})
+            except TypeError:
+                errors.append({"index": index, "error": cls.type_error(data)})
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+
+        repo.save_many(objs)
+        for obj in objs:
+            cls.on_saved(obj)
+
+        return objs, errors
+
+    @classmethod
+    def type_error(cls, data: dict) -> str:
+        """
+        Message for the client of a TypeError raised building an object
+        from data: the first argument of the constructor missing from
+        data, or values of the wrong type.
+        """
+        for name, param in signature(cls.__init__).parameters.items():
+            if (
+                name != "self"
+                and param.default is param.empty
+                and param.kind in (param.POSITIONAL_OR_KEYWORD,
+                                   param.KEYWORD_ONLY)
+                and name not in data
+            ):
+                return f"Missing field: '{name}'"
+
+        return "Invalid field types"
+
+    def version(self) -> tuple:
+        """Values that change whenever to_dict does, which the ETag of
+        the object is derived from"""
+        return (self.id, self.updated_at)
+
+    def to_json(self) -> dict:
+        """
+        Dictionary of the object for the JSON provider: the to_dict of
+        the json_fields, with the datetimes left for the encoder to write
+        (as the same ISO strings) instead of formatted here.
+        """
+        if not self.json_fields:
+            return self.to_dict()
+
+        getters = _json_getters(type(self))
+        try:
+            # Loaded columns are in __dict__, read without the descriptors
+            values = getters[0](self.__dict__)
+        except KeyError:
+            # Expired or deferred by the session, loaded by the descriptors
+            values = getters[1](self)
+        return dict(zip(self.json_fields, values))
+
+    @classmethod
+    def to_json_many(cls, objs: list) -> list[dict]:
+        """to_json of each of objs, objects of cls"""
+        return [obj.to_json() for obj in objs]
+
+    @classmethod
+    def to_dict_many(cls, objs: list) -> list[dict]:
+        """to_dict of each of objs, objects of cls"""
+        return [obj.to_dict() for obj in objs]
 
     @abstractmethod
     def to_dict(self) -> dict: ...
@@ -66,3 +239,35 @@ class Base(db.Model):
     @staticmethod
     @abstractmethod
     def update(entity_id: str, data: dict) -> Any | None: ...
+
+
+_datetimes: dict[type, tuple] = {}
+
+
+def _datetime_columns(model: type) -> tuple:
+    """Names of the datetime columns of a model"""
+    names = _datetimes.get(model)
+    if names is None:
+        # Constructors configure the mappers, from_record must do it once
+        configure_mappers()
+        names = tuple(
+            column.key for column in model.__table__.columns
+            if isinstance(column.type, DateTime)
+        )
+        _datetimes[model] = names
+    return names
+
+
+_getters: dict[type, tuple] = {}
+
+
+def _json_getters(model: type) -> tuple[itemgetter, attrgetter]:
+    """Getters of the json_fields of a model, as a tuple, from the
+    __dict__ of an object and from the object"""
+    getters = _getters.get(model)
+    if getters is None:
+        getters = _getters[model] = (
+            itemgetter(*model.json_fields),
+            attrgetter(*model.json_fields),
+        )
+    return getters
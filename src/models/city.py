@@ -12,9 +12,20 @@ class City(Base):
     
     __tablename__ = 'cities'
 
+    json_fields = (
+        "id",
+        "name",
+        "country_code",
+        "created_at",
+        "updated_at",
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    country_code = db.Column(db.String(2), db.ForeignKey('countries.code'), nullable=False)
+    country_code = db.Column(
+        db.String(2), db.ForeignKey('countries.code'),
+        nullable=False, index=True,
+    )
     country = db.relationship('Country', backref=db.backref('cities', lazy=True))
 
     def __init__(self, name: str, country_code: str, **kw) -> None:
@@ -37,7 +48,9 @@ class City(Base):
 
     @staticmethod
     def create(data: dict) -> "City":
-        from src.persistence import db
+        from src.persistence import repo
+        from src.persistence.reference import put_city
+        from src.persistence.unit_of_work import after_commit
 
         country = Country.get(data["country_code"])
 
@@ -46,13 +59,14 @@ class City(Base):
 
         city = City(**data)
 
-        db.save(city)
+        repo.save(city)
+        after_commit(put_city, city)
 
         return city
 
     @staticmethod
     def update(city_id: str, data: dict) -> "City":
-        from src.persistence import db
+        from src.persistence import repo
 
         city = City.get(city_id)
 
@@ -62,7 +76,7 @@ class City(Base):
         for key, value in data.items():
             setattr(city, key, value)
 
-        db.update(city)
+        repo.update(city)
 
         return city
 
@@ -73,6 +87,8 @@ class City(Base):
     def update(city_id: str, data: dict) -> "City":
         """Update an existing city"""
         from src.persistence import repo
+        from src.persistence.reference import put_city
+        from src.persistence.unit_of_work import after_commit
 
         city = City.get(city_id)
 
@@ -83,5 +99,25 @@ class City(Base):
             setattr(city, key, value)
 
         repo.update(city)
+        after_commit(put_city, city)
 
         return city
+
+    @classmethod
+    def delete(cls, id) -> bool:
+        """Delete a city and forget it in the reference data"""
+        from src.persistence.reference import remove_city
+        from src.persistence.unit_of_work import after_commit
+
+        deleted = super().delete(id)
+        if deleted:
+            after_commit(remove_city, id)
+
+        return deleted
+
+    @staticmethod
+    def find_by_country(code: str) -> list["City"]:
+        """Cities of a country, from the reference data"""
+        from src.persistence.reference import reference_data
+
+        return reference_data().cities(code)
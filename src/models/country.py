@@ -2,10 +2,11 @@
 
 
 from src import db
+from src.models.base import RecordMixin
 from sqlalchemy import Column, String, Integer
 
 
-class Country(db.Model):
+class Country(RecordMixin, db.Model):
     __tablename__ = 'countries'
 
     name = db.Column(db.String(100), nullable=False)
@@ -27,25 +28,27 @@ class Country(db.Model):
 
     @staticmethod
     def get_all() -> list["Country"]:
-        from src.persistence import db
+        from src.persistence.reference import reference_data
 
-        countries: list["Country"] = db.get_all("country")
+        countries: list["Country"] = reference_data().countries()
 
         return countries
 
     @staticmethod
     def get(code: str) -> "Country | None":
-        for country in Country.get_all():
-            if country.code == code:
-                return country
-        return None
+        from src.persistence.reference import reference_data
+
+        return reference_data().country(code)
 
     @staticmethod
     def create(name: str, code: str) -> "Country":
-        from src.persistence import db
+        from src.persistence import repo
+        from src.persistence.reference import put_country
+        from src.persistence.unit_of_work import after_commit
 
         country = Country(name, code)
 
-        db.save(country)
+        repo.save(country)
+        after_commit(put_country, country)
 
         return country
@@ -4,6 +4,7 @@
 from src.models.base import Base
 from src.models.city import City
 from src.models.user import User
+from src.persistence.geo import check_point
 from sqlalchemy import Column, String, Text, Float, ForeignKey, Integer
 from datetime import datetime
 from src import db
@@ -25,13 +26,41 @@ class Place(Base):
     address = db.Column(db.String(255), nullable=False)  # Address of the place
     latitude = db.Column(db.Float, nullable=False)  # Latitude for location
     longitude = db.Column(db.Float, nullable=False)  # Longitude for location
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)  # Foreign key to Host
-    city_id = db.Column(db.String(36), db.ForeignKey('cities.id'), nullable=False)  # Foreign key to City
+    user_id = db.Column(
+        db.String(36), db.ForeignKey('users.id'), nullable=False, index=True
+    )  # Foreign key to Host
+    city_id = db.Column(
+        db.String(36), db.ForeignKey('cities.id'), nullable=False, index=True
+    )  # Foreign key to City
     price_per_night = db.Column(db.Integer, nullable=False)  # Price per night
     number_of_rooms = db.Column(db.Integer, nullable=False)  # Number of rooms
     number_of_bathrooms = db.Column(db.Integer, nullable=False)  # Number of bathrooms
     max_guests = db.Column(db.Integer, nullable=False)  # Maximum number of guests
 
+    # Read-only relationships, eagerly loaded to expand ?include= requests
+    city = db.relationship('City', viewonly=True)
+    host = db.relationship('User', viewonly=True)
+    reviews = db.relationship(
+        'Review', viewonly=True, order_by='Review.created_at'
+    )
+
+    json_fields = (
+        "id",
+        "name",
+        "description",
+        "address",
+        "latitude",
+        "longitude",
+        "city_id",
+        "user_id",
+        "price_per_night",
+        "number_of_rooms",
+        "number_of_bathrooms",
+        "max_guests",
+        "created_at",
+        "updated_at",
+    )
+
     def __init__(self, data: dict | None = None, **kw) -> None:
         """
         Initialize a Place instance.
@@ -71,6 +100,11 @@ class Place(Base):
 
         :return: Dictionary representation of the Place
         """
+        return self.to_dict_many([self])[0]
+
+    def __to_dict(self, count: int, average: float | None) -> dict:
+        """to_dict of the Place, with the count and average of its
+        ratings"""
         return {
             "id": self.id,
             "name": self.name,
@@ -84,10 +118,67 @@ class Place(Base):
             "number_of_rooms": self.number_of_rooms,
             "number_of_bathrooms": self.number_of_bathrooms,
             "max_guests": self.max_guests,
+            "rating": {"count": count, "average": average},
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
 
+    def to_json(self) -> dict:
+        """
+        Convert the Place instance to the dictionary the JSON provider
+        encodes, with its datetimes as they are.
+
+        :return: to_dict of the Place, without formatting the datetimes
+        """
+        return self.to_json_many([self])[0]
+
+    @classmethod
+    def to_dict_many(cls, objs: list) -> list[dict]:
+        """
+        to_dict of a list of places, reading their ratings at once.
+
+        :param objs: The places
+        :return: Dictionaries of the places
+        """
+        from src.persistence.ratings import rating_aggregates
+
+        ratings = rating_aggregates().place_ratings([obj.id for obj in objs])
+
+        return [
+            obj.__to_dict(count, average)
+            for obj, (count, average) in zip(objs, ratings)
+        ]
+
+    @classmethod
+    def to_json_many(cls, objs: list) -> list[dict]:
+        """
+        to_json of a list of places, reading their ratings at once.
+
+        :param objs: The places
+        :return: Dictionaries of the places, without formatted datetimes
+        """
+        from src.persistence.ratings import rating_aggregates
+
+        ratings = rating_aggregates().place_ratings([obj.id for obj in objs])
+
+        data = [Base.to_json(obj) for obj in objs]
+        for entry, (count, average) in zip(data, ratings):
+            entry["rating"] = {"count": count, "average": average}
+        return data
+
+    def version(self) -> tuple:
+        """
+        Values that change whenever to_dict does: the rating of the place
+        changes with its reviews, not with the place, so the version of
+        the reviews as the repository stores it is part of it.
+
+        :return: The id and update time of the Place, and the version of
+            the reviews
+        """
+        from src.persistence import repo
+
+        return super().version() + repo.collection_version("review")
+
     @staticmethod
     def get_current_user_id():
         """
@@ -106,8 +197,26 @@ class Place(Base):
         :return: Newly created Place instance
         :raises ValueError: If the host or city is not found
         """
-        from src.persistence import db
+        from src.persistence import repo
+
+        new_place = Place.build(data)
 
+        repo.save(new_place)
+
+        Place.on_saved(new_place)
+
+        return new_place
+
+    @classmethod
+    def build(cls, data: dict) -> "Place":
+        """
+        Create a new Place instance, not saved yet.
+
+        :param data: Dictionary containing place data
+        :return: The new Place instance
+        :raises ValueError: If the host or city is not found, or the
+            coordinates are invalid
+        """
         user: User | None = User.get(data["user_id"])
 
         if not user:
@@ -118,11 +227,27 @@ class Place(Base):
         if not city:
             raise ValueError(f"City with ID {data['city_id']} not found")
 
-        new_place = Place(data=data)
+        place = Place(data=data)
+        place.latitude, place.longitude = check_point(
+            place.latitude, place.longitude
+        )
 
-        db.save(new_place)
+        return place
 
-        return new_place
+    @classmethod
+    def on_saved(cls, place: "Place") -> None:
+        """
+        Add a saved place to the spatial and text indexes, once it is
+        committed.
+
+        :param place: The saved Place instance
+        """
+        from src.persistence.geo import index_point
+        from src.persistence.text import index_place
+        from src.persistence.unit_of_work import after_commit
+
+        after_commit(index_point, place)
+        after_commit(index_place, place)
 
     @staticmethod
     def update(place_id: str, data: dict) -> "Place | None":
@@ -132,19 +257,34 @@ class Place(Base):
         :param place_id: ID of the Place to update
         :param data: Dictionary containing updated data
         :return: Updated Place instance or None if not found
+        :raises ValueError: If the coordinates are invalid
         """
-        from src.persistence import db
+        from src.persistence import repo
+        from src.persistence.geo import index_point
+        from src.persistence.text import index_place
+        from src.persistence.unit_of_work import after_commit
 
         place: Place | None = Place.get(place_id)
 
         if not place:
             return None
 
+        if "latitude" in data or "longitude" in data:
+            # Checked before the place is changed and saved
+            latitude, longitude = check_point(
+                data.get("latitude", place.latitude),
+                data.get("longitude", place.longitude),
+            )
+            data = {**data, "latitude": latitude, "longitude": longitude}
+
         # Update place attributes with new data
         for key, value in data.items():
             setattr(place, key, value)
 
-        db.update(place)
+        repo.update(place)
+
+        after_commit(index_point, place)
+        after_commit(index_place, place)
 
         return place
     
@@ -156,20 +296,24 @@ class Place(Base):
         :param place_id: ID of the Place
         :return: Place instance or None if not found
         """
-        from src.persistence import db
+        from src.persistence import repo
 
-        return db.get(cls.__name__.lower(), place_id)
+        return repo.get(cls.__name__.lower(), place_id)
 
     @classmethod
-    def get_all(cls) -> list["Place"]:
+    def get_all(
+        cls, limit: int | None = None, offset: int = 0
+    ) -> list["Place"]:
         """
         Get all Place instances.
 
-        :return: List of all Place instances
+        :param limit: Maximum number of places to return, all if None
+        :param offset: Number of places to skip
+        :return: List of the selected Place instances
         """
-        from src.persistence import db
+        from src.persistence import repo
 
-        return db.get_all(cls.__name__.lower())
+        return repo.get_all(cls.__name__.lower(), limit, offset)
 
     @classmethod
     def delete(cls, place_id: str) -> bool:
@@ -179,11 +323,17 @@ class Place(Base):
         :param place_id: ID of the Place
         :return: True if the Place was deleted, False otherwise
         """
-        from src.persistence import db
+        from src.persistence import repo
+        from src.persistence.geo import unindex_point
+        from src.persistence.text import unindex_place
+        from src.persistence.unit_of_work import after_commit
 
         place = cls.get(place_id)
         if not place:
             return False
 
-        return db.delete(place)
+        after_commit(unindex_point, place_id)
+        after_commit(unindex_place, place_id)
+
+        return repo.delete(place)
     
\ No newline at end of file
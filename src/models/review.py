@@ -7,19 +7,38 @@ from src.models.user import User
 from src import db
 from sqlalchemy import Column, Text, Float, DateTime, Integer, ForeignKey
 from datetime import datetime
+from math import isfinite
 
 
 class Review(Base):
 
     __tablename__ = 'reviews'
     id = db.Column(db.Integer, primary_key=True)
-    place_id = db.Column(db.Integer, db.ForeignKey('places.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    place_id = db.Column(
+        db.Integer, db.ForeignKey('places.id'), nullable=False, index=True
+    )
+    user_id = db.Column(
+        db.Integer, db.ForeignKey('users.id'), nullable=False, index=True
+    )
     comment = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Read-only relationships, eagerly loaded to expand ?include= requests
+    place = db.relationship('Place', viewonly=True)
+    user = db.relationship('User', viewonly=True)
+
+    json_fields = (
+        "id",
+        "place_id",
+        "user_id",
+        "comment",
+        "rating",
+        "created_at",
+        "updated_at",
+    )
+
     def __init__(
         self, place_id: str, user_id: str, comment: str, rating: float, **kw
     ) -> None:
@@ -46,8 +65,18 @@ class Review(Base):
 
     @staticmethod
     def create(data: dict) -> "Review":
-        from src.persistence import db
+        from src.persistence import repo
+
+        new_review = Review.build(data)
 
+        repo.save(new_review)
+
+        Review.on_saved(new_review)
+
+        return new_review
+
+    @classmethod
+    def build(cls, data: dict) -> "Review":
         user: User | None = User.get(data["user_id"])
 
         if not user:
@@ -58,24 +87,76 @@ class Review(Base):
         if not place:
             raise ValueError(f"Place with ID {data['place_id']} not found")
 
-        new_review = Review(**data)
+        return Review(**data | {"rating": Review.check_rating(data["rating"])})
 
-        db.save(new_review)
+    @staticmethod
+    def check_rating(rating) -> float:
+        """The rating as a float, ValueError unless it is from 1 to 5"""
+        try:
+            rating = float(rating)
+        except (TypeError, ValueError):
+            raise ValueError("rating must be a number") from None
 
-        return new_review
+        if not (isfinite(rating) and 1 <= rating <= 5):
+            raise ValueError("rating must be between 1 and 5")
+
+        return rating
+
+    @classmethod
+    def on_saved(cls, review: "Review") -> None:
+        from src.persistence.ratings import add_rating
+        from src.persistence.text import index_review
+        from src.persistence.unit_of_work import after_commit
+
+        after_commit(index_review, review)
+        after_commit(add_rating, review)
 
     @staticmethod
     def update(review_id: str, data: dict) -> "Review | None":
-        from src.persistence import db
+        from src.persistence import repo
+        from src.persistence.ratings import add_rating, remove_rating
+        from src.persistence.text import index_review
+        from src.persistence.unit_of_work import after_commit
 
         review = Review.get(review_id)
 
         if not review:
             raise ValueError("Review not found")
 
+        if "rating" in data:
+            # Checked before the old rating leaves the aggregates
+            data = data | {"rating": Review.check_rating(data["rating"])}
+
+        # The old values, read before the review is changed
+        after_commit(
+            remove_rating, review.place_id, review.user_id, review.rating
+        )
+
         for key, value in data.items():
             setattr(review, key, value)
 
-        db.update(review)
+        repo.update(review)
+
+        after_commit(index_review, review)
+        after_commit(add_rating, review)
 
         return review
+
+    @classmethod
+    def delete(cls, review_id: str) -> bool:
+        from src.persistence import repo
+        from src.persistence.ratings import remove_rating
+        from src.persistence.text import unindex_review
+        from src.persistence.unit_of_work import after_commit
+
+        review = cls.get(review_id)
+
+        if not review:
+            return False
+
+        after_commit(unindex_review, review_id)
+        after_commit(
+            remove_rating, review.place_id, review.user_id, review.rating
+        )
+
+        return repo.delete(review)
@@ -7,6 +7,7 @@ from sqlalchemy import Column, String, DateTime, Boolean
 from sqlalchemy.sql import func
 from datetime import datetime
 from src import db, bcrypt
+from src.persistence.store import normalize_email
 
 
 class User(Base):
@@ -20,12 +21,22 @@ class User(Base):
     last_name = db.Column(db.String(50), nullable=True)
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-    updated_at = db.Column(db.DateTime, onupdate=db.func.current_timestamp())
+    updated_at = db.Column(db.DateTime, onupdate=datetime.now)
 
 
+    json_fields = (
+        "id",
+        "email",
+        "first_name",
+        "last_name",
+        "is_admin",
+        "created_at",
+        "updated_at",
+    )
+
     def __init__(self, email: str, first_name: str, last_name: str, password: str, is_admin: bool = False, **kw):
         super().__init__(**kw)
-        self.email = email
+        self.email = User.normalize_email(email)
         self.first_name = first_name
         self.last_name = last_name
         self.is_admin = is_admin
@@ -54,24 +65,37 @@ class User(Base):
         return bcrypt.check_password_hash(self.password, password)
     
     @staticmethod
-    def create(user: dict) -> "User":
-        from src.persistence import db
+    def normalize_email(email: str) -> str:
+        """The email as it is stored: case-folded, without surrounding
+        spaces, so the unique email column of the database and the email
+        index of the in-memory stores compare it the same way"""
+        if not isinstance(email, str):
+            raise ValueError("email must be a string")
+        return normalize_email(email)
 
-        users: list["User"] = User.get_all()
+    @staticmethod
+    def get_by_email(email: str) -> "User | None":
+        """User with the given email, whatever its case"""
+        from src.persistence import repo
 
-        for u in users:
-            if u.email == user["email"]:
-                raise ValueError("User already exists")
+        return repo.get_by_email(email)
+
+    @staticmethod
+    def create(user: dict) -> "User":
+        from src.persistence import repo
+
+        if User.get_by_email(user["email"]):
+            raise ValueError("User already exists")
 
         new_user = User(**user)
 
-        db.save(new_user)
+        repo.save(new_user)
 
         return new_user
 
     @staticmethod
     def update(user_id: str, data: dict) -> "User | None":
-        from src.persistence import db
+        from src.persistence import repo
 
         user: User | None = User.get(user_id)
 
@@ -79,12 +103,15 @@ class User(Base):
             return None
 
         if "email" in data:
-            user.email = data["email"]
+            owner = User.get_by_email(data["email"])
+            if owner is not None and owner.id != user.id:
+                raise ValueError("User already exists")
+            user.email = User.normalize_email(data["email"])
         if "first_name" in data:
             user.first_name = data["first_name"]
         if "last_name" in data:
             user.last_name = data["last_name"]
 
-        db.update(user)
+        repo.update(user)
 
         return user
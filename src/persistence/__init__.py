@@ -3,6 +3,7 @@ to be used based on the environment variable REPOSITORY_ENV_VAR."""
 
 import os
 
+from src.config import Config
 from src.persistence.repository import Repository
 from utils.constants import REPOSITORY_ENV_VAR
 
@@ -25,4 +26,14 @@ else:
 
     repo = MemoryRepository()
 
-print(f"Using {repo.__class__.__name__} as repository")
+# The repository itself, behind the entity cache when there is one
+backend: Repository = repo
+
+if Config.ENTITY_CACHE_SIZE > 0:
+    from src.persistence.cache import CachedRepository
+
+    repo = CachedRepository(
+        backend, Config.ENTITY_CACHE_SIZE, Config.ENTITY_CACHE_TTL
+    )
+
+print(f"Using {backend.__class__.__name__} as repository")
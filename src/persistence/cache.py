@@ -0,0 +1,222 @@
+""" This module exports the read-through entity cache that can wrap any
+repository.
+
+Objects read by id are kept in a bounded LRU, with an optional time to
+live, so that the detail endpoints and the Model.get calls of the
+controllers don't reach the database for the objects they read most.
+Every write going through the cache evicts the objects it touches; the
+other calls are handed to the wrapped repository unchanged.
+
+With the database repository, writes are committed at the end of their
+request, and a request reading an object meanwhile can cache the version
+being replaced: written objects are evicted again once the write is
+committed (see unit_of_work.after_commit). """
+
+import threading
+import time
+from collections import OrderedDict
+
+from src.persistence.repository import Repository
+from src.persistence.store import ModelStore
+from src.persistence.unit_of_work import after_commit
+
+
+class CachedRepository(Repository):
+    """
+    Repository serving get from a bounded LRU of the objects it read.
+
+    The cache keeps what repository.detach returns, a copy that outlives
+    the session of the request that read it for the database, and hands
+    out what repository.attach makes of it.
+    """
+
+    def __init__(
+        self, repository: Repository, size: int, ttl: float = 0
+    ) -> None:
+        """
+        Args:
+            repository (Repository): The repository to read through.
+            size (int): Most objects kept, the least recently used are
+                evicted first.
+            ttl (float): Seconds an object is served from the cache, 0 to
+                keep it until it is evicted or written.
+        """
+        self.repository = repository
+        self.size = size
+        self.ttl = ttl
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        """Attributes specific to the wrapped repository, such as its own
+        metrics"""
+        return getattr(self.repository, name)
+
+    def __len__(self) -> int:
+        """Number of cached objects"""
+        return len(self.__entries)
+
+    def _lookup(self, key: tuple):
+        """Cached object of key, or None on a miss"""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.metrics["misses"] += 1
+                return None
+
+            obj, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del self.__entries[key]
+                self.metrics["expirations"] += 1
+                self.metrics["misses"] += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.metrics["hits"] += 1
+            return obj
+
+    def _store(self, key: tuple, obj) -> None:
+        """Cache obj under key, evicting the least recently used"""
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self.__lock:
+            self.__entries[key] = (obj, expires)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.size:
+                self.__entries.popitem(last=False)
+                self.metrics["evictions"] += 1
+
+    def invalidate(self, *objs) -> list[tuple]:
+        """Evict objs from the cache, returning their keys"""
+        keys = []
+        for obj in objs:
+            model_name = ModelStore.model_name(obj)
+            keys.append((model_name, ModelStore.key(model_name, obj)))
+        self._evict(keys)
+        return keys
+
+    def _evict(self, keys: list[tuple]) -> None:
+        """Evict the objects of keys"""
+        with self.__lock:
+            for key in keys:
+                if self.__entries.pop(key, None) is not None:
+                    self.metrics["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Evict every object"""
+        with self.__lock:
+            self.__entries.clear()
+
+    def reload(self) -> None:
+        """Reload the wrapped repository, whose objects may all change"""
+        self.clear()
+        self.repository.reload()
+
+    def get(self, model_name: str, id: str):
+        """Get an object by id, from the cache when it holds it"""
+        key = (model_name, id)
+        cached = self._lookup(key)
+        if cached is not None:
+            return self.repository.attach(cached)
+
+        obj = self.repository.get(model_name, id)
+        if obj is not None:
+            self._store(key, self.repository.detach(obj))
+        return obj
+
+    def get_by_email(self, email: str):
+        """Get a user by email, from the wrapped repository"""
+        return self.repository.get_by_email(email)
+
+    def get_all(
+        self, model_name: str, limit: int | None = None, offset: int = 0
+    ) -> list:
+        """Get all objects of a model, or the page selected by limit/offset"""
+        return self.repository.get_all(model_name, limit, offset)
+
+    def count(self, model_name: str) -> int:
+        """Get the number of objects of a model"""
+        return self.repository.count(model_name)
+
+    def collection_version(self, model_name: str) -> tuple:
+        """Version of a model's objects in the wrapped repository"""
+        return self.repository.collection_version(model_name)
+
+    def get_page(
+        self, model_name: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """Get the objects ordered by (created_at, id) following after"""
+        return self.repository.get_page(model_name, limit, after)
+
+    def find(self, model_name: str, **criteria) -> list:
+        """Get the objects of a model matching the criteria"""
+        return self.repository.find(model_name, **criteria)
+
+    def find_one(self, model_name: str, **criteria):
+        """Get the first object of a model matching the criteria"""
+        return self.repository.find_one(model_name, **criteria)
+
+    def find_many(self, model_name: str, field: str, values: list) -> list:
+        """Get the objects of a model whose field holds any of the values"""
+        return self.repository.find_many(model_name, field, values)
+
+    def expand(self, model_name: str, objs: list, include: dict) -> list:
+        """Dictionaries of objs with the related objects of include"""
+        return self.repository.expand(model_name, objs, include)
+
+    def save(self, obj, *args, **kwargs) -> None:
+        """Save an object"""
+        keys = self.invalidate(obj)
+        self.repository.save(obj, *args, **kwargs)
+        after_commit(self._evict, keys)
+
+    def update(self, obj) -> None:
+        """Update an object, evicting the version the cache holds"""
+        keys = self.invalidate(obj)
+        self.repository.update(obj)
+        after_commit(self._evict, keys)
+
+    def delete(self, obj) -> bool:
+        """Delete an object, evicting it from the cache"""
+        keys = self.invalidate(obj)
+        deleted = self.repository.delete(obj)
+        after_commit(self._evict, keys)
+        return deleted
+
+    def save_many(self, objs: list) -> None:
+        """Save several objects"""
+        keys = self.invalidate(*objs)
+        self.repository.save_many(objs)
+        after_commit(self._evict, keys)
+
+    def update_many(self, objs: list) -> None:
+        """Update several objects, evicting them from the cache"""
+        keys = self.invalidate(*objs)
+        self.repository.update_many(objs)
+        after_commit(self._evict, keys)
+
+    def delete_many(self, objs: list) -> int:
+        """Delete several objects, evicting them from the cache"""
+        keys = self.invalidate(*objs)
+        deleted = self.repository.delete_many(objs)
+        after_commit(self._evict, keys)
+        return deleted
+
+    def detach(self, obj):
+        """Copy of obj a cache can keep, made by the wrapped repository"""
+        return self.repository.detach(obj)
+
+    def attach(self, obj):
+        """Object the current request can use, made by the wrapped
+        repository"""
+        return self.repository.attach(obj)
+
+    def flush(self) -> None:
+        """Persist the changes the wrapped repository still buffers"""
+        self.repository.flush()
@@ -0,0 +1,142 @@
+""" This module exports the group commit used by the repositories that
+persist their data in files, and its durability settings. """
+
+import atexit
+import os
+import threading
+import time
+import traceback
+from typing import Callable
+
+from utils.constants import (
+    FLUSH_EVERY_ENV_VAR,
+    FLUSH_INTERVAL_MS_ENV_VAR,
+    FSYNC_ENV_VAR,
+    GROUP_COMMIT_ENV_VAR,
+)
+
+# Whether changes are persisted by a background flusher
+GROUP_COMMIT = os.getenv(GROUP_COMMIT_ENV_VAR, "false").lower() == "true"
+
+# When the written files are synced to the disk:
+# - always: before the change returns, waiting for the flusher in group
+#   commit mode so that the writers of a batch share one fsync
+# - batch: once per flush, a crash loses the changes of the last interval
+# - os: never, the operating system writes its cache back when it wants
+FSYNC_POLICIES = ("always", "batch", "os")
+FSYNC = os.getenv(FSYNC_ENV_VAR, "os").lower()
+
+# A group flush happens every FLUSH_INTERVAL_MS or every FLUSH_EVERY changes
+FLUSH_INTERVAL_MS = int(os.getenv(FLUSH_INTERVAL_MS_ENV_VAR, 50))
+FLUSH_EVERY = int(os.getenv(FLUSH_EVERY_ENV_VAR, 100))
+
+
+class GroupCommit:
+    """
+    Persists the changes of a repository, one by one or by batches.
+
+    The repository keeps its changes in memory and calls commit after
+    each one; write(sync) must then persist everything not persisted yet,
+    and sync it to the disk when sync is True.
+
+    Without group commit, commit calls write right away. With group
+    commit, a background thread calls write every interval_ms or every
+    flush_every changes, so the requests don't wait for the disk unless
+    the fsync policy is "always".
+    """
+
+    def __init__(
+        self,
+        write: Callable[[bool], None],
+        group: bool = GROUP_COMMIT,
+        fsync: str = FSYNC,
+        interval_ms: int = FLUSH_INTERVAL_MS,
+        flush_every: int = FLUSH_EVERY,
+    ) -> None:
+        """
+        Initialize the commit of a repository.
+
+        Args:
+            write (Callable): Persists the pending changes, given whether
+                to sync them.
+            group (bool): Whether to flush from a background thread.
+            fsync (str): One of FSYNC_POLICIES.
+            interval_ms (int): The maximum delay of a group flush.
+            flush_every (int): The number of changes starting a flush.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+
+        self.group = group
+        self.fsync = fsync
+        self.interval = interval_ms / 1000
+        self.flush_every = flush_every
+        self.__write = write
+        self.__condition = threading.Condition()
+        self.__flushing = threading.Lock()
+        # Numbers of the last committed and of the last persisted change
+        self.__committed = 0
+        self.__persisted = 0
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of committed changes not persisted yet"""
+        return self.__committed - self.__persisted
+
+    def commit(self) -> None:
+        """Persist a change the repository just made, or schedule it"""
+        if not self.group:
+            with self.__condition:
+                self.__committed += 1
+            self.flush()
+            return
+
+        with self.__condition:
+            self.__committed += 1
+            change = self.__committed
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="group-commit", daemon=True
+                )
+                self.__thread.start()
+                atexit.register(self.flush)
+            if self.pending >= self.flush_every:
+                self.__condition.notify_all()
+
+            if self.fsync == "always":
+                self.__condition.notify_all()
+                while self.__persisted < change:
+                    self.__condition.wait()
+
+    def flush(self) -> None:
+        """Persist every committed change now"""
+        with self.__flushing:
+            with self.__condition:
+                change = self.__committed
+                if change == self.__persisted:
+                    return
+
+            self.__write(self.fsync != "os")
+
+            with self.__condition:
+                self.__persisted = max(self.__persisted, change)
+                self.__condition.notify_all()
+
+    def __run(self) -> None:
+        """Flush the committed changes until the process exits"""
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(
+                    lambda: self.pending >= self.flush_every
+                    or (self.pending and self.fsync == "always"),
+                    timeout=self.interval,
+                )
+                if not self.pending:
+                    continue
+            try:
+                self.flush()
+            except OSError:
+                # Keep the changes pending and retry after a while
+                traceback.print_exc()
+                time.sleep(self.interval)
@@ -9,6 +9,7 @@
     - save
     - update
     - delete
+    - find / find_one
     - reload (which can be empty)
 
 Imports:
@@ -26,10 +27,20 @@ Methods:
    - Purpose: Typically not needed for database repositories.
    - No implementation provided.
 
-2. `get_all(model_name: str) -> list`:
+2. `get_all(model_name: str, limit=None, offset=0) -> list`:
    - Purpose: Retrieves all objects of a given model.
-   - Parameters: `model_name` - The name of the model.
-   - Returns: A list of all objects of the specified model.
+   - Parameters:
+     - `model_name` - The name of the model.
+     - `limit`, `offset` - Optional page, pushed down as LIMIT/OFFSET
+       over the primary key order.
+   - Returns: A list of the selected objects of the specified model.
+
+   `count(model_name: str) -> int` returns the number of rows of a model.
+
+   `get_page(model_name: str, limit: int, after=None) -> list` returns the
+   rows ordered by (created_at, id) that follow the `after` pair, so deep
+   pages are served by a range scan on the (created_at, id) index instead
+   of skipping OFFSET rows.
 
 3. `get(model_name: str, obj_id: str) -> Base | None`:
    - Purpose: Retrieves an object by its ID.
@@ -41,72 +52,278 @@ Methods:
 4. `save(obj: Base) -> None`:
    - Purpose: Saves an object to the database.
    - Parameters: `obj` - The object to be saved.
-   - Commits the transaction.
+   - Commits the transaction, or leaves it to the unit of work of the
+     current request (see `unit_of_work.py`), which commits it once.
 
 5. `update(obj: Base) -> None`:
    - Purpose: Updates an existing object in the database.
    - Parameters: `obj` - The object to be updated.
-   - Commits the transaction.
+   - Commits the transaction, or leaves it to the unit of work.
 
 6. `delete(obj: Base) -> bool`:
    - Purpose: Deletes an object from the database.
    - Parameters: `obj` - The object to be deleted.
-   - Commits the transaction.
+   - Commits the transaction, or leaves it to the unit of work.
    - Returns: `True` after successful deletion.
 
-7. `get_by_email(email: str) -> Base | None`:
-   - Purpose: Retrieves a user object by email.
+7. `find(model_name: str, **criteria) -> list`:
+   - Purpose: Retrieves the objects of a model matching the criteria.
+   - Parameters:
+     - `model_name` - The name of the model.
+     - `criteria` - Column names and the values they must equal.
+   - Returns: A list of the matching objects.
+   - The criteria are turned into a WHERE clause, so the filtering is
+     done by the database using its indexes.
+
+8. `find_one(model_name: str, **criteria) -> Base | None`:
+   - Purpose: Retrieves the first object of a model matching the criteria.
+   - Returns: The object if found, otherwise `None`.
+
+9. `save_many(objs)`, `update_many(objs)`, `delete_many(objs) -> int`:
+   - Purpose: Bulk writes, committed as one transaction. The SQLAlchemy
+     unit of work groups the inserts of each table into one executemany.
+
+10. `detach(obj)` / `attach(obj)`:
+   - Purpose: Let `CachedRepository` keep a detached copy of the columns
+     of an object across requests and merge it back into the session of
+     the current one, without a query (see `cache.py`).
+
+11. `get_by_email(email: str) -> Base | None`:
+   - Purpose: Retrieves a user object by email, whatever its case.
    - Parameters: `email` - The email of the user.
+   - Compares the case-folded email with the stored one, which `User`
+     folds on write, through the unique index of the email column.
    - Returns: The user object if found, otherwise `None`.
    - Catches `NoResultFound` exception and returns `None` if no user is found.
+
+12. `collection_version(model_name: str) -> tuple`:
+   - Purpose: Version of a model the ETags of lists are derived from.
+   - Returns: `(version,)`, its row of the `collection_versions` table,
+     incremented by each transaction writing to the model: one primary
+     key lookup, the same in every worker.
 """
 
 from src.models.base import Base
+from src.persistence import unit_of_work
+from src.persistence.relations import to_dicts
 from src.persistence.repository import Repository
+from src.persistence.store import normalize_email
+from src.persistence.versions import versions_table
 from src import db
+from sqlalchemy import and_, inspect, or_, select
+from sqlalchemy.orm import joinedload, make_transient_to_detached, selectinload
 from sqlalchemy.orm.exc import NoResultFound
-from src.models import User
+from src.models import Amenity, City, Country, Place, Review, User
+from src.models.amenity import PlaceAmenity
+
+
+def keyset_page(query, model, limit: int, after: tuple | None = None):
+    """Restrict a SQLAlchemy query to the (created_at, id) keyset page
+    following after, so the database serves it with an index range scan"""
+    if after is not None:
+        created_at, obj_id = after
+        query = query.filter(
+            or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > obj_id),
+            )
+        )
+
+    return query.order_by(model.created_at, model.id).limit(limit).all()
+
+
+def eager_loads(model, include: dict, parent=None) -> list:
+    """Loader options of the relations of include: joinedload for single
+    objects, selectinload for lists"""
+    options = []
+    for name, subtree in include.items():
+        attribute = getattr(model, name)
+        prop = attribute.property
+        loader = selectinload if prop.uselist else joinedload
+        option = (
+            loader(attribute) if parent is None
+            else getattr(parent, loader.__name__)(attribute)
+        )
+        nested = eager_loads(prop.mapper.class_, subtree, option)
+        options.extend(nested or [option])
+    return options
+
+
+def related_dicts(objs: list, include: dict) -> list[dict]:
+    """to_dict of objs with the loaded relations of include, each model
+    converted at once (see Base.to_dict_many)"""
+    dicts = to_dicts(objs)
+    for name, subtree in include.items():
+        values = [getattr(obj, name) for obj in objs]
+        related = {}
+        for value in values:
+            for obj in value if isinstance(value, list) else [value]:
+                if obj is not None:
+                    related[id(obj)] = obj
+        converted = dict(zip(
+            related, related_dicts(list(related.values()), subtree)
+        ))
+        for data, value in zip(dicts, values):
+            if isinstance(value, list):
+                data[name] = [converted[id(v)] for v in value]
+            else:
+                data[name] = None if value is None else converted[id(value)]
+    return dicts
+
 
 class DBRepository(Repository):
     """Database repository implementation"""
 
+    models = {
+        "amenity": Amenity,
+        "city": City,
+        "country": Country,
+        "place": Place,
+        "placeamenity": PlaceAmenity,
+        "review": Review,
+        "user": User,
+    }
+
     def reload(self) -> None:
         """Reload data to the repository"""
         # This method is not typically needed for database repositories
         pass
 
-    def get_all(self, model_name: str) -> list:
-        """Get all objects of a model"""
-        model_class = Base._decl_class_registry.get(model_name.capitalize())
+    def get_all(
+        self, model_name: str, limit: int | None = None, offset: int = 0
+    ) -> list:
+        """Get all objects of a model, or the page selected by limit/offset"""
+        model_class = self.models.get(model_name)
+        if not model_class:
+            return []
+
+        query = model_class.query
+        if limit is not None or offset:
+            # Pages are only stable over a deterministic order
+            query = query.order_by(*model_class.__mapper__.primary_key)
+            query = query.offset(offset).limit(limit)
+        return query.all()
+
+    def count(self, model_name: str) -> int:
+        """Get the number of objects of a model"""
+        model_class = self.models.get(model_name)
+        if model_class:
+            return model_class.query.count()
+        return 0
+
+    def collection_version(self, model_name: str) -> tuple:
+        """Version of a model in the collection_versions table, the same
+        for every worker and only changed by committed writes"""
+        version = db.session.execute(
+            select(versions_table.c.version)
+            .where(versions_table.c.model == model_name)
+        ).scalar()
+        return (version or 0,)
+
+    def get_page(
+        self, model_name: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """Get the page of objects ordered by (created_at, id) following
+        the given (created_at, id) pair, as an index range scan"""
+        model_class = self.models.get(model_name)
         if model_class:
-            return model_class.query.all()
+            return keyset_page(model_class.query, model_class, limit, after)
         return []
 
     def get(self, model_name: str, obj_id: str) -> Base | None:
         """Get an object by id"""
-        model_class = Base._decl_class_registry.get(model_name.capitalize())
+        model_class = self.models.get(model_name)
         if model_class:
             return model_class.query.get(obj_id)
         return None
 
+    def find(self, model_name: str, **criteria) -> list:
+        """Get the objects of a model matching the criteria"""
+        model_class = self.models.get(model_name)
+        if model_class:
+            return model_class.query.filter_by(**criteria).all()
+        return []
+
+    def find_one(self, model_name: str, **criteria) -> Base | None:
+        """Get the first object of a model matching the criteria"""
+        model_class = self.models.get(model_name)
+        if model_class:
+            return model_class.query.filter_by(**criteria).first()
+        return None
+
+    def find_many(self, model_name: str, field: str, values: list) -> list:
+        """Get the objects of a model whose field holds any of the values,
+        with one IN query"""
+        model_class = self.models.get(model_name)
+        if model_class and values:
+            column = getattr(model_class, field)
+            return model_class.query.filter(column.in_(values)).all()
+        return []
+
+    def expand(self, model_name: str, objs: list, include: dict) -> list:
+        """Dictionaries of objs with their related objects, eagerly loaded
+        by one query: joined for the single objects, one more SELECT ... IN
+        per list of objects"""
+        model_class = self.models.get(model_name)
+        if model_class and objs and include:
+            keys = [getattr(obj, "id") for obj in objs]
+            # Already loaded objects get their relationships populated
+            model_class.query.options(
+                *eager_loads(model_class, include)
+            ).filter(model_class.id.in_(keys)).all()
+        return related_dicts(objs, include)
+
+    def detach(self, obj: Base) -> Base:
+        """Copy of the columns of obj, detached from any session: the
+        rollback or commit ending the request would expire obj itself"""
+        mapper = inspect(obj).mapper
+        copy = mapper.class_manager.new_instance()
+        for attribute in mapper.column_attrs:
+            copy.__dict__[attribute.key] = getattr(obj, attribute.key)
+        make_transient_to_detached(copy)
+        return copy
+
+    def attach(self, obj: Base) -> Base:
+        """Instance of the current session holding the state of a detached
+        copy, without querying the database"""
+        return db.session.merge(obj, load=False)
+
     def save(self, obj: Base) -> None:
         """Save an object"""
         db.session.add(obj)
-        db.session.commit()
+        unit_of_work.commit()
 
     def update(self, obj: Base) -> None:
         """Update an object"""
-        db.session.commit()
+        unit_of_work.commit()
 
     def delete(self, obj: Base) -> bool:
         """Delete an object"""
         db.session.delete(obj)
-        db.session.commit()
+        unit_of_work.commit()
         return True
     
+    def save_many(self, objs: list) -> None:
+        """Save several objects in one transaction, the rows of each
+        table inserted with one executemany"""
+        db.session.add_all(objs)
+        unit_of_work.commit()
+
+    def update_many(self, objs: list) -> None:
+        """Update several objects in one transaction"""
+        unit_of_work.commit()
+
+    def delete_many(self, objs: list) -> int:
+        """Delete several objects in one transaction"""
+        for obj in objs:
+            db.session.delete(obj)
+        unit_of_work.commit()
+        return len(objs)
+
     def get_by_email(self, email: str) -> Base | None:
-        """Get a user object by email"""
+        """Get a user object by email, whatever its case, with the
+        unique index of the email column"""
         try:
-            return User.query.filter_by(email=email).one()
+            return User.query.filter_by(email=normalize_email(email)).one()
         except NoResultFound:
             return None
@@ -1,12 +1,22 @@
-""" This module exports a Repository that persists data in a JSON file. """
+""" This module exports a Repository that persists data in JSON Lines
+files, and the converter of the single JSON document it used to write. """
 
 from datetime import datetime
 import json
 import os
+import threading
+import time
 from sqlalchemy.orm import Session
 from src.models.base import Base
+from src.persistence.commit import GroupCommit
+from src.persistence.db import keyset_page
 from src.persistence.repository import Repository
-from utils.constants import FILE_STORAGE_FILENAME
+from src.persistence.store import ModelStore, normalize_email
+from utils.constants import (
+    FILE_COMPACT_MIN_BYTES,
+    FILE_COMPACT_RATIO,
+    FILE_STORAGE_FILENAME,
+)
 
 from src.models.amenity import Amenity, PlaceAmenity
 from src.models.city import City
@@ -22,9 +32,27 @@ class DataManager(Repository):
     This class provides methods for CRUD operations (Create, Read, Update, Delete) on data objects.
     It can switch between file-based storage and database storage based on an environment variable.
 
+    File-based storage keeps a snapshot of all the data in __filename, one
+    JSON object per line ({"model": ..., "data": ...}), so that it is read
+    and written as a stream, one object at a time, and
+    appends every change to a write-ahead log next to it (__filename + ".log"),
+    so a write costs the same no matter how much data is stored. Once the log
+    is at least compact_min_bytes long and compact_ratio times the snapshot,
+    a background thread compacts it into a new snapshot (see compact): the
+    rewrite is paid for by as many bytes of appends as it writes, and the
+    log replayed by reload over the snapshot stays shorter than the snapshot.
+    The log is written, and synced to the disk, as set by GROUP_COMMIT and
+    FSYNC (see commit.py).
+
     Attributes:
         __filename (str): The filename for file-based storage.
-        __data (dict): A dictionary to store data in memory for file-based operations.
+        __data (ModelStore): The indexed in-memory store for file-based
+            operations.
+        compact_min_bytes (int): The minimum size of the log to compact.
+        compact_ratio (float): The minimum size of the log to compact,
+            relative to the snapshot.
+        compaction_metrics (dict): The number of compactions, the bytes
+            they reclaimed and their durations.
         use_database (bool): Flag to determine whether to use database or file-based storage.
         db_session (Session): SQLAlchemy database session for database operations.
 
@@ -36,15 +64,11 @@ class DataManager(Repository):
     """
 
     __filename = FILE_STORAGE_FILENAME
-    __data: dict[str, list] = {
-        "country": [],
-        "user": [],
-        "amenity": [],
-        "city": [],
-        "review": [],
-        "place": [],
-        "placeamenity": [],
-    }
+    __data: ModelStore = ModelStore()
+    # Serializes the writes of the data file and the log
+    __file_lock = threading.RLock()
+    compact_min_bytes = FILE_COMPACT_MIN_BYTES
+    compact_ratio = FILE_COMPACT_RATIO
 
     models = {
         "amenity": Amenity,
@@ -56,45 +80,309 @@ class DataManager(Repository):
         "user": User,
     }
 
-    def __init__(self, db_session: Session = None) -> None:
+    def __init__(
+        self, db_session: Session = None, filename: str = None
+    ) -> None:
         """
         Initialize the DataManager.
 
         Args:
             db_session (Session, optional): SQLAlchemy database session for database operations.
+            filename (str, optional): The file of the file-based storage,
+                FILE_STORAGE_FILENAME by default. A DataManager given its
+                own file also gets its own in-memory store.
         """
         self.use_database = os.getenv('USE_DATABASE', 'false').lower() == 'true'
         self.db_session = db_session
+        if filename is not None:
+            self.__filename = filename
+            self.__data = ModelStore()
+        self.__log_filename = f"{self.__filename}.log"
+        self.__segment_filename = f"{self.__log_filename}.1"
+        self.__log = None
+        self.__log_bytes = 0
+        self.__snapshot_bytes = 0
+        self.__compacting = threading.Lock()
+        self.compaction_metrics = {
+            "compactions": 0,
+            "bytes_reclaimed": 0,
+            "last_duration": 0.0,
+            "total_duration": 0.0,
+        }
+        self.__pending: list[str] = []
+        self.__commit = GroupCommit(self._write_log)
         if not self.use_database:
             self.reload()
 
+    @staticmethod
+    def _serialize(obj: Base) -> dict:
+        """
+        Serialize an object as it is stored in the snapshot and the log.
+
+        Args:
+            obj (Base): The object to serialize.
+
+        Returns:
+            dict: The persisted attributes of the object.
+        """
+        return obj.to_record()
+
     def _save_to_file(self):
         """
-        Save the current data to a file in JSON format.
-        This method is used for file-based storage.
+        Write a snapshot of all the data in JSON format and start a new log,
+        compacting the log in the calling thread.
         """
-        serialized = {
-            k: [v.to_dict() for v in l if isinstance(v, Base)]
-            for k, l in self.__data.items()
-        }
+        self.compact()
+
+    def compact(self):
+        """
+        Replace the snapshot and the log by a snapshot of the live objects.
+
+        The log is renamed to a segment (__filename + ".log.1") and a new log
+        started while the store is copied, which is the only time writers
+        wait. The snapshot is then serialized and written to a temporary
+        file that replaces the previous snapshot atomically, and the segment
+        is deleted. A crash at any point leaves files that reload reads
+        back: the old or new snapshot, the segment if it is still there,
+        then the log, whose replay over a newer snapshot has no effect.
+        """
+        with self.__compacting:
+            started = time.perf_counter()
+
+            with self.__file_lock:
+                if self.__log is not None:
+                    self.__log.close()
+                    self.__log = None
+                if os.path.exists(self.__log_filename):
+                    self._append_segment()
+                tables = self.__data.snapshot()
+                self.__log_bytes = 0
+
+            before = (
+                self._size(self.__filename)
+                + self._size(self.__segment_filename)
+            )
+
+            temporary = f"{self.__filename}.tmp"
+            with open(temporary, "w") as file:
+                for model, objs in tables.items():
+                    for obj in objs:
+                        line = {"model": model, "data": self._serialize(obj)}
+                        file.write(json.dumps(line) + "\n")
+                if self.__commit.fsync != "os":
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(temporary, self.__filename)
+            if os.path.exists(self.__segment_filename):
+                os.remove(self.__segment_filename)
+
+            self.__snapshot_bytes = self._size(self.__filename)
+            duration = time.perf_counter() - started
+            metrics = self.compaction_metrics
+            metrics["compactions"] += 1
+            reclaimed = max(0, before - self.__snapshot_bytes)
+            metrics["bytes_reclaimed"] += reclaimed
+            metrics["last_duration"] = duration
+            metrics["total_duration"] += duration
+
+    def _append_segment(self):
+        """
+        Move the log to the segment, after the changes a compaction cut
+        short by a crash left there.
+        """
+        if not os.path.exists(self.__segment_filename):
+            os.replace(self.__log_filename, self.__segment_filename)
+            return
+
+        with open(self.__log_filename, "r") as log, open(
+            self.__segment_filename, "a"
+        ) as segment:
+            for line in log:
+                segment.write(line)
+        os.remove(self.__log_filename)
+
+    @staticmethod
+    def _size(filename: str) -> int:
+        """
+        Size of a file in bytes, 0 if it doesn't exist.
+        """
+        try:
+            return os.path.getsize(filename)
+        except FileNotFoundError:
+            return 0
+
+    def _needs_compaction(self) -> bool:
+        """
+        Whether the log is big enough to be compacted: at least
+        compact_min_bytes and compact_ratio times the snapshot.
+        """
+        return (
+            self.__log_bytes >= self.compact_min_bytes
+            and self.__log_bytes >= self.compact_ratio * self.__snapshot_bytes
+        )
+
+    def _write_log(self, sync: bool):
+        """
+        Append the pending changes to the write-ahead log, starting a
+        background compaction once the log is big enough.
+
+        Args:
+            sync (bool): Whether to sync the log to the disk.
+        """
+        with self.__file_lock:
+            if not self.__pending:
+                return
+            if self.__log is None:
+                self.__log = open(self.__log_filename, "a")
+            self.__log.writelines(self.__pending)
+            self.__log.flush()
+            if sync:
+                os.fsync(self.__log.fileno())
+
+            self.__log_bytes += sum(len(line) for line in self.__pending)
+            self.__pending.clear()
+
+            if self._needs_compaction() and not self.__compacting.locked():
+                threading.Thread(
+                    target=self.compact, name="log-compaction", daemon=True
+                ).start()
+
+    def flush(self):
+        """
+        Write the changes still waiting for the group commit.
+        """
+        self.__commit.flush()
+
+    def _log(self, operation: str, obj: Base):
+        """
+        Record a change for the write-ahead log. Called with the file lock
+        held since the change was made, so the log keeps the order of the
+        changes; the group commit writes it afterwards.
+
+        Args:
+            operation (str): "save", "update" or "delete".
+            obj (Base): The changed object.
+        """
+        model_name = ModelStore.model_name(obj)
+        if operation == "delete":
+            entry = {"op": operation, "model": model_name,
+                     "key": ModelStore.key(model_name, obj)}
+        else:
+            entry = {"op": operation, "model": model_name,
+                     "data": self._serialize(obj)}
+
+        self.__pending.append(json.dumps(entry) + "\n")
+
+    def _load(self, model: str, item: dict) -> Base:
+        """
+        Build an object from its serialized attributes, without calling
+        the constructor of its model.
+
+        Args:
+            model (str): The name of the model of the object.
+            item (dict): The serialized attributes.
 
-        with open(self.__filename, "w") as file:
-            json.dump(serialized, file)
+        Returns:
+            Base: The object.
+        """
+        return self.models[model].from_record(item)
 
-    def get_all(self, model_name: str):
+    def _replay(self, filename: str, log: bool = True):
+        """
+        Apply the lines of a snapshot or of a log to the store, one at a
+        time. Snapshot lines and saved or updated objects are upserted and
+        deleted objects removed, so replaying a change twice has no further
+        effect. A last log line cut short by a crash is cut off the file.
+
+        Args:
+            filename (str): The file to replay.
+            log (bool): Whether the file is a log rather than a snapshot.
+        """
+        try:
+            file = open(filename, "r")
+        except FileNotFoundError:
+            return
+
+        with file:
+            valid = 0
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    if not log:
+                        raise
+                    break
+                valid += len(line)
+
+                if entry.get("op") == "delete":
+                    obj = self.__data.get(entry["model"], entry["key"])
+                    if obj is not None:
+                        self.__data.remove(obj)
+                else:
+                    obj = self._load(entry["model"], entry["data"])
+                    if not self.__data.replace(obj):
+                        self.__data.add(obj)
+
+        if valid < self._size(filename):
+            with open(filename, "r+") as file:
+                file.truncate(valid)
+
+    def get_all(self, model_name: str, limit: int = None, offset: int = 0):
         """
         Retrieve all objects of a specific model.
 
         Args:
             model_name (str): The name of the model to retrieve.
+            limit (int, optional): The maximum number of objects to return.
+            offset (int, optional): The number of objects to skip.
+
+        Returns:
+            list: A list of the objects of the specified model.
+        """
+        if self.use_database:
+            model = self.models[model_name]
+            query = self.db_session.query(model)
+            if limit is not None or offset:
+                query = query.order_by(*model.__mapper__.primary_key)
+                query = query.offset(offset).limit(limit)
+            return query.all()
+        else:
+            return self.__data.all(model_name, limit, offset)
+
+    def count(self, model_name: str):
+        """
+        Count the objects of a specific model.
+
+        Args:
+            model_name (str): The name of the model.
+
+        Returns:
+            int: The number of objects of the model.
+        """
+        if self.use_database:
+            return self.db_session.query(self.models[model_name]).count()
+        else:
+            return self.__data.count(model_name)
+
+    def get_page(self, model_name: str, limit: int, after: tuple = None):
+        """
+        Retrieve a page of objects ordered by (created_at, id).
+
+        Args:
+            model_name (str): The name of the model.
+            limit (int): The maximum number of objects to return.
+            after (tuple, optional): The (created_at, id) of the last object
+                of the previous page, None for the first page.
 
         Returns:
-            list: A list of all objects of the specified model.
+            list: The objects of the page.
         """
         if self.use_database:
-            return self.db_session.query(self.models[model_name]).all()
+            model = self.models[model_name]
+            query = self.db_session.query(model)
+            return keyset_page(query, model, limit, after)
         else:
-            return self.__data.get(model_name, [])
+            return self.__data.page_after(model_name, limit, after)
 
     def get(self, model_name: str, obj_id: str):
         """
@@ -110,10 +398,82 @@ class DataManager(Repository):
         if self.use_database:
             return self.db_session.query(self.models[model_name]).get(obj_id)
         else:
-            for obj in self.get_all(model_name):
-                if obj.id == obj_id:
-                    return obj
-        return None
+            return self.__data.get(model_name, obj_id)
+
+    def get_by_email(self, email: str):
+        """
+        Get a user by email, whatever its case.
+
+        Args:
+            email (str): The email of the user.
+
+        Returns:
+            User: The user from the email index, or None if not found.
+        """
+        if self.use_database:
+            return self.db_session.query(User).filter_by(
+                email=normalize_email(email)
+            ).first()
+        else:
+            return self.__data.get_unique("user", "email", email)
+
+    def find(self, model_name: str, **criteria):
+        """
+        Get the objects of a model matching all the given attribute values.
+
+        Args:
+            model_name (str): The name of the model.
+            **criteria: Attribute names and the values they must have.
+
+        Returns:
+            list: The matching objects, read from the secondary indexes
+            when the criteria cover one.
+        """
+        if self.use_database:
+            return self.db_session.query(
+                self.models[model_name]
+            ).filter_by(**criteria).all()
+        else:
+            return self.__data.lookup(model_name, **criteria)
+
+    def find_one(self, model_name: str, **criteria):
+        """
+        Get the first object of a model matching the given attribute values.
+
+        Args:
+            model_name (str): The name of the model.
+            **criteria: Attribute names and the values they must have.
+
+        Returns:
+            Base: The first matching object, or None if there is none.
+        """
+        if self.use_database:
+            return self.db_session.query(
+                self.models[model_name]
+            ).filter_by(**criteria).first()
+        else:
+            return next(iter(self.__data.lookup(model_name, **criteria)), None)
+
+    def find_many(self, model_name: str, field: str, values: list) -> list:
+        """
+        Get the objects of a model whose field holds any of the values.
+
+        Args:
+            model_name (str): The name of the model.
+            field (str): The attribute to match.
+            values (list): The values to look for.
+
+        Returns:
+            list: The matching objects, found with one query or one pass
+            over the store.
+        """
+        if self.use_database:
+            model = self.models[model_name]
+            return self.db_session.query(model).filter(
+                getattr(model, field).in_(values)
+            ).all()
+        else:
+            return self.__data.lookup_many(model_name, field, values)
 
     def reload(self):
         """
@@ -121,23 +481,18 @@ class DataManager(Repository):
         This method is used for file-based storage to load data into memory.
         """
         if not self.use_database:
-            file_data = {}
-            try:
-                with open(self.__filename, "r") as file:
-                    file_data = json.load(file)
-            except (FileNotFoundError, json.JSONDecodeError):
-                pass
+            # Data written before JSON Lines is converted once
+            legacy = legacy_filename(self.__filename)
+            if not os.path.exists(self.__filename) and os.path.exists(legacy):
+                convert_json_file(legacy, self.__filename)
 
-            for model, data in file_data.items():
-                for item in data:
-                    instance: Base = self.models[model](**item)
+            # The snapshot, then the changes logged after it
+            self._replay(self.__filename, log=False)
+            self._replay(self.__segment_filename)
+            self._replay(self.__log_filename)
 
-                    if "created_at" in item:
-                        instance.created_at = datetime.fromisoformat(item["created_at"])
-                    if "updated_at" in item:
-                        instance.updated_at = datetime.fromisoformat(item["updated_at"])
-
-                    self.save(data=instance, save_to_file=False)
+            self.__log_bytes = self._size(self.__log_filename)
+            self.__snapshot_bytes = self._size(self.__filename)
 
     def save(self, data: Base, save_to_file=True):
         """
@@ -154,15 +509,14 @@ class DataManager(Repository):
             self.db_session.add(data)
             self.db_session.commit()
         else:
-            model: str = data.__class__.__name__.lower()
-
-            if model not in self.__data:
-                self.__data[model] = []
-
-            self.__data[model].append(data)
-
-            if save_to_file:
-                self._save_to_file()
+            # An object whose key is already stored isn't logged
+            with self.__file_lock:
+                logged = self.__data.add(data) and save_to_file
+                if logged:
+                    self._log("save", data)
+
+            if logged:
+                self.__commit.commit()
         return data
 
     def update(self, obj: Base):
@@ -180,16 +534,17 @@ class DataManager(Repository):
             self.db_session.commit()
             return obj
         else:
-            cls = obj.__class__.__name__.lower()
+            # Set before replacing, compact stores copy the object
+            updated_at, obj.updated_at = obj.updated_at, datetime.now()
 
-            for i, o in enumerate(self.__data[cls]):
-                if o.id == obj.id:
-                    obj.updated_at = datetime.now()
-                    self.__data[cls][i] = obj
-                    self._save_to_file()
-                    return obj
+            with self.__file_lock:
+                if not self.__data.replace(obj):
+                    obj.updated_at = updated_at
+                    return None
+                self._log("update", obj)
 
-        return None
+            self.__commit.commit()
+            return obj
 
     def delete(self, obj: Base):
         """
@@ -206,13 +561,125 @@ class DataManager(Repository):
             self.db_session.commit()
             return True
         else:
-            class_name = obj.__class__.__name__.lower()
+            with self.__file_lock:
+                if not self.__data.remove(obj):
+                    return False
+                self._log("delete", obj)
 
-            if obj not in self.__data[class_name]:
-                return False
+            self.__commit.commit()
 
-            self.__data[class_name].remove(obj)
+            return True
 
-            self._save_to_file()
+    def save_many(self, objs: list) -> None:
+        """
+        Save several objects with one commit, one write of the log.
 
-            return True
+        Args:
+            objs (list): The objects to save.
+        """
+        if self.use_database:
+            self.db_session.add_all(objs)
+            self.db_session.commit()
+            return
+
+        with self.__file_lock:
+            logged = False
+            for obj in objs:
+                if self.__data.add(obj):
+                    self._log("save", obj)
+                    logged = True
+
+        if logged:
+            self.__commit.commit()
+
+    def update_many(self, objs: list) -> None:
+        """
+        Update several objects with one commit, one write of the log.
+
+        Args:
+            objs (list): The objects to update, unknown ones are skipped.
+        """
+        if self.use_database:
+            for obj in objs:
+                self.db_session.merge(obj)
+            self.db_session.commit()
+            return
+
+        now = datetime.now()
+        with self.__file_lock:
+            logged = False
+            for obj in objs:
+                updated_at, obj.updated_at = obj.updated_at, now
+                if not self.__data.replace(obj):
+                    obj.updated_at = updated_at
+                    continue
+                self._log("update", obj)
+                logged = True
+
+        if logged:
+            self.__commit.commit()
+
+    def delete_many(self, objs: list) -> int:
+        """
+        Delete several objects with one commit, one write of the log.
+
+        Args:
+            objs (list): The objects to delete.
+
+        Returns:
+            int: The number of deleted objects.
+        """
+        if self.use_database:
+            for obj in objs:
+                self.db_session.delete(obj)
+            self.db_session.commit()
+            return len(objs)
+
+        deleted = 0
+        with self.__file_lock:
+            for obj in objs:
+                if self.__data.remove(obj):
+                    self._log("delete", obj)
+                    deleted += 1
+
+        if deleted:
+            self.__commit.commit()
+        return deleted
+
+
+def legacy_filename(filename: str) -> str:
+    """Name of the JSON document a JSON Lines snapshot replaces"""
+    return os.path.splitext(filename)[0] + ".json"
+
+
+def convert_json_file(source: str, target: str) -> int:
+    """
+    Convert a JSON document written by the file storage before it used
+    JSON Lines ({model: [objects]}) to a JSON Lines snapshot.
+
+    The document is decoded whole, once; the snapshot is written to a
+    temporary file that is then renamed to target.
+
+    Args:
+        source (str): The JSON document.
+        target (str): The JSON Lines snapshot to write.
+
+    Returns:
+        int: The number of converted objects.
+    """
+    with open(source, "r") as file:
+        document = json.load(file)
+
+    count = 0
+    temporary = f"{target}.tmp"
+    with open(temporary, "w") as file:
+        for model, items in document.items():
+            for item in items:
+                file.write(json.dumps({"model": model, "data": item}) + "\n")
+                count += 1
+    os.replace(temporary, target)
+    return count
+
+
+# The repository selected with REPOSITORY=file
+FileRepository = DataManager
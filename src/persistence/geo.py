@@ -0,0 +1,284 @@
+""" This module exports a grid spatial index used to search places by
+distance, bounding box and nearest neighbours. """
+
+from math import (
+    asin, cos, degrees, floor, isfinite, pi, radians, sin, sqrt,
+)
+
+from src.persistence.locks import RWLock
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Side of a grid cell in degrees, about 11 km of latitude
+CELL_DEG = 0.1
+
+# Margin added to the searched boxes against rounding errors
+EPSILON_DEG = 1e-6
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points, in kilometers"""
+    phi1, phi2 = radians(lat1), radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = radians(lng2 - lng1)
+
+    a = sin(dphi / 2) ** 2 + cos(phi1) * cos(phi2) * sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def check_point(lat, lng) -> tuple[float, float]:
+    """
+    Coordinates of a point as floats.
+
+    Raises:
+        ValueError: If they are not numbers, not finite or out of range.
+    """
+    lat, lng = float(lat), float(lng)
+    if not (isfinite(lat) and -90 <= lat <= 90):
+        raise ValueError("latitude must be between -90 and 90")
+    if not (isfinite(lng) and -180 <= lng <= 180):
+        raise ValueError("longitude must be between -180 and 180")
+    return lat, lng
+
+
+class GeoIndex:
+    """
+    Spatial index bucketing points into a grid of CELL_DEG sided cells.
+
+    A query only visits the cells overlapping the bounding box of the
+    searched area, and then checks the exact haversine distance of the
+    points in them, so the results match a brute-force scan. Points are
+    added, moved and removed in O(1). Queries run concurrently, updates
+    hold the lock alone.
+    """
+
+    def __init__(self, cell_deg: float = CELL_DEG) -> None:
+        """
+        Initialize an empty index.
+
+        Args:
+            cell_deg (float): The side of a grid cell in degrees.
+        """
+        self.cell_deg = cell_deg
+        self.__rows = int(180 / cell_deg) + 1
+        self.__cols = int(round(360 / cell_deg))
+        self.__cells: dict[tuple[int, int], dict[str, tuple]] = {}
+        self.__points: dict[str, tuple[float, float, tuple[int, int]]] = {}
+        self.__lock = RWLock()
+
+    def __len__(self) -> int:
+        """Number of indexed points"""
+        return len(self.__points)
+
+    def __row(self, lat: float) -> int:
+        """Grid row of a latitude"""
+        return min(floor((lat + 90) / self.cell_deg), self.__rows - 1)
+
+    def __col(self, lng: float) -> int:
+        """Grid column of a longitude, wrapping around the antimeridian"""
+        return floor((lng + 180) / self.cell_deg) % self.__cols
+
+    def add(self, key: str, lat: float, lng: float) -> None:
+        """
+        Index a point, moving it if the key is already indexed.
+
+        Args:
+            key (str): The id of the indexed object.
+            lat (float): The latitude of the point.
+            lng (float): The longitude of the point.
+        """
+        cell = (self.__row(lat), self.__col(lng))
+        with self.__lock.write():
+            self.__remove(key)
+            self.__cells.setdefault(cell, {})[key] = (lat, lng)
+            self.__points[key] = (lat, lng, cell)
+
+    def remove(self, key: str) -> bool:
+        """
+        Remove a point from the index.
+
+        Args:
+            key (str): The id of the indexed object.
+
+        Returns:
+            bool: True if the point was indexed, False otherwise.
+        """
+        with self.__lock.write():
+            return self.__remove(key)
+
+    def __remove(self, key: str) -> bool:
+        """Remove a point, with the lock held"""
+        point = self.__points.pop(key, None)
+        if point is None:
+            return False
+
+        cell = self.__cells[point[2]]
+        del cell[key]
+        if not cell:
+            del self.__cells[point[2]]
+        return True
+
+    def __candidates(self, south, north, west, east):
+        """Points in the cells overlapping a box, west > east wrapping"""
+        south, north = south - EPSILON_DEG, north + EPSILON_DEG
+        west, east = west - EPSILON_DEG, east + EPSILON_DEG
+        if west > east:
+            east += 360
+
+        rows = range(
+            self.__row(max(south, -90)), self.__row(min(north, 90)) + 1
+        )
+
+        first = floor((west + 180) / self.cell_deg)
+        count = floor((east + 180) / self.cell_deg) - first + 1
+        if count >= self.__cols:
+            cols = range(self.__cols)
+        else:
+            cols = [(first + i) % self.__cols for i in range(count)]
+
+        # Walking the occupied cells is cheaper for very large areas
+        if len(rows) * len(cols) > len(self.__cells):
+            cols = set(cols)
+            for (row, col), cell in self.__cells.items():
+                if row in rows and col in cols:
+                    yield from cell.items()
+            return
+
+        for row in rows:
+            for col in cols:
+                cell = self.__cells.get((row, col))
+                if cell:
+                    yield from cell.items()
+
+    def within_radius(
+        self, lat: float, lng: float, radius_km: float
+    ) -> list[tuple[float, str]]:
+        """
+        Find the points at most radius_km away from a point.
+
+        Args:
+            lat (float): The latitude of the center.
+            lng (float): The longitude of the center.
+            radius_km (float): The search radius in kilometers.
+
+        Returns:
+            list: (distance in km, key) pairs sorted by distance.
+        """
+        # Bounding box of the circle, following J. P. Matuschek's
+        # "Finding Points Within a Distance of a Latitude/Longitude"
+        angular = radius_km / EARTH_RADIUS_KM
+        south = lat - degrees(angular)
+        north = lat + degrees(angular)
+
+        if south <= -90 or north >= 90:
+            west, east = -180.0, 180.0
+        else:
+            dlng = degrees(asin(min(1.0, sin(angular) / cos(radians(lat)))))
+            west, east = lng - dlng, lng + dlng
+            if dlng >= 180:
+                west, east = -180.0, 180.0
+
+        found = []
+        with self.__lock.read():
+            for key, (plat, plng) in self.__candidates(
+                south, north, west, east
+            ):
+                distance = haversine_km(lat, lng, plat, plng)
+                if distance <= radius_km:
+                    found.append((distance, key))
+
+        found.sort()
+        return found
+
+    def within_bbox(
+        self, south: float, west: float, north: float, east: float
+    ) -> list[str]:
+        """
+        Find the points inside a bounding box.
+
+        Args:
+            south (float): The minimum latitude.
+            west (float): The western longitude.
+            north (float): The maximum latitude.
+            east (float): The eastern longitude, smaller than west when
+                the box crosses the antimeridian.
+
+        Returns:
+            list: The keys of the points in the box.
+        """
+        wraps = west > east
+
+        with self.__lock.read():
+            return [
+                key
+                for key, (lat, lng) in self.__candidates(
+                    south, north, west, east
+                )
+                if south <= lat <= north
+                and (
+                    (lng >= west or lng <= east) if wraps
+                    else west <= lng <= east
+                )
+            ]
+
+    def nearest(self, lat: float, lng: float, k: int) -> list[tuple]:
+        """
+        Find the k points closest to a point.
+
+        The search radius starts at one cell and doubles until k points
+        are found, so only the cells around the point are visited.
+
+        Args:
+            lat (float): The latitude of the point.
+            lng (float): The longitude of the point.
+            k (int): The number of neighbours.
+
+        Returns:
+            list: Up to k (distance in km, key) pairs sorted by distance.
+        """
+        if k <= 0 or not self.__points:
+            return []
+
+        radius = self.cell_deg * 111.2
+        max_radius = EARTH_RADIUS_KM * pi
+        while True:
+            found = self.within_radius(lat, lng, radius)
+            if len(found) >= k or radius >= max_radius:
+                return found[:k]
+            radius *= 2
+
+
+_places: GeoIndex | None = None
+
+
+def place_index() -> GeoIndex:
+    """Spatial index over the places of the repository, built on first use
+    and then kept up to date by Place.create, update and delete"""
+    global _places
+
+    if _places is None:
+        from src.models.place import Place
+
+        index = GeoIndex()
+        for place in Place.get_all():
+            try:
+                lat, lng = check_point(place.latitude, place.longitude)
+            except (TypeError, ValueError):
+                # Saved before the coordinates were validated
+                continue
+            index.add(place.id, lat, lng)
+        _places = index
+
+    return _places
+
+
+def index_point(place) -> None:
+    """Update the spatial index after a place is created or updated"""
+    if _places is not None:
+        _places.add(place.id, place.latitude, place.longitude)
+
+
+def unindex_point(place_id: str) -> None:
+    """Update the spatial index after a place is deleted"""
+    if _places is not None:
+        _places.remove(place_id)
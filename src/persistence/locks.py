@@ -0,0 +1,53 @@
+""" This module exports the reader-writer lock protecting the in-memory
+stores and indexes shared by the threads of a worker. """
+
+import threading
+from contextlib import contextmanager
+
+
+class RWLock:
+    """
+    Lock held by any number of readers or by a single writer.
+
+    Readers never block each other, they only wait for a writer holding
+    the lock or waiting for it. Waiting writers go first so that a steady
+    flow of readers can't starve them. The lock is not reentrant.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a free lock"""
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writing = False
+        self.__waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock as a reader for the duration of the block"""
+        with self.__condition:
+            while self.__writing or self.__waiting_writers:
+                self.__condition.wait()
+            self.__readers += 1
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__readers -= 1
+                if not self.__readers:
+                    self.__condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock as the only writer for the duration of the block"""
+        with self.__condition:
+            self.__waiting_writers += 1
+            while self.__writing or self.__readers:
+                self.__condition.wait()
+            self.__waiting_writers -= 1
+            self.__writing = True
+        try:
+            yield
+        finally:
+            with self.__condition:
+                self.__writing = False
+                self.__condition.notify_all()
@@ -4,6 +4,7 @@ it only stores it in memory. """
 
 from datetime import datetime
 from src.persistence.repository import Repository
+from src.persistence.store import ModelStore
 from utils.populate import populate_db
 from src.models.base import Base
 
@@ -14,16 +15,8 @@ class MemoryRepository(Repository):
     reload the in-memory database with initial data.
     """
 
-    # Dictionary to hold lists of objects for each model type
-    __data: dict[str, list] = {
-        "country": [],
-        "user": [],
-        "amenity": [],
-        "city": [],
-        "review": [],
-        "place": [],
-        "placeamenity": [],
-    }
+    # Objects of each model type, keyed by their primary key
+    __data: ModelStore = ModelStore()
 
     def __init__(self) -> None:
         """
@@ -31,17 +24,50 @@ class MemoryRepository(Repository):
         """
         self.reload()
 
-    def get_all(self, model_name: str) -> list:
+    def get_all(
+        self, model_name: str, limit: int | None = None, offset: int = 0
+    ) -> list:
         """
         Get all objects of a given model.
 
         Parameters:
         model_name (str): The name of the model to retrieve objects from.
+        limit (int, optional): The maximum number of objects to return.
+        offset (int, optional): The number of objects to skip.
 
         Returns:
-        list: A list of all objects of the specified model.
+        list: A list of the objects of the specified model.
         """
-        return self.__data.get(model_name, [])
+        return self.__data.all(model_name, limit, offset)
+
+    def count(self, model_name: str) -> int:
+        """
+        Count the objects of a given model.
+
+        Parameters:
+        model_name (str): The name of the model.
+
+        Returns:
+        int: The number of stored objects of the model.
+        """
+        return self.__data.count(model_name)
+
+    def get_page(
+        self, model_name: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """
+        Get a page of objects of a given model ordered by (created_at, id).
+
+        Parameters:
+        model_name (str): The name of the model.
+        limit (int): The maximum number of objects to return.
+        after (tuple, optional): The (created_at, id) of the last object
+        of the previous page, None for the first page.
+
+        Returns:
+        list: The objects of the page.
+        """
+        return self.__data.page_after(model_name, limit, after)
 
     def get(self, model_name: str, obj_id: str):
         """
@@ -54,12 +80,60 @@ class MemoryRepository(Repository):
         Returns:
         The object if found, otherwise None.
         """
-        # Iterate through the list of objects for the given model
-        for obj in self.get_all(model_name):
-            # Return the object if the ID matches
-            if obj.id == obj_id:
-                return obj
-        return None
+        return self.__data.get(model_name, obj_id)
+
+    def get_by_email(self, email: str):
+        """
+        Get a user by email, whatever its case.
+
+        Parameters:
+        email (str): The email of the user.
+
+        Returns:
+        The user if found, otherwise None, from the email index.
+        """
+        return self.__data.get_unique("user", "email", email)
+
+    def find(self, model_name: str, **criteria) -> list:
+        """
+        Get the objects of a model matching all the given attribute values.
+
+        Parameters:
+        model_name (str): The name of the model.
+        **criteria: Attribute names and the values they must have.
+
+        Returns:
+        list: The matching objects, read from the secondary indexes when
+        the criteria cover one.
+        """
+        return self.__data.lookup(model_name, **criteria)
+
+    def find_one(self, model_name: str, **criteria):
+        """
+        Get the first object of a model matching the given attribute values.
+
+        Parameters:
+        model_name (str): The name of the model.
+        **criteria: Attribute names and the values they must have.
+
+        Returns:
+        The first matching object if any, otherwise None.
+        """
+        return next(iter(self.find(model_name, **criteria)), None)
+
+    def find_many(self, model_name: str, field: str, values: list) -> list:
+        """
+        Get the objects of a model whose field holds any of the values.
+
+        Parameters:
+        model_name (str): The name of the model.
+        field (str): The attribute to match.
+        values (list): The values to look for.
+
+        Returns:
+        list: The matching objects, found in one pass over the store.
+        """
+        return self.__data.lookup_many(model_name, field, values)
 
     def reload(self):
         """
@@ -77,12 +151,8 @@ class MemoryRepository(Repository):
         Returns:
         The saved object.
         """
-        # Get the model name from the object's class name
-        cls = obj.__class__.__name__.lower()
-
-        # Add the object to the list if it is not already present
-        if obj not in self.__data[cls]:
-            self.__data[cls].append(obj)
+        # Add the object unless one with the same key is already stored
+        self.__data.add(obj)
 
         return obj
 
@@ -96,18 +166,15 @@ class MemoryRepository(Repository):
         Returns:
         The updated object if successful, otherwise None.
         """
-        # Get the model name from the object's class name
-        cls = obj.__class__.__name__.lower()
+        # Set before replacing, compact stores copy the object
+        updated_at, obj.updated_at = obj.updated_at, datetime.now()
 
-        # Iterate through the list of objects for the given model
-        for i, o in enumerate(self.__data[cls]):
-            # Update the object if the ID matches
-            if o.id == obj.id:
-                obj.updated_at = datetime.now()
-                self.__data[cls][i] = obj
-                return obj
+        # Only objects that are already stored can be updated
+        if not self.__data.replace(obj):
+            obj.updated_at = updated_at
+            return None
 
-        return None
+        return obj
 
     def delete(self, obj: Base) -> bool:
         """
@@ -119,12 +186,4 @@ class MemoryRepository(Repository):
         Returns:
         bool: True if the object was deleted successfully, otherwise False.
         """
-        # Get the model name from the object's class name
-        cls = obj.__class__.__name__.lower()
-
-        # Remove the object from the list if it is present
-        if obj in self.__data[cls]:
-            self.__data[cls].remove(obj)
-            return True
-
-        return False
+        return self.__data.remove(obj)
@@ -1,77 +1,262 @@
 """
-This module exports a Repository that persists data in a pickle file
+This module exports a Repository that persists data in pickle files,
+one shard per model
 """
 
+import os
 import pickle
+import threading
+from datetime import datetime
+from src.persistence.commit import GroupCommit
 from src.persistence.repository import Repository
+from src.persistence.store import ModelStore
 from utils.constants import PICKLE_STORAGE_FILENAME
 
 
 class PickleRepository(Repository):
-    """Pickle Repository"""
+    """
+    Pickle Repository, written as set by GROUP_COMMIT and FSYNC.
+
+    Every model is pickled in its own shard, <filename>.d/<model>.pkl, and
+    a write only marks the shard of its model dirty: a checkpoint pickles
+    the dirty shards again and leaves the others alone. Shards are read on
+    the first access to their model, so models that are never used are
+    never loaded.
+    """
 
     __filename = PICKLE_STORAGE_FILENAME
-    __data: dict[str, list] = {
-        "country": [],
-        "user": [],
-        "amenity": [],
-        "city": [],
-        "review": [],
-        "place": [],
-        "placeamenity": [],
-    }
-
-    def __init__(self) -> None:
-        """Calls reload method"""
+    __data: ModelStore = ModelStore()
+    __file_lock = threading.Lock()
+
+    def __init__(self, filename: str | None = None) -> None:
+        """Calls reload method, on filename instead of the default file"""
+        if filename is not None:
+            self.__filename = filename
+        self.__directory = f"{self.__filename}.d"
+        self.__loaded: set[str] = set()
+        self.__loading = threading.Lock()
+        self.__dirty: set[str] = set()
+        self.__dirty_lock = threading.Lock()
+        self.checkpoint_metrics = {"shards_written": 0, "bytes_written": 0}
+        self.__commit = GroupCommit(self._save_to_file)
         self.reload()
 
-    def _save_to_file(self):
-        """Helper method to save the current object data to the file"""
-        with open(self.__filename, "wb") as file:
-            pickle.dump(self.__data, file)
+    def _shard(self, model_name: str) -> str:
+        """File holding the objects of a model"""
+        return os.path.join(self.__directory, f"{model_name}.pkl")
+
+    def _save_to_file(self, sync: bool = False):
+        """Helper method to save the dirty shards to their files"""
+        with self.__file_lock:
+            with self.__dirty_lock:
+                dirty, self.__dirty = self.__dirty, set()
+
+            os.makedirs(self.__directory, exist_ok=True)
+            try:
+                while dirty:
+                    model_name = min(dirty)
+                    self._write_shard(model_name, sync)
+                    dirty.discard(model_name)
+            finally:
+                # The shards not written are written on the next save
+                with self.__dirty_lock:
+                    self.__dirty |= dirty
+
+    def _write_shard(self, model_name: str, sync: bool) -> None:
+        """Pickle the objects of a model and replace its shard with them"""
+        objs = self.__data.export(model_name)
+        if objs and not self.__data.compact:
+            # Plain attributes, hydrated again by from_record: smaller
+            # than pickled model instances and their SQLAlchemy state
+            objs = (type(objs[0]), [obj.to_record() for obj in objs])
+        filename = self._shard(model_name)
+        temporary = f"{filename}.tmp"
+        with open(temporary, "wb") as file:
+            # Streamed to the file, the pickle is never held in memory
+            pickle.dump(objs, file, protocol=5)
+            if sync:
+                file.flush()
+                os.fsync(file.fileno())
+            written = file.tell()
+        os.replace(temporary, filename)
+
+        self.checkpoint_metrics["shards_written"] += 1
+        self.checkpoint_metrics["bytes_written"] += written
+
+    def _load(self, model_name: str) -> None:
+        """Read the shard of a model on its first access"""
+        if model_name in self.__loaded:
+            return
+
+        with self.__loading:
+            if model_name in self.__loaded:
+                return
+            try:
+                with open(self._shard(model_name), "rb") as file:
+                    objs = pickle.load(file)
+                if isinstance(objs, tuple):
+                    model, records = objs
+                    objs = (model.from_record(r) for r in records)
+                self.__data.restore(objs)
+            except FileNotFoundError:
+                pass
+            self.__loaded.add(model_name)
+
+    def _changed(self, *model_names: str) -> None:
+        """Mark the shards of models dirty and commit the change"""
+        with self.__dirty_lock:
+            self.__dirty.update(model_names)
+        self.__commit.commit()
+
+    @property
+    def loaded(self) -> set[str]:
+        """Names of the models whose shard has been read"""
+        return set(self.__loaded)
+
+    def flush(self):
+        """Write the changes still waiting for the group commit"""
+        self.__commit.flush()
+
+    def get_all(
+        self, model_name: str, limit: int | None = None, offset: int = 0
+    ) -> list:
+        """Get all objects of a given model, or a page of them"""
+        self._load(model_name)
+        return self.__data.all(model_name, limit, offset)
 
-    def get_all(self, model_name: str) -> list:
-        """Get all objects of a given model"""
-        return self.__data[model_name]
+    def count(self, model_name: str) -> int:
+        """Get the number of objects of a given model"""
+        self._load(model_name)
+        return self.__data.count(model_name)
+
+    def get_page(
+        self, model_name: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """Get the objects ordered by (created_at, id) following after"""
+        self._load(model_name)
+        return self.__data.page_after(model_name, limit, after)
 
     def get(self, model_name: str, obj_id: str):
         """Get an object by its ID"""
-        for obj in self.__data[model_name]:
-            if obj.id == obj_id:
-                return obj
-        return None
+        self._load(model_name)
+        return self.__data.get(model_name, obj_id)
+
+    def get_by_email(self, email: str):
+        """Get a user by email, whatever its case, from the email index"""
+        self._load("user")
+        return self.__data.get_unique("user", "email", email)
+
+    def find(self, model_name: str, **criteria) -> list:
+        """Get the objects of a model matching all the given values"""
+        self._load(model_name)
+        return self.__data.lookup(model_name, **criteria)
+
+    def find_many(self, model_name: str, field: str, values: list) -> list:
+        """Get the objects of a model whose field holds any of the values"""
+        self._load(model_name)
+        return self.__data.lookup_many(model_name, field, values)
+
+    def find_one(self, model_name: str, **criteria):
+        """Get the first object of a model matching the given values"""
+        return next(iter(self.find(model_name, **criteria)), None)
 
     def reload(self):
-        """Reloads the data from the pickle file"""
+        """
+        Reloads the data from the shards, lazily. A single pickle file
+        written before the shards is read whole and split into shards.
+        """
+        self.__data = ModelStore()
+        self.__loaded = set()
+        if os.path.isdir(self.__directory):
+            return
+
         try:
             with open(self.__filename, "rb") as file:
-                self.__data = pickle.load(file)
+                data = pickle.load(file)
         except FileNotFoundError:
             from src.models.country import Country
 
-            self.__data["country"] = [Country("Uruguay", "UY")]
-            self._save_to_file()
+            self.__data.add(Country("Uruguay", "UY"))
+        else:
+            if isinstance(data, dict):
+                # Files written before ModelStore hold a list per model
+                for objs in data.values():
+                    self.__data.restore(objs)
+            else:
+                self.__data = data
+
+        self.__loaded = set(self.__data.models())
+        with self.__dirty_lock:
+            self.__dirty |= self.__loaded
+        self._save_to_file()
 
     def save(self, obj, save_to_file=True):
         """Save an object"""
-        self.__data[obj.__class__.__name__.lower()].append(obj)
+        model_name = ModelStore.model_name(obj)
+        self._load(model_name)
+        self.__data.add(obj)
         if save_to_file:
-            self._save_to_file()
+            self._changed(model_name)
+        else:
+            with self.__dirty_lock:
+                self.__dirty.add(model_name)
 
     def update(self, obj):
         """Update an object"""
-        for i, o in enumerate(self.__data[obj.__class__.__name__.lower()]):
-            if o.id == obj.id:
-                self.__data[obj.__class__.__name__.lower()][i] = obj
-                self._save_to_file()
-                return
+        model_name = ModelStore.model_name(obj)
+        self._load(model_name)
+        # Set before replacing, compact stores copy the object
+        updated_at, obj.updated_at = obj.updated_at, datetime.now()
+        if self.__data.replace(obj):
+            self._changed(model_name)
+        else:
+            obj.updated_at = updated_at
 
     def delete(self, obj) -> bool:
         """Delete an object"""
-        for i, o in enumerate(self.__data[obj.__class__.__name__.lower()]):
-            if o.id == obj.id:
-                del self.__data[obj.__class__.__name__.lower()][i]
-                break
+        model_name = ModelStore.model_name(obj)
+        self._load(model_name)
+        self.__data.remove(obj)
 
-        self._save_to_file()
+        self._changed(model_name)
         return True
+
+    def save_many(self, objs: list) -> None:
+        """Save several objects, written by one checkpoint"""
+        changed = set()
+        for obj in objs:
+            model_name = ModelStore.model_name(obj)
+            self._load(model_name)
+            if self.__data.add(obj):
+                changed.add(model_name)
+        if changed:
+            self._changed(*changed)
+
+    def update_many(self, objs: list) -> None:
+        """Update several objects, written by one checkpoint"""
+        changed = set()
+        now = datetime.now()
+        for obj in objs:
+            model_name = ModelStore.model_name(obj)
+            self._load(model_name)
+            updated_at, obj.updated_at = obj.updated_at, now
+            if self.__data.replace(obj):
+                changed.add(model_name)
+            else:
+                obj.updated_at = updated_at
+        if changed:
+            self._changed(*changed)
+
+    def delete_many(self, objs: list) -> int:
+        """Delete several objects, written by one checkpoint"""
+        changed = set()
+        deleted = 0
+        for obj in objs:
+            model_name = ModelStore.model_name(obj)
+            self._load(model_name)
+            if self.__data.remove(obj):
+                changed.add(model_name)
+                deleted += 1
+        if changed:
+            self._changed(*changed)
+        return deleted
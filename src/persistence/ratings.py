@@ -0,0 +1,253 @@
+""" This module exports the review rating aggregates of places and users.
+
+The in-memory repositories serve a single process, which keeps the
+aggregates up to date as its reviews are created, updated and deleted.
+With the database, several workers write the reviews, so the aggregates
+are read from the committed reviews with GROUP BY queries instead. """
+
+from collections import Counter
+
+from sqlalchemy import func
+
+from src.persistence.locks import RWLock
+
+# Ratings a review can have, see Review.check_rating
+MIN_RATING, MAX_RATING = 1, 5
+
+
+class RatingStats:
+    """Number, sum and histogram of the ratings of one place or user"""
+
+    __slots__ = ("count", "total", "histogram")
+
+    def __init__(self) -> None:
+        """Initialize empty stats"""
+        self.count = 0
+        self.total = 0.0
+        self.histogram: Counter = Counter()
+
+    def add(self, rating: float) -> None:
+        """Count a rating"""
+        self.count += 1
+        self.total += rating
+        self.histogram[rating] += 1
+
+    def remove(self, rating: float) -> None:
+        """Stop counting a rating, unless it isn't counted"""
+        if not self.histogram[rating]:
+            return
+        self.count -= 1
+        self.total -= rating
+        self.histogram[rating] -= 1
+        if not self.histogram[rating]:
+            del self.histogram[rating]
+        if not self.count:
+            self.total = 0.0
+
+    @property
+    def average(self) -> float | None:
+        """Average rating, None without ratings"""
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        """Stats as a JSON serializable dict"""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "average": self.average,
+            "histogram": {
+                str(rating): self.histogram[rating]
+                for rating in sorted(self.histogram)
+            },
+        }
+
+    def copy(self) -> "RatingStats":
+        """Independent copy of the stats"""
+        stats = RatingStats()
+        stats.count, stats.total = self.count, self.total
+        stats.histogram = self.histogram.copy()
+        return stats
+
+
+class RatingAggregates:
+    """
+    Rating stats of every place and user, updated in O(1) per review.
+
+    Reading the stats of a place costs the same no matter how many
+    reviews it has, instead of fetching and averaging all of them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without stats"""
+        self.__places: dict[str, RatingStats] = {}
+        self.__users: dict[str, RatingStats] = {}
+        self.__lock = RWLock()
+
+    @staticmethod
+    def __update(stats: dict, key: str, rating: float, add: bool) -> None:
+        """Add or remove a rating in the stats of a key"""
+        if add:
+            stats.setdefault(key, RatingStats()).add(rating)
+            return
+
+        entry = stats.get(key)
+        if entry is None:
+            return
+        entry.remove(rating)
+        if not entry.count:
+            del stats[key]
+
+    def add(self, place_id: str, user_id: str, rating: float) -> None:
+        """
+        Count the rating of a new review.
+
+        Args:
+            place_id (str): The id of the reviewed place.
+            user_id (str): The id of the reviewer.
+            rating (float): The rating of the review.
+        """
+        rating = float(rating)
+        with self.__lock.write():
+            self.__update(self.__places, place_id, rating, True)
+            self.__update(self.__users, user_id, rating, True)
+
+    def remove(self, place_id: str, user_id: str, rating: float) -> None:
+        """
+        Stop counting the rating of a deleted review.
+
+        Args:
+            place_id (str): The id of the reviewed place.
+            user_id (str): The id of the reviewer.
+            rating (float): The rating of the review.
+        """
+        rating = float(rating)
+        with self.__lock.write():
+            self.__update(self.__places, place_id, rating, False)
+            self.__update(self.__users, user_id, rating, False)
+
+    def place(self, place_id: str) -> RatingStats:
+        """Rating stats of a place"""
+        with self.__lock.read():
+            stats = self.__places.get(place_id)
+            return stats.copy() if stats else RatingStats()
+
+    def place_ratings(self, place_ids) -> list[tuple[int, float | None]]:
+        """Number and average of the ratings of each of place_ids, read
+        at once"""
+        with self.__lock.read():
+            stats = [self.__places.get(place_id) for place_id in place_ids]
+            return [
+                (entry.count, entry.average) if entry else (0, None)
+                for entry in stats
+            ]
+
+    def user(self, user_id: str) -> RatingStats:
+        """Rating stats of the reviews written by a user"""
+        with self.__lock.read():
+            stats = self.__users.get(user_id)
+            return stats.copy() if stats else RatingStats()
+
+
+class DatabaseRatings:
+    """
+    Rating stats of places and users read from the reviews table, with
+    the same methods to read them as RatingAggregates.
+
+    Each read is one query grouped by rating or place, over the reviews
+    of the places or user asked for, through the place_id and user_id
+    indexes.
+    """
+
+    @staticmethod
+    def __query(*columns):
+        """Query of columns over the reviews with a valid rating"""
+        from src import db
+        from src.models.review import Review
+
+        return db.session.query(*columns).filter(
+            Review.rating.between(MIN_RATING, MAX_RATING)
+        )
+
+    def __stats(self, column, key: str) -> RatingStats:
+        """Rating stats of the reviews whose column holds key"""
+        from src.models.review import Review
+
+        stats = RatingStats()
+        rows = self.__query(Review.rating, func.count()).filter(
+            column == key
+        ).group_by(Review.rating)
+        for rating, count in rows:
+            stats.count += count
+            stats.total += rating * count
+            stats.histogram[float(rating)] = count
+        return stats
+
+    def place(self, place_id: str) -> RatingStats:
+        """Rating stats of a place"""
+        from src.models.review import Review
+
+        return self.__stats(Review.place_id, place_id)
+
+    def place_ratings(self, place_ids) -> list[tuple[int, float | None]]:
+        """Number and average of the ratings of each of place_ids, read
+        with one query"""
+        from src.models.review import Review
+
+        place_ids = list(place_ids)
+        if not place_ids:
+            return []
+
+        rows = self.__query(
+            Review.place_id, func.count(), func.avg(Review.rating)
+        ).filter(Review.place_id.in_(place_ids)).group_by(Review.place_id)
+        ratings = {place_id: (count, avg) for place_id, count, avg in rows}
+        return [ratings.get(place_id, (0, None)) for place_id in place_ids]
+
+    def user(self, user_id: str) -> RatingStats:
+        """Rating stats of the reviews written by a user"""
+        from src.models.review import Review
+
+        return self.__stats(Review.user_id, user_id)
+
+
+_ratings: RatingAggregates | None = None
+
+
+def rating_aggregates() -> RatingAggregates | DatabaseRatings:
+    """Rating aggregates of the repository: read from the database by
+    DatabaseRatings, otherwise built on first use and then kept up to
+    date by Review.create, update and delete"""
+    global _ratings
+
+    from src.persistence import backend
+    from src.persistence.db import DBRepository
+
+    if isinstance(backend, DBRepository):
+        return DatabaseRatings()
+
+    if _ratings is None:
+        from src.models.review import Review
+
+        ratings = RatingAggregates()
+        for review in Review.get_all():
+            try:
+                rating = Review.check_rating(review.rating)
+            except ValueError:
+                # Saved before the ratings were validated
+                continue
+            ratings.add(review.place_id, review.user_id, rating)
+        _ratings = ratings
+
+    return _ratings
+
+
+def add_rating(review) -> None:
+    """Update the aggregates after a review is created or updated"""
+    if _ratings is not None:
+        _ratings.add(review.place_id, review.user_id, review.rating)
+
+
+def remove_rating(place_id: str, user_id: str, rating: float) -> None:
+    """Update the aggregates before a review is deleted or updated"""
+    if _ratings is not None:
+        _ratings.remove(place_id, user_id, rating)
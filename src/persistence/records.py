@@ -0,0 +1,135 @@
+""" This module exports the compact records the in-memory stores can keep
+instead of SQLAlchemy model instances.
+
+A model instance carries an instrumented __dict__ and an InstanceState,
+which the memory, file and pickle repositories never use. A record only
+has one slot per persisted attribute, and the ids repeated across many
+objects are interned so that every record shares the same string. """
+
+import sys
+from typing import Any
+
+# Attributes holding ids of other objects, shared by many records
+INTERNED = frozenset((
+    "amenity_id",
+    "city_id",
+    "country_code",
+    "place_id",
+    "user_id",
+))
+
+_record_types: dict[tuple, type] = {}
+
+
+class Record:
+    """
+    Base of the slotted record types, one per model and attribute set.
+
+    Record types are named after their model so that the stores file
+    them under the same table.
+    """
+
+    __slots__ = ()
+    __model__: type
+
+    def __reduce__(self):
+        """Pickle as the model, the attribute names and their values"""
+        return (
+            _unpickle,
+            (self.__model__, self.__slots__, self.values()),
+        )
+
+    def values(self) -> tuple:
+        """Values of the attributes, in the order of __slots__"""
+        return tuple(getattr(self, f, None) for f in self.__slots__)
+
+    def __repr__(self) -> str:
+        """Record representation"""
+        fields = ", ".join(
+            f"{f}={getattr(self, f, None)!r}" for f in self.__slots__
+        )
+        return f"<{type(self).__name__}Record {fields}>"
+
+
+def record_type(model: type, fields: tuple) -> type:
+    """Record type of a model with the given attributes, created once"""
+    key = (model, fields)
+    record_class = _record_types.get(key)
+    if record_class is None:
+        record_class = type(
+            model.__name__,
+            (Record,),
+            {"__slots__": fields, "__model__": model},
+        )
+        _record_types[key] = record_class
+    return record_class
+
+
+def fields_of(obj) -> tuple:
+    """Persisted attribute names of a model instance"""
+    table = getattr(type(obj), "__table__", None)
+    columns = tuple(table.columns.keys()) if table is not None else ()
+    extra = tuple(
+        f for f in vars(obj)
+        if not f.startswith("_") and f not in columns
+    )
+    return columns + extra
+
+
+def build_record(model: type, fields: tuple, values) -> Record:
+    """Record of a model holding values for fields, interning the ids"""
+    record_class = record_type(model, fields)
+    record = record_class.__new__(record_class)
+    for field, value in zip(fields, values):
+        if field in INTERNED and type(value) is str:
+            value = sys.intern(value)
+        setattr(record, field, value)
+    return record
+
+
+def to_record(obj) -> Record:
+    """
+    Compact copy of a model instance.
+
+    Args:
+        obj: The model instance.
+
+    Returns:
+        Record: A record holding the persisted attributes of obj.
+    """
+    if isinstance(obj, Record):
+        return obj
+
+    fields = fields_of(obj)
+    return build_record(
+        type(obj), fields, (getattr(obj, f, None) for f in fields)
+    )
+
+
+def to_model(record: Any):
+    """
+    Model instance holding the attributes of a record.
+
+    The model is created without calling its constructor, so nothing is
+    validated or recomputed (User.__init__ would hash the password again).
+
+    Args:
+        record: A record, returned unchanged if it is not one.
+
+    Returns:
+        A new instance of the model of the record.
+    """
+    if not isinstance(record, Record):
+        return record
+
+    model = record.__model__
+    manager = getattr(model, "_sa_class_manager", None)
+    obj = manager.new_instance() if manager else model.__new__(model)
+    # Filled like SQLAlchemy loads a row, without attribute events
+    obj.__dict__.update(zip(record.__slots__, record.values()))
+    return obj
+
+
+def _unpickle(model: type, fields: tuple, values: tuple) -> Record:
+    """Rebuild a pickled record"""
+    return build_record(model, tuple(fields), values)
@@ -0,0 +1,173 @@
+""" This module exports the reference data cache: the countries and the
+cities of each country, read from the repository once and then kept up to
+date by Country.create and the City writes, once they are committed.
+
+Countries are checked on every city insert and listed by clients that
+cache them for a long time, so they are read from a dict keyed by code
+and their list carries an ETag derived from its content.
+
+The in-memory repositories serve a single process, which makes all the
+writes. The database is shared by several workers, so each one reads it
+again every REFERENCE_DATA_TTL seconds to pick up the countries and
+cities written by the others. """
+
+import hashlib
+import threading
+import time
+from typing import Any
+
+from src.config import Config
+
+from src.persistence.locks import RWLock
+
+
+class ReferenceData:
+    """
+    Countries by code and the cities of each country, O(1) to read.
+
+    The objects kept are detached copies (see Repository.detach), which
+    outlive the requests that read them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without countries or cities"""
+        self.__countries: dict[str, Any] = {}
+        # country code -> city id -> city, and city id -> country code
+        self.__cities: dict[str, dict[Any, Any]] = {}
+        self.__city_countries: dict[Any, str] = {}
+        self.__etag = ""
+        self.__lock = RWLock()
+
+    def __tag(self) -> None:
+        """Compute the ETag of the countries again, under the write lock"""
+        digest = hashlib.sha1()
+        for code in sorted(self.__countries):
+            digest.update(f"{code}\0{self.__countries[code].name}\0".encode())
+        self.__etag = digest.hexdigest()[:20]
+
+    def put_country(self, country) -> None:
+        """Add a country, or replace the one with the same code"""
+        with self.__lock.write():
+            self.__countries[country.code] = country
+            self.__tag()
+
+    def put_city(self, city) -> None:
+        """Add a city, or replace the one with the same id, under its
+        current country"""
+        with self.__lock.write():
+            self.__remove_city(city.id)
+            self.__cities.setdefault(city.country_code, {})[city.id] = city
+            self.__city_countries[city.id] = city.country_code
+
+    def remove_city(self, city_id: Any) -> None:
+        """Forget a deleted city"""
+        with self.__lock.write():
+            self.__remove_city(city_id)
+
+    def __remove_city(self, city_id: Any) -> None:
+        """Forget a city, under the write lock"""
+        code = self.__city_countries.pop(city_id, None)
+        if code is not None:
+            cities = self.__cities[code]
+            del cities[city_id]
+            if not cities:
+                del self.__cities[code]
+
+    @property
+    def etag(self) -> str:
+        """Tag of the current countries, changed by any change to them"""
+        with self.__lock.read():
+            return self.__etag
+
+    def country(self, code: str):
+        """Country with the given code, or None"""
+        # A single dict read is atomic and needs no lock
+        return self.__countries.get(code)
+
+    def countries(self) -> list:
+        """All the countries, in the order they were added"""
+        with self.__lock.read():
+            return list(self.__countries.values())
+
+    def cities(self, code: str) -> list:
+        """Cities of the country with the given code"""
+        with self.__lock.read():
+            return list(self.__cities.get(code, {}).values())
+
+
+_reference: ReferenceData | None = None
+# When _reference expires, on the monotonic clock, None for never
+_expires: float | None = None
+# Held by the thread reading the reference data again
+_reloading = threading.Lock()
+
+
+def reference_data() -> ReferenceData:
+    """Reference data of the repository, read when the app starts (or on
+    first use), kept up to date by the model writes and, with the
+    database, read again once REFERENCE_DATA_TTL has passed"""
+    reference = _reference
+    if reference is None:
+        with _reloading:
+            if _reference is None:
+                _load()
+        return _reference
+
+    if _expires is not None and _expires <= time.monotonic():
+        # Other threads keep the current data while one reads it again
+        if _reloading.acquire(blocking=False):
+            try:
+                _load()
+            finally:
+                _reloading.release()
+        return _reference
+
+    return reference
+
+
+def _load() -> None:
+    """Read the reference data from the repository, under _reloading"""
+    global _reference, _expires
+    from src.persistence import backend, repo
+    from src.persistence.db import DBRepository
+
+    reference = ReferenceData()
+    for country in repo.get_all("country"):
+        reference.put_country(repo.detach(country))
+    for city in repo.get_all("city"):
+        reference.put_city(repo.detach(city))
+
+    ttl = Config.REFERENCE_DATA_TTL
+    shared = isinstance(backend, DBRepository)
+    _expires = time.monotonic() + ttl if shared and ttl > 0 else None
+    _reference = reference
+
+
+def reset_reference_data() -> None:
+    """Read the reference data from the repository again on next use, as
+    after a reload"""
+    global _reference
+
+    _reference = None
+
+
+def put_country(country) -> None:
+    """Update the reference data after a country is saved"""
+    if _reference is not None:
+        from src.persistence import repo
+
+        _reference.put_country(repo.detach(country))
+
+
+def put_city(city) -> None:
+    """Update the reference data after a city is saved or updated"""
+    if _reference is not None:
+        from src.persistence import repo
+
+        _reference.put_city(repo.detach(city))
+
+
+def remove_city(city_id: Any) -> None:
+    """Update the reference data after a city is deleted"""
+    if _reference is not None:
+        _reference.remove_city(city_id)
@@ -0,0 +1,113 @@
+""" This module exports the relations between the models that list and
+detail responses can expand with ?include=, and their batched expansion.
+
+An include is a comma-separated list of relation paths, such as
+"city,city.country,host,reviews" for a place. Every path is resolved for
+all the objects of the response at once, with one find_many call per
+relation, so the number of lookups depends on the include and not on the
+number of objects. """
+
+from typing import NamedTuple
+
+
+class Relation(NamedTuple):
+    """Objects of model whose remote attribute equals the local one"""
+
+    model: str
+    local: str
+    remote: str
+    many: bool = False
+
+
+RELATIONS = {
+    "place": {
+        "city": Relation("city", "city_id", "id"),
+        "host": Relation("user", "user_id", "id"),
+        "reviews": Relation("review", "id", "place_id", many=True),
+    },
+    "city": {
+        "country": Relation("country", "country_code", "code"),
+    },
+    "review": {
+        "place": Relation("place", "place_id", "id"),
+        "user": Relation("user", "user_id", "id"),
+    },
+}
+
+
+def parse_include(model_name: str, include: str | None) -> dict:
+    """
+    Tree of the relations to expand, {name: {nested name: {...}}}.
+
+    A nested path expands its parents too: "city.country" is "city" with
+    "country" in it.
+
+    Raises:
+        ValueError: If a relation is unknown.
+    """
+    tree: dict = {}
+    for path in filter(None, (p.strip() for p in (include or "").split(","))):
+        model, node = model_name, tree
+        for name in path.split("."):
+            relation = RELATIONS.get(model, {}).get(name)
+            if relation is None:
+                raise ValueError(f"Unknown include: {path}")
+            node = node.setdefault(name, {})
+            model = relation.model
+    return tree
+
+
+def to_dicts(objs: list) -> list[dict]:
+    """to_dict of objs, objects of one model, through its to_dict_many
+    when it has one"""
+    if not objs:
+        return []
+    to_dict_many = getattr(type(objs[0]), "to_dict_many", None)
+    if to_dict_many is None:
+        return [obj.to_dict() for obj in objs]
+    return to_dict_many(objs)
+
+
+def expand(repo, model_name: str, objs: list, tree: dict) -> list[dict]:
+    """
+    Dictionaries of objs with the related objects of tree, read with one
+    find_many call per relation.
+
+    Args:
+        repo (Repository): The repository holding the objects.
+        model_name (str): The model of objs.
+        objs (list): The objects to serialize.
+        tree (dict): The relations to expand, as returned by parse_include.
+
+    Returns:
+        list[dict]: The to_dict of every object, with a key per relation.
+    """
+    dicts = to_dicts(objs)
+    _expand(repo, model_name, objs, dicts, tree)
+    return dicts
+
+
+def _expand(repo, model_name: str, objs: list, dicts: list, tree: dict):
+    """Add the relations of tree to the dictionaries of objs"""
+    for name, subtree in tree.items():
+        relation = RELATIONS[model_name][name]
+        keys = {getattr(obj, relation.local, None) for obj in objs}
+        keys.discard(None)
+        related = repo.find_many(relation.model, relation.remote, list(keys))
+
+        related_dicts = to_dicts(related)
+        if subtree:
+            _expand(repo, relation.model, related, related_dicts, subtree)
+
+        grouped: dict = {}
+        for obj, obj_dict in zip(related, related_dicts):
+            grouped.setdefault(getattr(obj, relation.remote), []).append(
+                obj_dict
+            )
+
+        for obj, obj_dict in zip(objs, dicts):
+            matches = grouped.get(getattr(obj, relation.local, None), [])
+            if relation.many:
+                obj_dict[name] = matches
+            else:
+                obj_dict[name] = matches[0] if matches else None
@@ -2,6 +2,8 @@
 
 from abc import ABC, abstractmethod
 
+from src.persistence.versions import BOOT, collection_versions
+
 
 class Repository(ABC):
     """Abstract class for repository pattern"""
@@ -11,13 +13,39 @@ class Repository(ABC):
         """Reload data to the repository"""
 
     @abstractmethod
-    def get_all(self, model_name: str) -> list:
-        """Get all objects of a model"""
+    def get_all(
+        self, model_name: str, limit: int | None = None, offset: int = 0
+    ) -> list:
+        """Get all objects of a model, or the page selected by limit/offset"""
+
+    @abstractmethod
+    def count(self, model_name: str) -> int:
+        """Get the number of objects of a model"""
+
+    @abstractmethod
+    def get_page(
+        self, model_name: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """Get the objects ordered by (created_at, id) coming after the
+        (created_at, id) pair of the last object of the previous page"""
 
     @abstractmethod
     def get(self, model_name: str, id: str) -> None:
         """Get an object by id"""
 
+    @abstractmethod
+    def find(self, model_name: str, **criteria) -> list:
+        """Get the objects of a model whose attributes equal the criteria"""
+
+    @abstractmethod
+    def find_one(self, model_name: str, **criteria):
+        """Get the first object of a model matching the criteria, or None"""
+
+    @abstractmethod
+    def get_by_email(self, email: str):
+        """Get the user whose email equals email once both are
+        case-folded (see store.normalize_email), or None"""
+
     @abstractmethod
     def save(self, obj) -> None:
         """Save an object"""
@@ -29,3 +57,54 @@ class Repository(ABC):
     @abstractmethod
     def delete(self, obj) -> bool:
         """Delete an object"""
+
+    def find_many(self, model_name: str, field: str, values: list) -> list:
+        """Get the objects of a model whose field holds any of the values,
+        with one batched lookup where the repository can"""
+        return [
+            obj for value in values
+            for obj in self.find(model_name, **{field: value})
+        ]
+
+    def collection_version(self, model_name: str) -> tuple:
+        """Value changed by every write to the objects of a model, which
+        the ETags of lists are derived from: the write counter of this
+        process (see versions.py)"""
+        return (BOOT, collection_versions.get(model_name))
+
+    def expand(self, model_name: str, objs: list, include: dict) -> list:
+        """Dictionaries of objs with the related objects of include, as
+        parsed by relations.parse_include"""
+        from src.persistence.relations import expand
+
+        return expand(self, model_name, objs, include)
+
+    def save_many(self, objs: list) -> None:
+        """Save several objects, in one transaction or one write where
+        the repository can"""
+        for obj in objs:
+            self.save(obj)
+
+    def update_many(self, objs: list) -> None:
+        """Update several objects, in one transaction or one write where
+        the repository can"""
+        for obj in objs:
+            self.update(obj)
+
+    def delete_many(self, objs: list) -> int:
+        """Delete several objects and return how many were deleted"""
+        return sum(bool(self.delete(obj)) for obj in objs)
+
+    def detach(self, obj):
+        """Copy of obj a cache can keep across requests, obj itself for
+        the repositories whose objects outlive them"""
+        return obj
+
+    def attach(self, obj):
+        """Object the current request can use and write from what detach
+        returned"""
+        return obj
+
+    def flush(self) -> None:
+        """Persist the changes not written yet, for repositories that
+        buffer them"""
@@ -0,0 +1,571 @@
+""" This module exports the id-keyed storage engine shared by the
+repositories that keep their objects in memory. """
+
+import os
+from bisect import bisect_left, bisect_right, insort
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Any
+
+from src.persistence.locks import RWLock
+from src.persistence.records import to_model, to_record
+from src.persistence.versions import collection_versions
+from utils.constants import COMPACT_RECORDS_ENV_VAR
+
+MODELS = (
+    "country",
+    "user",
+    "amenity",
+    "city",
+    "review",
+    "place",
+    "placeamenity",
+)
+
+# Attribute used as primary key for each model, "id" if not listed
+PRIMARY_KEYS = {
+    "country": "code",
+}
+
+# Whether the stores keep compact records instead of model instances
+COMPACT = os.getenv(COMPACT_RECORDS_ENV_VAR, "false").lower() == "true"
+
+# Secondary indexes kept for each model, as tuples of attribute names
+INDEXES = {
+    "review": (("place_id",), ("user_id",)),
+    "city": (("country_code",),),
+    "place": (("city_id",), ("user_id",)),
+    "placeamenity": (("place_id", "amenity_id"),),
+}
+
+
+def normalize_email(email: Any) -> str | None:
+    """Form of an email compared by the unique index: case-folded,
+    without surrounding spaces"""
+    return email.strip().casefold() if isinstance(email, str) else None
+
+
+# Attributes identifying one object of a model once normalized, mapped to
+# their normalization
+UNIQUE_INDEXES = {
+    "user": {"email": normalize_email},
+}
+
+
+class ModelStore:
+    """
+    Storage engine that keeps one dict per model, keyed by primary key.
+
+    Python dicts preserve insertion order, so listing a model still
+    returns the objects in the order they were saved, while lookups,
+    inserts, replacements and removals by key are O(1).
+
+    The secondary indexes listed in INDEXES map the values of the indexed
+    attributes to the objects holding them. They are updated on every
+    add, replace and remove, so filtering on indexed attributes costs time
+    proportional to the result and not to the table.
+
+    The unique indexes listed in UNIQUE_INDEXES map the normalized value
+    of an attribute to the key of the object holding it, so a user is
+    found by email in O(1) whatever its case.
+
+    Each model also keeps its keys sorted by (created_at, key) to serve
+    keyset pagination: a page is found with a binary search and costs the
+    same no matter how deep it is. Objects are mostly saved in creation
+    order, so keeping the list sorted is usually an append.
+
+    Every successful add, replace and remove bumps the version of its
+    model (see versions.py).
+
+    Every model has its own reader-writer lock: reads run concurrently,
+    writes to a model are serialized and writes to different models don't
+    wait for each other.
+
+    A compact store keeps slotted records (see records.py) instead of the
+    objects it is given, and hands out new model instances built from
+    them, so changing a returned object has no effect until it is passed
+    to replace.
+    """
+
+    def __init__(
+        self,
+        models: tuple = MODELS,
+        indexes: dict = INDEXES,
+        compact: bool = COMPACT,
+        unique: dict = UNIQUE_INDEXES,
+    ):
+        """
+        Initialize an empty table and empty indexes for every model.
+
+        Args:
+            models (tuple): The names of the models to create tables for.
+            indexes (dict): The indexed attributes of each model.
+            compact (bool): Whether to keep compact records.
+            unique (dict): The uniquely indexed attributes of each model
+                and their normalization.
+        """
+        self.compact = compact
+        self.__tables: dict[str, dict[str, Any]] = {m: {} for m in models}
+        self.__index_fields = {m: tuple(f) for m, f in indexes.items()}
+        # model -> fields -> values -> {key: obj}
+        self.__indexes: dict[str, dict[tuple, dict[tuple, dict]]] = {
+            m: {f: {} for f in fields}
+            for m, fields in self.__index_fields.items()
+        }
+        # model -> key -> indexed values of the stored object, in the order
+        # of the model's indexes. Objects are mutated in place before they
+        # are replaced, so the old values can't be read from the object.
+        self.__indexed: dict[str, dict[Any, tuple]] = {
+            m: {} for m in self.__index_fields
+        }
+        # model -> field -> normalized value -> key, and model -> key ->
+        # the normalized values of the stored object
+        self.__unique_fields = {m: dict(f) for m, f in unique.items()}
+        self.__unique: dict[str, dict[str, dict]] = {
+            m: {f: {} for f in fields}
+            for m, fields in self.__unique_fields.items()
+        }
+        self.__unique_values: dict[str, dict[Any, tuple]] = {
+            m: {} for m in self.__unique_fields
+        }
+        # model -> sorted [(created_at, key)], and key -> its sort key
+        self.__order: dict[str, list[tuple]] = {m: [] for m in models}
+        self.__sort_keys: dict[str, dict[Any, tuple]] = {
+            m: {} for m in models
+        }
+        self.__locks: dict[str, RWLock] = {m: RWLock() for m in models}
+
+    def __getstate__(self) -> dict:
+        """State to pickle, without the locks"""
+        state = self.__dict__.copy()
+        del state["_ModelStore__locks"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore a pickled store with new locks"""
+        self.__dict__.update(state)
+        # Stores pickled before records existed kept the objects
+        self.__dict__.setdefault("compact", False)
+        self.__locks = {m: RWLock() for m in self.__tables}
+        if "_ModelStore__unique" not in state:
+            # Stores pickled before the unique indexes: build them
+            self.__unique_fields = {
+                m: dict(f) for m, f in UNIQUE_INDEXES.items()
+            }
+            self.__unique = {
+                m: {f: {} for f in fields}
+                for m, fields in self.__unique_fields.items()
+            }
+            self.__unique_values = {m: {} for m in self.__unique_fields}
+            for model_name, table in self.__tables.items():
+                for key, obj in table.items():
+                    self.__index_unique(model_name, key, obj)
+
+    def __lock(self, model_name: str) -> RWLock:
+        """Lock of a model, created on first use"""
+        return self.__locks.setdefault(model_name, RWLock())
+
+    @contextmanager
+    def reading(self):
+        """Hold the read lock of every model for the duration of the
+        block, to read the whole store in a consistent state"""
+        with ExitStack() as stack:
+            for model_name in sorted(self.__locks):
+                stack.enter_context(self.__locks[model_name].read())
+            yield self
+
+    @staticmethod
+    def model_name(obj) -> str:
+        """Name of the table an object belongs to"""
+        return obj.__class__.__name__.lower()
+
+    @staticmethod
+    def key(model_name: str, obj) -> Any:
+        """Primary key of an object"""
+        return getattr(obj, PRIMARY_KEYS.get(model_name, "id"))
+
+    def __table(self, model_name: str) -> dict:
+        """Table for a model, created on first use"""
+        return self.__tables.setdefault(model_name, {})
+
+    def __index(self, model_name: str, key: Any, obj) -> None:
+        """Add an object to the indexes of its model"""
+        fields = self.__index_fields.get(model_name)
+        if not fields:
+            return
+
+        indexes = self.__indexes[model_name]
+        values = tuple(
+            tuple(getattr(obj, f, None) for f in index) for index in fields
+        )
+        for index, value in zip(fields, values):
+            indexes[index].setdefault(value, {})[key] = obj
+        self.__indexed[model_name][key] = values
+
+    def __unindex(self, model_name: str, key: Any) -> None:
+        """Remove the object stored under key from the indexes"""
+        values = self.__indexed.get(model_name, {}).pop(key, None)
+        if values is None:
+            return
+
+        indexes = self.__indexes[model_name]
+        for index, value in zip(self.__index_fields[model_name], values):
+            bucket = indexes[index][value]
+            del bucket[key]
+            if not bucket:
+                del indexes[index][value]
+
+    def __index_unique(self, model_name: str, key: Any, obj) -> None:
+        """Add an object to the unique indexes of its model"""
+        fields = self.__unique_fields.get(model_name)
+        if not fields:
+            return
+
+        unique = self.__unique[model_name]
+        values = tuple(
+            normalize(getattr(obj, f, None)) for f, normalize in fields.items()
+        )
+        for field, value in zip(fields, values):
+            if value is not None:
+                unique[field][value] = key
+        self.__unique_values[model_name][key] = values
+
+    def __unindex_unique(self, model_name: str, key: Any) -> None:
+        """Remove the object stored under key from the unique indexes"""
+        values = self.__unique_values.get(model_name, {}).pop(key, None)
+        if values is None:
+            return
+
+        unique = self.__unique[model_name]
+        for field, value in zip(self.__unique_fields[model_name], values):
+            # Another object may hold the value since this one was stored
+            if value is not None and unique[field].get(value) == key:
+                del unique[field][value]
+
+    @staticmethod
+    def sort_key(key: Any, obj) -> tuple:
+        """Position of an object in the (created_at, key) order"""
+        return (getattr(obj, "created_at", None) or datetime.min, key)
+
+    def __sort(self, model_name: str, key: Any, obj) -> None:
+        """Insert an object in the creation order of its model"""
+        sort_key = self.sort_key(key, obj)
+        order = self.__order.setdefault(model_name, [])
+        if not order or order[-1] < sort_key:
+            order.append(sort_key)
+        else:
+            insort(order, sort_key)
+        self.__sort_keys.setdefault(model_name, {})[key] = sort_key
+
+    def __unsort(self, model_name: str, key: Any) -> None:
+        """Remove the object stored under key from the creation order"""
+        sort_key = self.__sort_keys.get(model_name, {}).pop(key, None)
+        if sort_key is None:
+            return
+
+        order = self.__order[model_name]
+        del order[bisect_left(order, sort_key)]
+
+    def snapshot(self) -> dict[str, list]:
+        """Objects of every model, read in a consistent state"""
+        with self.reading():
+            tables = {m: list(t.values()) for m, t in self.__tables.items()}
+        if self.compact:
+            return {m: self.__out(objs) for m, objs in tables.items()}
+        return tables
+
+    def __out(self, objs: list) -> list:
+        """Objects to hand out, models built from the compact records"""
+        return [to_model(obj) for obj in objs] if self.compact else objs
+
+    def export(self, model_name: str) -> list:
+        """Objects of a model as they are stored, records not hydrated"""
+        with self.__lock(model_name).read():
+            return list(self.__tables.get(model_name, {}).values())
+
+    def restore(self, objs) -> None:
+        """
+        Add objects read back from a file, as records or models depending
+        on the store, whichever of them the file holds.
+
+        Args:
+            objs: The objects, in the order they were stored.
+        """
+        for obj in objs:
+            self.add(obj if self.compact else to_model(obj))
+
+    def models(self) -> list[str]:
+        """Names of all the known models"""
+        return list(self.__tables)
+
+    def all(
+        self, model_name: str, limit: int | None = None, offset: int = 0
+    ) -> list:
+        """
+        Get all objects of a model in insertion order.
+
+        Args:
+            model_name (str): The name of the model.
+            limit (int, optional): The maximum number of objects to return.
+            offset (int, optional): The number of objects to skip.
+
+        Returns:
+            list: A new list with the selected objects of the model.
+        """
+        with self.__lock(model_name).read():
+            objs = self.__tables.get(model_name, {}).values()
+            if limit is None and not offset:
+                objs = list(objs)
+            else:
+                stop = None if limit is None else offset + limit
+                objs = list(islice(objs, offset, stop))
+
+        return self.__out(objs)
+
+    def count(self, model_name: str) -> int:
+        """Number of objects stored for a model"""
+        # A single dict read is atomic and needs no lock
+        return len(self.__tables.get(model_name, {}))
+
+    def get(self, model_name: str, key: Any) -> Any:
+        """
+        Get an object by its primary key.
+
+        Args:
+            model_name (str): The name of the model.
+            key: The primary key of the object.
+
+        Returns:
+            The object if found, otherwise None.
+        """
+        obj = self.__tables.get(model_name, {}).get(key)
+        return to_model(obj) if self.compact else obj
+
+    def add(self, obj) -> bool:
+        """
+        Insert an object if its key is not stored yet.
+
+        Args:
+            obj: The object to insert.
+
+        Returns:
+            bool: True if the object was inserted, False if the key was
+            already taken.
+        """
+        model_name = self.model_name(obj)
+        key = self.key(model_name, obj)
+        if self.compact:
+            obj = to_record(obj)
+
+        with self.__lock(model_name).write():
+            table = self.__table(model_name)
+            if key in table:
+                return False
+
+            table[key] = obj
+            self.__index(model_name, key, obj)
+            self.__index_unique(model_name, key, obj)
+            self.__sort(model_name, key, obj)
+            collection_versions.bump(model_name)
+            return True
+
+    def replace(self, obj) -> bool:
+        """
+        Replace the stored object with the same key, keeping its position.
+
+        Args:
+            obj: The new version of the object.
+
+        Returns:
+            bool: True if the object was replaced, False if it is unknown.
+        """
+        model_name = self.model_name(obj)
+        key = self.key(model_name, obj)
+        if self.compact:
+            obj = to_record(obj)
+
+        with self.__lock(model_name).write():
+            table = self.__table(model_name)
+            if key not in table:
+                return False
+
+            table[key] = obj
+            self.__unindex(model_name, key)
+            self.__index(model_name, key, obj)
+            self.__unindex_unique(model_name, key)
+            self.__index_unique(model_name, key, obj)
+            sort_keys = self.__sort_keys.get(model_name, {})
+            if sort_keys.get(key) != self.sort_key(key, obj):
+                self.__unsort(model_name, key)
+                self.__sort(model_name, key, obj)
+            collection_versions.bump(model_name)
+            return True
+
+    def remove(self, obj) -> bool:
+        """
+        Remove the object stored under the key of the given object.
+
+        Args:
+            obj: The object to remove.
+
+        Returns:
+            bool: True if the object was removed, False if it is unknown.
+        """
+        model_name = self.model_name(obj)
+        key = self.key(model_name, obj)
+
+        with self.__lock(model_name).write():
+            if self.__table(model_name).pop(key, None) is None:
+                return False
+
+            self.__unindex(model_name, key)
+            self.__unindex_unique(model_name, key)
+            self.__unsort(model_name, key)
+            collection_versions.bump(model_name)
+            return True
+
+    def page_after(
+        self, model_name: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """
+        Get a page of objects ordered by (created_at, key).
+
+        Args:
+            model_name (str): The name of the model.
+            limit (int): The maximum number of objects to return.
+            after (tuple, optional): The (created_at, key) of the last
+                object of the previous page, None for the first page.
+
+        Returns:
+            list: The objects that come right after the given position.
+        """
+        with self.__lock(model_name).read():
+            order = self.__order.get(model_name, [])
+            table = self.__tables.get(model_name, {})
+            start = 0 if after is None else bisect_right(order, tuple(after))
+
+            page = [table[key] for _, key in order[start:start + limit]]
+
+        return self.__out(page)
+
+    def lookup(self, model_name: str, **criteria) -> list:
+        """
+        Get the objects of a model whose attributes equal the criteria.
+
+        Criteria on the primary key or covering an index are answered
+        without scanning the table, any other attribute is checked on the
+        candidates only.
+
+        Args:
+            model_name (str): The name of the model.
+            **criteria: Attribute names and the values they must have.
+
+        Returns:
+            list: The matching objects.
+        """
+        if not criteria:
+            return self.all(model_name)
+
+        with self.__lock(model_name).read():
+            table = self.__tables.get(model_name, {})
+            pk = PRIMARY_KEYS.get(model_name, "id")
+            if pk in criteria:
+                obj = table.get(criteria[pk])
+                candidates = [] if obj is None else [obj]
+            else:
+                candidates = None
+                for index in self.__index_fields.get(model_name, ()):
+                    if all(f in criteria for f in index):
+                        value = tuple(criteria[f] for f in index)
+                        bucket = self.__indexes[model_name][index].get(
+                            value, {}
+                        )
+                        candidates = list(bucket.values())
+                        break
+                if candidates is None:
+                    candidates = list(table.values())
+
+        return self.__out([
+            obj for obj in candidates
+            if all(getattr(obj, f, None) == v for f, v in criteria.items())
+        ])
+
+    def get_unique(self, model_name: str, field: str, value: Any) -> Any:
+        """
+        Get the object whose uniquely indexed field equals value once both
+        are normalized.
+
+        Args:
+            model_name (str): The name of the model.
+            field (str): An attribute of UNIQUE_INDEXES for the model.
+            value: The value to look for, normalized like the index.
+
+        Returns:
+            The object if found, otherwise None.
+        """
+        normalize = self.__unique_fields[model_name][field]
+        with self.__lock(model_name).read():
+            key = self.__unique[model_name][field].get(normalize(value))
+            obj = self.__tables.get(model_name, {}).get(key)
+        if obj is None:
+            return None
+        return to_model(obj) if self.compact else obj
+
+    def lookup_many(self, model_name: str, field: str, values) -> list:
+        """
+        Get the objects of a model whose field holds any of the values,
+        with one pass under the lock: by key for the primary key, from
+        the index of the field if it has one, else by one scan.
+
+        Args:
+            model_name (str): The name of the model.
+            field (str): The attribute to match.
+            values: The values to look for.
+
+        Returns:
+            list: The matching objects.
+        """
+        values = set(values)
+        if not values:
+            return []
+
+        with self.__lock(model_name).read():
+            table = self.__tables.get(model_name, {})
+            if field == PRIMARY_KEYS.get(model_name, "id"):
+                found = [table[v] for v in values if v in table]
+            elif (field,) in self.__index_fields.get(model_name, ()):
+                index = self.__indexes[model_name][(field,)]
+                found = [
+                    obj
+                    for v in values
+                    for obj in index.get((v,), {}).values()
+                ]
+            else:
+                found = [
+                    obj for obj in table.values()
+                    if getattr(obj, field, None) in values
+                ]
+
+        return self.__out(found)
+
+    def clear(self) -> None:
+        """Remove every object, keeping the tables"""
+        with ExitStack() as stack:
+            for model_name in sorted(self.__locks):
+                stack.enter_context(self.__locks[model_name].write())
+
+            for table in self.__tables.values():
+                table.clear()
+            for model_name, indexes in self.__indexes.items():
+                for index in indexes.values():
+                    index.clear()
+                self.__indexed[model_name].clear()
+            for model_name, unique in self.__unique.items():
+                for index in unique.values():
+                    index.clear()
+                self.__unique_values[model_name].clear()
+            for model_name in self.__order:
+                self.__order[model_name].clear()
+                self.__sort_keys[model_name].clear()
+            collection_versions.bump(*self.__tables)
@@ -0,0 +1,344 @@
+""" This module exports the full-text search over places: an in-process
+inverted index ranked with BM25, and an SQLite FTS5 table used instead
+when the repository is a SQLite database with FTS5 compiled in. """
+
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from math import log
+
+from src.persistence.locks import RWLock
+
+# BM25 parameters, the usual defaults
+K1 = 1.2
+B = 0.75
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Case-folded words of a text, without accents"""
+    if not text:
+        return []
+
+    text = unicodedata.normalize("NFKD", text.casefold())
+    if not text.isascii():
+        text = "".join(c for c in text if not unicodedata.combining(c))
+
+    return WORD.findall(text)
+
+
+class TextIndex:
+    """
+    Inverted index mapping each term to the documents containing it.
+
+    Documents are added, replaced and removed incrementally. A search only
+    reads the postings of the query terms and ranks the documents with
+    BM25. Every document can belong to a group (the place of a review) so
+    that matches can be summed per group. Searches run concurrently,
+    updates hold the lock alone.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index"""
+        self.__postings: dict[str, dict[str, int]] = {}
+        self.__terms: dict[str, Counter] = {}
+        self.__lengths: dict[str, int] = {}
+        self.__groups: dict[str, str] = {}
+        self.__total_length = 0
+        self.__lock = RWLock()
+
+    def __len__(self) -> int:
+        """Number of indexed documents"""
+        return len(self.__lengths)
+
+    def add(self, doc_id: str, text: str, group: str | None = None) -> None:
+        """
+        Index a document, replacing any previous version of it.
+
+        Args:
+            doc_id (str): The id of the document.
+            text (str): The text of the document.
+            group (str, optional): The group the document belongs to.
+        """
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+
+        with self.__lock.write():
+            self.__remove(doc_id)
+
+            for term, frequency in terms.items():
+                self.__postings.setdefault(term, {})[doc_id] = frequency
+
+            self.__terms[doc_id] = terms
+            self.__lengths[doc_id] = length
+            self.__total_length += length
+            if group is not None:
+                self.__groups[doc_id] = group
+
+    def remove(self, doc_id: str) -> bool:
+        """
+        Remove a document from the index.
+
+        Args:
+            doc_id (str): The id of the document.
+
+        Returns:
+            bool: True if the document was indexed, False otherwise.
+        """
+        with self.__lock.write():
+            return self.__remove(doc_id)
+
+    def __remove(self, doc_id: str) -> bool:
+        """Remove a document, with the lock held"""
+        terms = self.__terms.pop(doc_id, None)
+        if terms is None:
+            return False
+
+        for term in terms:
+            postings = self.__postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self.__postings[term]
+
+        self.__total_length -= self.__lengths.pop(doc_id)
+        self.__groups.pop(doc_id, None)
+        return True
+
+    def scores(self, query: str) -> dict[str, float]:
+        """
+        BM25 score of every document matching any term of the query.
+
+        Args:
+            query (str): The searched text.
+
+        Returns:
+            dict: The score of each matching document.
+        """
+        with self.__lock.read():
+            return self.__scores(query)
+
+    def __scores(self, query: str) -> dict[str, float]:
+        """BM25 scores of the matching documents, with the lock held"""
+        count = len(self.__lengths)
+        if not count:
+            return {}
+
+        average = self.__total_length / count
+        scores: dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self.__postings.get(term)
+            if not postings:
+                continue
+
+            matches = len(postings)
+            idf = log(1 + (count - matches + 0.5) / (matches + 0.5))
+            lengths = self.__lengths
+            for doc_id, frequency in postings.items():
+                norm = K1 * (1 - B + B * lengths[doc_id] / average)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    frequency * (K1 + 1) / (frequency + norm)
+                )
+
+        return scores
+
+    def group_scores(self, query: str) -> dict[str, float]:
+        """Scores of the matching documents summed per group"""
+        grouped: dict[str, float] = {}
+        with self.__lock.read():
+            for doc_id, score in self.__scores(query).items():
+                group = self.__groups.get(doc_id, doc_id)
+                grouped[group] = grouped.get(group, 0.0) + score
+        return grouped
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[float, str]]:
+        """
+        Best matching documents of a query.
+
+        Args:
+            query (str): The searched text.
+            limit (int): The maximum number of documents to return.
+
+        Returns:
+            list: (score, doc_id) pairs, best first.
+        """
+        scores = self.scores(query)
+        return heapq.nlargest(limit, ((s, d) for d, s in scores.items()))
+
+
+def place_text(place) -> str:
+    """Searchable text of a place"""
+    return " ".join(
+        filter(None, (place.name, place.description, place.address))
+    )
+
+
+_places: TextIndex | None = None
+_reviews: TextIndex | None = None
+
+
+def text_indexes() -> tuple[TextIndex, TextIndex]:
+    """Text indexes over the places and the review comments of the
+    repository, built on first use and then kept up to date by the
+    create, update and delete paths of Place and Review"""
+    global _places, _reviews
+
+    if _places is None:
+        from src.models.place import Place
+        from src.models.review import Review
+
+        places, reviews = TextIndex(), TextIndex()
+        for place in Place.get_all():
+            places.add(place.id, place_text(place))
+        for review in Review.get_all():
+            reviews.add(review.id, review.comment, review.place_id)
+        _places, _reviews = places, reviews
+
+    return _places, _reviews
+
+
+def index_place(place) -> None:
+    """Update the text index after a place is created or updated"""
+    if _places is not None:
+        _places.add(place.id, place_text(place))
+
+
+def unindex_place(place_id: str) -> None:
+    """Update the text index after a place is deleted"""
+    if _places is not None:
+        _places.remove(place_id)
+
+
+def index_review(review) -> None:
+    """Update the text index after a review is created or updated"""
+    if _reviews is not None:
+        _reviews.add(review.id, review.comment, review.place_id)
+
+
+def unindex_review(review_id: str) -> None:
+    """Update the text index after a review is deleted"""
+    if _reviews is not None:
+        _reviews.remove(review_id)
+
+
+# One FTS5 table for places and one for reviews, sharing the rowid of the
+# indexed row so the triggers keeping them in sync update them by rowid
+FTS5_SCHEMA = (
+    """CREATE VIRTUAL TABLE places_fts USING fts5(
+        place_id UNINDEXED, body
+    )""",
+    """CREATE VIRTUAL TABLE reviews_fts USING fts5(
+        place_id UNINDEXED, body
+    )""",
+    """INSERT INTO places_fts (rowid, place_id, body)
+        SELECT rowid, id, name || ' ' || coalesce(description, '')
+            || ' ' || address FROM places""",
+    """INSERT INTO reviews_fts (rowid, place_id, body)
+        SELECT rowid, place_id, comment FROM reviews""",
+    """CREATE TRIGGER places_fts_insert AFTER INSERT ON places BEGIN
+        INSERT INTO places_fts (rowid, place_id, body)
+        VALUES (new.rowid, new.id, new.name || ' '
+            || coalesce(new.description, '') || ' ' || new.address);
+    END""",
+    """CREATE TRIGGER places_fts_update AFTER UPDATE ON places BEGIN
+        DELETE FROM places_fts WHERE rowid = old.rowid;
+        INSERT INTO places_fts (rowid, place_id, body)
+        VALUES (new.rowid, new.id, new.name || ' '
+            || coalesce(new.description, '') || ' ' || new.address);
+    END""",
+    """CREATE TRIGGER places_fts_delete AFTER DELETE ON places BEGIN
+        DELETE FROM places_fts WHERE rowid = old.rowid;
+    END""",
+    """CREATE TRIGGER reviews_fts_insert AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts (rowid, place_id, body)
+        VALUES (new.rowid, new.place_id, new.comment);
+    END""",
+    """CREATE TRIGGER reviews_fts_update AFTER UPDATE ON reviews BEGIN
+        DELETE FROM reviews_fts WHERE rowid = old.rowid;
+        INSERT INTO reviews_fts (rowid, place_id, body)
+        VALUES (new.rowid, new.place_id, new.comment);
+    END""",
+    """CREATE TRIGGER reviews_fts_delete AFTER DELETE ON reviews BEGIN
+        DELETE FROM reviews_fts WHERE rowid = old.rowid;
+    END""",
+)
+
+FTS5_QUERY = """
+    SELECT place_id, sum(score) AS total FROM (
+        SELECT place_id, bm25(places_fts) AS score
+        FROM places_fts WHERE places_fts MATCH :query
+        UNION ALL
+        SELECT place_id, bm25(reviews_fts) AS score
+        FROM reviews_fts WHERE reviews_fts MATCH :query
+    ) GROUP BY place_id
+"""
+
+_fts5_ready: bool | None = None
+
+
+def fts5_ready() -> bool:
+    """Whether the places are searched with SQLite FTS5, creating the
+    search tables and the triggers keeping them in sync on first use"""
+    global _fts5_ready
+
+    if _fts5_ready is None:
+        from flask import current_app
+        from sqlalchemy import inspect
+        from sqlalchemy.exc import OperationalError
+        from src import db
+        from src.persistence import backend
+        from src.persistence.db import DBRepository
+
+        _fts5_ready = False
+        if (
+            isinstance(backend, DBRepository)
+            and current_app.config.get("SEARCH_USE_FTS5", True)
+            and db.engine.dialect.name == "sqlite"
+        ):
+            try:
+                if not inspect(db.engine).has_table("places_fts"):
+                    with db.engine.begin() as connection:
+                        for statement in FTS5_SCHEMA:
+                            connection.exec_driver_sql(statement)
+                _fts5_ready = True
+            except OperationalError:
+                # SQLite built without FTS5
+                pass
+
+    return _fts5_ready
+
+
+def search_place_ids(query: str) -> dict[str, float]:
+    """
+    Places matching a text query, with their relevance.
+
+    Matches in the name, description and address of a place and in the
+    comments of its reviews are added up.
+
+    Args:
+        query (str): The searched text.
+
+    Returns:
+        dict: The score of each matching place id, higher is better.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return {}
+
+    if fts5_ready():
+        from sqlalchemy import text
+        from src import db
+
+        match = " OR ".join(f'"{term}"' for term in set(terms))
+        rows = db.session.execute(text(FTS5_QUERY), {"query": match})
+        # bm25() is lower for better matches
+        return {place_id: -total for place_id, total in rows}
+
+    places, reviews = text_indexes()
+    scores = places.scores(query)
+    for place_id, score in reviews.group_scores(query).items():
+        scores[place_id] = scores.get(place_id, 0.0) + score
+
+    return scores
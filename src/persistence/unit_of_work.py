@@ -0,0 +1,133 @@
+""" This module exports the unit of work binding the database writes of a
+Flask request to a single transaction.
+
+Within a request, DBRepository doesn't commit its writes: they are
+flushed and committed once, when the response is ready, and rolled back
+if the request failed. GET, HEAD and OPTIONS requests are read-only: they
+run without autoflush, their transaction is rolled back at the end and
+writing in them is an error. Outside of a request (scripts, populate)
+every write still commits right away.
+
+What is derived from the written objects in memory (the reference data,
+spatial, text and rating indexes, the entity cache) is updated through
+after_commit, once the transaction is committed: a failed commit leaves
+them as they were. """
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from src import db
+
+READ_ONLY_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+# Transactions ended and flushes made by every session, for monitoring
+transaction_metrics = {"commits": 0, "rollbacks": 0, "flushes": 0}
+
+
+class ReadOnlyRequestError(RuntimeError):
+    """Raised when a read-only request writes to the database"""
+
+
+def _counter(name: str):
+    """Session event listener incrementing a transaction metric"""
+
+    def count(*args) -> None:
+        transaction_metrics[name] += 1
+
+    return count
+
+
+event.listen(Session, "after_commit", _counter("commits"))
+event.listen(Session, "after_rollback", _counter("rollbacks"))
+event.listen(Session, "after_flush", _counter("flushes"))
+
+
+def in_request() -> bool:
+    """Whether the writes belong to the unit of work of a request"""
+    return has_request_context() and "unit_of_work" in g
+
+
+def commit() -> None:
+    """
+    Commit the writes of the repository: right away outside of a request,
+    at the end of it within one.
+
+    Raises:
+        ReadOnlyRequestError: If the current request is read-only.
+    """
+    if not in_request():
+        db.session.commit()
+    elif g.unit_of_work == "read-only":
+        raise ReadOnlyRequestError(
+            f"{request.method} requests can't write to the database"
+        )
+
+
+def after_commit(callback, *args) -> None:
+    """
+    Call callback(*args) once the writes made so far are committed: when
+    the request ends within one, right away otherwise. The calls of a
+    request whose transaction is rolled back are dropped.
+    """
+    if in_request():
+        g.setdefault("after_commit", []).append((callback, args))
+    else:
+        callback(*args)
+
+
+def _begin() -> None:
+    """Start the unit of work of a request"""
+    if request.method in READ_ONLY_METHODS:
+        g.unit_of_work = "read-only"
+        db.session().autoflush = False
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(text("SET TRANSACTION READ ONLY"))
+    else:
+        g.unit_of_work = "read-write"
+
+
+def _complete(response):
+    """Commit the writes of a successful request before the response is
+    sent, so that a failed commit is an error and not a lost write"""
+    session = db.session()
+    committing = (
+        g.get("unit_of_work") == "read-write" and response.status_code < 400
+    )
+
+    if session.in_transaction():
+        if committing:
+            # The response is built and the objects aren't read again:
+            # they stay loaded for the after_commit calls, without queries
+            session.expire_on_commit = False
+            try:
+                session.commit()
+            finally:
+                session.expire_on_commit = True
+        else:
+            session.rollback()
+
+    if committing:
+        for callback, args in g.pop("after_commit", ()):
+            callback(*args)
+    return response
+
+
+def _end(exception) -> None:
+    """Roll back what an exception left pending and end the unit of work"""
+    # Left by a failed commit or a failed request
+    g.pop("after_commit", None)
+    if g.pop("unit_of_work", None) is None:
+        return
+
+    session = db.session()
+    if exception is not None and session.in_transaction():
+        session.rollback()
+    session.autoflush = True
+
+
+def init_unit_of_work(app: Flask) -> None:
+    """Bind the database writes of every request of app to a unit of work"""
+    app.before_request(_begin)
+    app.after_request(_complete)
+    app.teardown_request(_end)
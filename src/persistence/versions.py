@@ -0,0 +1,110 @@
+""" This module exports the versions of the collections, which the list
+responses derive their ETag from (see Repository.collection_version).
+
+In the database, the collection_versions table holds a row per model,
+incremented by every transaction that writes to the model's objects,
+within that transaction: a rolled back write changes nothing, and every
+worker reads the same versions.
+
+The other repositories serve a single process and use the counters of
+CollectionVersions, incremented by ModelStore on each write. Database
+sessions increment them too, once a transaction commits. A list is
+unchanged as long as the versions of the models it shows are, so it can
+be answered with 304 Not Modified without being read or serialized.
+
+The counters start from zero in every process, with a new BOOT token,
+so tags of an earlier process never match. """
+
+import threading
+from uuid import uuid4
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from src import db
+
+# Changes with every process, so that restarted counters can't collide
+BOOT = uuid4().hex[:8]
+
+
+# Version of each model in the database
+versions_table = db.Table(
+    "collection_versions",
+    db.Column("model", db.String(32), primary_key=True),
+    db.Column("version", db.Integer, nullable=False),
+)
+
+
+class CollectionVersions:
+    """Number of writes to each model since the process started"""
+
+    def __init__(self) -> None:
+        """Initialize every counter to zero"""
+        self.__versions: dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    def bump(self, *model_names: str) -> None:
+        """Count a write to each of the models"""
+        with self.__lock:
+            for model_name in model_names:
+                self.__versions[model_name] = (
+                    self.__versions.get(model_name, 0) + 1
+                )
+
+    def get(self, model_name: str) -> int:
+        """Version of a model"""
+        # A single dict read is atomic and needs no lock
+        return self.__versions.get(model_name, 0)
+
+
+collection_versions = CollectionVersions()
+
+
+def _flushed(session: Session, context) -> None:
+    """Remember the models of the objects a session wrote, until its
+    transaction ends"""
+    session.info.setdefault("changed_models", set()).update(
+        type(obj).__name__.lower()
+        for objs in (session.new, session.dirty, session.deleted)
+        for obj in objs
+    )
+
+
+def _committing(session: Session) -> None:
+    """Increment the database versions of the models the committing
+    transaction wrote, as its last statements"""
+    # Flushed here rather than by commit, so that its writes are counted
+    session.flush()
+    changed = session.info.get("changed_models")
+    if not changed:
+        return
+
+    connection = session.connection()
+    for model_name in sorted(changed):
+        bumped = connection.execute(
+            update(versions_table)
+            .where(versions_table.c.model == model_name)
+            .values(version=versions_table.c.version + 1)
+        )
+        if not bumped.rowcount:
+            connection.execute(
+                insert(versions_table).values(model=model_name, version=1)
+            )
+
+
+def _committed(session: Session) -> None:
+    """Bump the models written by the committed transaction"""
+    changed = session.info.pop("changed_models", None)
+    if changed:
+        collection_versions.bump(*changed)
+
+
+def _rolled_back(session: Session) -> None:
+    """Forget the models written by the rolled back transaction"""
+    session.info.pop("changed_models", None)
+
+
+event.listen(Session, "after_flush", _flushed)
+event.listen(db.session, "before_commit", _committing)
+event.listen(Session, "after_commit", _committed)
+event.listen(Session, "after_rollback", _rolled_back)
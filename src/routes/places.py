@@ -3,9 +3,10 @@ This module contains the routes for the places blueprint.
 
 Imports:
 - `jsonify`, `Blueprint`: Flask utilities for JSON responses and route organization.
-- `create_place`, `delete_place`, `get_place_by_id`, `get_places`, `update_place`: Place-related controllers.
+- `create_place`, `delete_place`, `get_place_by_id`, `get_places`,
+  `search_places`, `update_place`: Place-related controllers.
 - `jwt_required`, `get_jwt_identity`: JWT utilities for authentication and retrieving user identity.
-- `db`: Database access for place data.
+- `repo`: Repository access for place data.
 - `wraps`: Helper for creating decorators.
 
 Function: `check_place_permission(func)`:
@@ -23,10 +24,20 @@ Blueprint: `places_bp`:
 Routes:
 - `GET /places`: Retrieves a list of places.
 - `POST /places`: Creates a new place (requires JWT authentication).
+- `POST /places/bulk`: Creates the places of a JSON list with one bulk write,
+  reporting the invalid items by index (requires JWT authentication).
+- `GET /places/search`: Searches places by radius (`lat`, `lng`, `radius_km`),
+  nearest neighbours (`lat`, `lng`, `k`) or bounding box
+  (`bbox=south,west,north,east`), using the spatial index, and/or by
+  text (`q`), ranked with BM25 over the places and their reviews.
 - `GET /places/<place_id>`: Retrieves a specific place by `place_id`.
 - `PUT /places/<place_id>`: Updates a specific place by `place_id` (requires JWT authentication and permission check).
 - `DELETE /places/<place_id>`: Deletes a specific place by `place_id` (requires JWT authentication and permission check).
 
+The list, search and detail routes accept
+`include=city,city.country,host,reviews` to embed the related objects,
+loaded in a fixed number of queries.
+
 Example of a Protected Route:
 - `GET /places/protected`: Returns the current user’s identity to demonstrate JWT usage.
 """
@@ -36,13 +47,15 @@ from flask import jsonify
 from flask import Blueprint
 from src.controllers.places import (
     create_place,
+    create_places,
     delete_place,
     get_place_by_id,
     get_places,
+    search_places,
     update_place,
 )
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from src.persistence import db
+from src.persistence import repo
 from functools import wraps
 
 
@@ -51,7 +64,7 @@ def check_place_permission(func):
     @jwt_required()
     def decorated_function(place_id, *args, **kwargs):
         current_user = get_jwt_identity()
-        place = db.get('place', place_id)
+        place = repo.get("place", place_id)
 
         if not place:
             return jsonify({"msg": "Place not found"}), 404
@@ -67,6 +80,8 @@ places_bp = Blueprint("places", __name__, url_prefix="/places")
 
 places_bp.route("/", methods=["GET"])(get_places)
 places_bp.route("/", methods=["POST"])(jwt_required()(create_place))
+places_bp.route("/bulk", methods=["POST"])(jwt_required()(create_places))
+places_bp.route("/search", methods=["GET"])(search_places)
 
 places_bp.route("/<place_id>", methods=["GET"])(get_place_by_id)
 places_bp.route("/<place_id>", methods=["PUT"])(jwt_required()(check_place_permission(update_place)))
@@ -17,10 +17,23 @@ Routes:
   - Retrieves all reviews from a specific user.
   - Handler: `get_reviews_from_user`
 
+- `GET /places/<place_id>/rating`:
+  - Retrieves the review count, rating sum, average and histogram of a place.
+  - Handler: `get_place_rating`
+
+- `GET /users/<user_id>/rating`:
+  - Retrieves the same rating stats over the reviews from a user.
+  - Handler: `get_user_rating`
+
 - `GET /reviews`:
   - Retrieves all reviews.
   - Handler: `get_reviews`
 
+- `POST /reviews/bulk`:
+  - Creates the reviews of a JSON list with one bulk write, reporting the
+    invalid items by index (requires JWT authentication).
+  - Handler: `create_reviews`
+
 - `GET /reviews/<review_id>`:
   - Retrieves a specific review by its ID.
   - Handler: `get_review_by_id`
@@ -36,13 +49,17 @@ Routes:
 
 
 from flask import Blueprint
+from flask_jwt_extended import jwt_required
 from src.controllers.reviews import (
     create_review,
+    create_reviews,
     delete_review,
+    get_place_rating,
     get_reviews_from_place,
     get_reviews_from_user,
     get_review_by_id,
     get_reviews,
+    get_user_rating,
     update_review,
 )
 
@@ -51,8 +68,13 @@ reviews_bp = Blueprint("reviews", __name__)
 reviews_bp.route("/places/<place_id>/reviews", methods=["POST"])(create_review)
 reviews_bp.route("/places/<place_id>/reviews")(get_reviews_from_place)
 reviews_bp.route("/users/<user_id>/reviews")(get_reviews_from_user)
+reviews_bp.route("/places/<place_id>/rating")(get_place_rating)
+reviews_bp.route("/users/<user_id>/rating")(get_user_rating)
 
 reviews_bp.route("/reviews", methods=["GET"])(get_reviews)
+reviews_bp.route("/reviews/bulk", methods=["POST"])(
+    jwt_required()(create_reviews)
+)
 
 reviews_bp.route("/reviews/<review_id>", methods=["GET"])(get_review_by_id)
 reviews_bp.route("/reviews/<review_id>", methods=["PUT"])(update_review)
@@ -134,7 +134,7 @@ def login():
     email = request.json.get('email', None)
     password = request.json.get('password', None)
     
-    user = User.query.filter_by(email=email).first()
+    user = User.get_by_email(email) if email else None
     if user and user.check_password(password):
         access_token = create_access_token(identity=user.id, additional_claims={"is_admin": user.is_admin})
         return jsonify(access_token=access_token), 200
@@ -155,7 +155,7 @@ def admin_only():
 @jwt_required()
 def admin_endpoint():
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = User.get(user_id)
     if not user or not user.is_admin:
         return jsonify({"msg": "Forbidden"}), 403
     return jsonify({"msg": "Welcome Admin"}), 200
@@ -0,0 +1,142 @@
+import json
+import os
+import tempfile
+import unittest
+import uuid
+from flask_jwt_extended import create_access_token
+from src import create_app
+from src.config import TestingConfig
+from src.models.amenity import Amenity
+from src.models.country import Country
+from src.persistence.file import DataManager
+from src.persistence.pickled import PickleRepository
+
+
+class TestBulkWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_file_repository_logs_a_batch(self):
+        repo = DataManager(filename=self.path("data.jsonl"))
+        amenities = [Amenity(f"amenity {i}") for i in range(3)]
+        repo.save_many(amenities)
+        for amenity in amenities:
+            amenity.name += " renamed"
+        repo.update_many(amenities)
+        self.assertEqual(repo.delete_many(amenities[:2] + [Amenity("x")]), 2)
+
+        with open(self.path("data.jsonl.log")) as file:
+            ops = [json.loads(line)["op"] for line in file]
+        self.assertEqual(ops, ["save"] * 3 + ["update"] * 3 + ["delete"] * 2)
+
+        reloaded = DataManager(filename=self.path("data.jsonl"))
+        self.assertEqual(
+            [a.name for a in reloaded.get_all("amenity")],
+            ["amenity 2 renamed"],
+        )
+
+    def test_pickle_repository_writes_each_shard_once(self):
+        repo = PickleRepository(self.path("data.pkl"))
+        written = repo.checkpoint_metrics["shards_written"]
+        repo.save_many(
+            [Amenity(f"amenity {i}") for i in range(10)]
+            + [Country("Chile", "CL")]
+        )
+        self.assertEqual(
+            repo.checkpoint_metrics["shards_written"], written + 2
+        )
+
+        reloaded = PickleRepository(self.path("data.pkl"))
+        self.assertEqual(reloaded.count("amenity"), 10)
+        self.assertEqual(
+            reloaded.delete_many(reloaded.get_all("amenity")), 10
+        )
+        self.assertEqual(PickleRepository(self.path("data.pkl")).count(
+            "amenity"), 0)
+
+
+class TestBulkEndpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            token = create_access_token(identity="u1")
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def post(self, url: str, items):
+        """POST items to a bulk endpoint with a JWT"""
+        return self.client.post(url, json=items, headers=self.headers)
+
+    def test_all_items_created(self):
+        names = [f"amenity {uuid.uuid4()}" for _ in range(3)]
+        response = self.post(
+            "/amenities/bulk", [{"name": name} for name in names]
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["errors"], [])
+        self.assertEqual(
+            [amenity["name"] for amenity in response.json["created"]], names
+        )
+
+    def test_partial_failure(self):
+        name = f"amenity {uuid.uuid4()}"
+        response = self.post("/amenities/bulk", [{"name": name}, {}, "Wifi"])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json["errors"], [
+            {"index": 1, "error": "Missing field: 'name'"},
+            {"index": 2, "error": "Item must be an object"},
+        ])
+        (created,) = response.json["created"]
+        self.assertEqual(created["name"], name)
+        with self.app.app_context():
+            self.assertEqual(Amenity.get(created["id"]).name, name)
+
+    def test_missing_references_are_reported(self):
+        response = self.post("/reviews/bulk", [{
+            "place_id": "nope", "user_id": "nope",
+            "comment": "Nice", "rating": 5,
+        }])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json["created"], [])
+        self.assertEqual(
+            response.json["errors"],
+            [{"index": 0, "error": "User with ID nope not found"}],
+        )
+
+    def test_body_must_be_a_list(self):
+        response = self.post("/amenities/bulk", {"name": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ids_are_rejected(self):
+        existing = self.post("/amenities/bulk", [{"name": "Wifi"}])
+        existing_id = existing.json["created"][0]["id"]
+
+        response = self.post(
+            "/amenities/bulk", [{"id": existing_id, "name": "Pool"}]
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json["created"], [])
+        self.assertEqual(
+            response.json["errors"],
+            [{"index": 0, "error": "Field 'id' can't be set"}],
+        )
+        with self.app.app_context():
+            self.assertEqual(Amenity.get(existing_id).name, "Wifi")
+
+    def test_authentication_required(self):
+        for url in ("/amenities/bulk", "/reviews/bulk", "/places/bulk"):
+            with self.subTest(url=url):
+                response = self.client.post(url, json=[])
+                self.assertEqual(response.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
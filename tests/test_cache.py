@@ -0,0 +1,152 @@
+import time
+import unittest
+from flask import Flask
+from src import db
+from src.config import TestingConfig
+from src.models.amenity import Amenity
+from src.models.country import Country
+from src.persistence.cache import CachedRepository
+from src.persistence.db import DBRepository
+from src.persistence.memory import MemoryRepository
+from src.persistence.unit_of_work import init_unit_of_work
+
+
+class CountingRepository(MemoryRepository):
+    """Memory repository counting the objects read by id"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get(self, model_name, obj_id):
+        self.reads += 1
+        return super().get(model_name, obj_id)
+
+
+class TestCachedRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = CountingRepository()
+        self.repo = CachedRepository(self.backend, size=2)
+        self.amenities = [Amenity(f"amenity {i}") for i in range(3)]
+        for amenity in self.amenities:
+            self.repo.save(amenity)
+
+    def test_reads_through_once(self):
+        first = self.amenities[0]
+        for _ in range(3):
+            self.assertIs(self.repo.get("amenity", first.id), first)
+        self.assertEqual(self.backend.reads, 1)
+        self.assertEqual(self.repo.metrics["hits"], 2)
+        self.assertEqual(self.repo.metrics["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        a, b, c = (amenity.id for amenity in self.amenities)
+        self.repo.get("amenity", a)
+        self.repo.get("amenity", b)
+        self.repo.get("amenity", a)
+        self.repo.get("amenity", c)
+        self.assertEqual(self.repo.metrics["evictions"], 1)
+        self.assertEqual(len(self.repo), 2)
+
+        reads = self.backend.reads
+        self.repo.get("amenity", a)
+        self.assertEqual(self.backend.reads, reads)
+        self.repo.get("amenity", b)
+        self.assertEqual(self.backend.reads, reads + 1)
+
+    def test_expires_after_ttl(self):
+        repo = CachedRepository(self.backend, size=10, ttl=0.01)
+        first = self.amenities[0]
+        repo.get("amenity", first.id)
+        time.sleep(0.02)
+        repo.get("amenity", first.id)
+        self.assertEqual(self.backend.reads, 2)
+        self.assertEqual(repo.metrics["expirations"], 1)
+
+    def test_writes_invalidate(self):
+        first = self.amenities[0]
+        self.repo.get("amenity", first.id)
+        self.repo.update(first)
+        self.assertEqual(len(self.repo), 0)
+
+        self.repo.get("amenity", first.id)
+        self.repo.delete(first)
+        self.assertIsNone(self.repo.get("amenity", first.id))
+        self.assertEqual(self.repo.metrics["invalidations"], 2)
+
+    def test_missing_objects_are_not_cached(self):
+        self.assertIsNone(self.repo.get("amenity", "missing"))
+        self.assertEqual(len(self.repo), 0)
+
+    def test_delegates_other_calls(self):
+        # The memory store is shared, other tests may have added amenities
+        self.assertEqual(
+            self.repo.count("amenity"), self.backend.count("amenity")
+        )
+        self.assertGreaterEqual(self.repo.count("amenity"), 3)
+        self.assertEqual(self.repo.reads, self.backend.reads)
+
+
+class TestCachedDBRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        self.repo = CachedRepository(DBRepository(), size=10)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.repo.save(Country("Chile", "CL"))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_cached_copy_outlives_the_session(self):
+        self.repo.get("country", "CL")
+        db.session.remove()
+
+        country = self.repo.get("country", "CL")
+        self.assertEqual(self.repo.metrics["hits"], 1)
+        self.assertEqual(country.name, "Chile")
+        self.assertIn(country, db.session)
+
+    def test_writes_to_a_cached_copy_are_persisted(self):
+        self.repo.get("country", "CL")
+        db.session.remove()
+
+        country = self.repo.get("country", "CL")
+        country.name = "Chili"
+        self.repo.update(country)
+        db.session.remove()
+
+        self.assertEqual(self.repo.get("country", "CL").name, "Chili")
+        self.assertEqual(self.repo.metrics["misses"], 2)
+
+    def test_written_objects_are_evicted_after_the_commit(self):
+        init_unit_of_work(self.app)
+
+        @self.app.put("/countries/<code>")
+        def rename(code):
+            country = self.repo.get("country", code)
+            country.name = "Chili"
+            self.repo.update(country)
+            # Read before the commit, as a concurrent request could
+            self.repo.get("country", code)
+            self.assertEqual(len(self.repo), 1)
+            return "", 204
+
+        self.ctx.pop()
+        response = self.app.test_client().put("/countries/CL")
+        self.ctx.push()
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(self.repo), 0)
+        self.assertEqual(self.repo.get("country", "CL").name, "Chili")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+from src.persistence.commit import GroupCommit
+
+
+class Writes:
+    """Records the calls of the write callback"""
+
+    def __init__(self, delay=0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, sync):
+        time.sleep(self.delay)
+        self.calls.append(sync)
+
+
+class TestGroupCommit(unittest.TestCase):
+
+    def test_without_group_commit_writes_every_change(self):
+        writes = Writes()
+        commit = GroupCommit(writes, group=False, fsync="os")
+        commit.commit()
+        commit.commit()
+        self.assertEqual(writes.calls, [False, False])
+        self.assertEqual(commit.pending, 0)
+
+    def test_fsync_policies(self):
+        for fsync, sync in (("always", True), ("batch", True), ("os", False)):
+            writes = Writes()
+            GroupCommit(writes, group=False, fsync=fsync).commit()
+            self.assertEqual(writes.calls, [sync])
+
+        with self.assertRaises(ValueError):
+            GroupCommit(Writes(), fsync="sometimes")
+
+    def test_group_commit_batches_changes(self):
+        writes = Writes()
+        commit = GroupCommit(
+            writes, group=True, fsync="batch",
+            interval_ms=10_000, flush_every=5,
+        )
+        for _ in range(4):
+            commit.commit()
+        self.assertEqual(commit.pending, 4)
+        self.assertEqual(writes.calls, [])
+
+        commit.commit()
+        deadline = time.monotonic() + 5
+        while commit.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(writes.calls, [True])
+
+    def test_group_commit_flushes_after_the_interval(self):
+        writes = Writes()
+        commit = GroupCommit(
+            writes, group=True, fsync="os", interval_ms=20, flush_every=100
+        )
+        commit.commit()
+        time.sleep(0.5)
+        self.assertEqual(writes.calls, [False])
+        self.assertEqual(commit.pending, 0)
+
+    def test_explicit_flush(self):
+        writes = Writes()
+        commit = GroupCommit(
+            writes, group=True, fsync="os",
+            interval_ms=10_000, flush_every=100,
+        )
+        commit.commit()
+        commit.commit()
+        commit.flush()
+        self.assertEqual(writes.calls, [False])
+        commit.flush()
+        self.assertEqual(writes.calls, [False])
+
+    def test_always_waits_and_shares_writes(self):
+        writes = Writes(delay=0.05)
+        commit = GroupCommit(
+            writes, group=True, fsync="always",
+            interval_ms=10_000, flush_every=100,
+        )
+        threads = [threading.Thread(target=commit.commit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(commit.pending, 0)
+        # Changes committed during a write share the next one
+        self.assertLess(len(writes.calls), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import gzip
+import json
+import unittest
+from src import create_app
+from src.compression import (
+    codec_level,
+    compress,
+    compression_metrics,
+    encodings,
+)
+from src.config import TestingConfig
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.client.post(
+            "/amenities/bulk",
+            json=[{"name": f"amenity {i}"} for i in range(40)],
+        )
+
+    def get(self, url, encoding="gzip"):
+        return self.client.get(url, headers={"Accept-Encoding": encoding})
+
+    def test_large_responses_are_compressed(self):
+        plain = self.client.get("/amenities")
+        response = self.get("/amenities")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(
+            json.loads(gzip.decompress(response.data)), plain.json
+        )
+
+    def test_small_responses_are_not(self):
+        amenity_id = self.client.get("/amenities").json[0]["id"]
+        response = self.get(f"/amenities/{amenity_id}")
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_unaccepted_encodings_are_not_used(self):
+        response = self.get("/amenities", "identity")
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_tagged_bodies_are_compressed_once(self):
+        self.get("/amenities")
+        hits = compression_metrics["cache_hits"]
+        self.get("/amenities")
+        self.assertEqual(compression_metrics["cache_hits"], hits + 1)
+
+    def test_levels_are_mapped_per_codec(self):
+        self.assertEqual(codec_level("gzip", 6), 6)
+        self.assertEqual(codec_level("br", 6), 5)
+        self.assertEqual(codec_level("zstd", 6), 6)
+        self.assertEqual(codec_level("br", 9), 11)
+        self.assertEqual(codec_level("zstd", 9), 19)
+        self.assertEqual(codec_level("br", 0), 0)
+        self.assertEqual(codec_level("gzip", 12), 9)
+
+    def test_gzip_is_deterministic(self):
+        self.assertIn("gzip", encodings())
+        data = b"{}" * 1000
+        self.assertEqual(compress(data, "gzip", 6), compress(data, "gzip", 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+from unittest import mock
+from flask import Flask
+from src import create_app, db
+from src.config import TestingConfig
+from src.models.amenity import Amenity
+from src.models.country import Country
+from src.models.place import Place
+from src.models.review import Review
+from src.models.user import User
+from src.persistence import ratings
+from src.persistence.db import DBRepository
+from src.persistence.versions import CollectionVersions, collection_versions
+
+
+class TestCollectionVersions(unittest.TestCase):
+
+    def test_bump(self):
+        versions = CollectionVersions()
+        self.assertEqual(versions.get("place"), 0)
+        versions.bump("place", "review")
+        versions.bump("place")
+        self.assertEqual(versions.get("place"), 2)
+        self.assertEqual(versions.get("review"), 1)
+
+
+class TestDatabaseVersions(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_counters_are_bumped_by_commits_only(self):
+        before = collection_versions.get("country")
+
+        db.session.add(Country("Chile", "CL"))
+        db.session.flush()
+        self.assertEqual(collection_versions.get("country"), before)
+        db.session.rollback()
+        self.assertEqual(collection_versions.get("country"), before)
+
+        db.session.add(Country("Peru", "PE"))
+        db.session.flush()
+        db.session.commit()
+        self.assertEqual(collection_versions.get("country"), before + 1)
+
+    def test_database_versions_follow_committed_writes(self):
+        version = DBRepository().collection_version("user")
+        self.assertEqual(version, (0,))
+
+        user = User("ada@example.com", "Ada", "Lovelace", "secret")
+        DBRepository().save(user)
+        created = DBRepository().collection_version("user")
+        self.assertGreater(created, version)
+
+        user.last_name = "Byron"
+        DBRepository().update(user)
+        updated = DBRepository().collection_version("user")
+        self.assertGreater(updated, created)
+
+        db.session.add(User("bob@example.com", "Bob", "B", "secret"))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(DBRepository().collection_version("user"), updated)
+
+        DBRepository().delete(user)
+        self.assertGreater(DBRepository().collection_version("user"), updated)
+        self.assertEqual(DBRepository().collection_version("place"), (0,))
+
+    def test_place_version_is_stored_state(self):
+        place = Place({
+            "name": "Cabin", "address": "Rambla 1", "city_id": "c1",
+            "user_id": "u1", "latitude": -34.9, "longitude": -56.1,
+            "price_per_night": 80,
+        })
+        with mock.patch("src.persistence.repo", DBRepository()), \
+                mock.patch.object(
+                    ratings, "rating_aggregates", side_effect=AssertionError
+                ):
+            version = place.version()
+            self.assertEqual(place.version(), version)
+
+            DBRepository().save(Review(place.id, "u1", "Nice", 5, id=1))
+            self.assertNotEqual(place.version(), version)
+
+class TestConditionalRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        response = self.client.post("/amenities", json={"name": "Wifi"})
+        self.amenity_id = response.json["id"]
+        self.url = f"/amenities/{self.amenity_id}"
+
+    def test_object_not_modified_without_serializing(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        with mock.patch.object(Amenity, "to_dict") as to_dict:
+            response = self.client.get(
+                self.url, headers={"If-None-Match": etag}
+            )
+        self.assertEqual(response.status_code, 304)
+        to_dict.assert_not_called()
+
+    def test_object_tag_changes_with_updates(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        self.client.put(self.url, json={"name": "Fast wifi"})
+
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["name"], "Fast wifi")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_list_tag_follows_the_collection_version(self):
+        etag = self.client.get("/amenities").headers["ETag"]
+        response = self.client.get(
+            "/amenities", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.client.post("/amenities", json={"name": "Pool"})
+        response = self.client.get(
+            "/amenities", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
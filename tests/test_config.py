@@ -16,6 +16,8 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(app.config['JWT_SECRET_KEY'], 'hohohoitsasecret')
         self.assertEqual(app.config['JWT_ACCESS_TOKEN_EXPIRES'], 3600)
         self.assertEqual(app.config['SQLALCHEMY_DATABASE_URI'], 'sqlite:///hbnb.db')
+        self.assertEqual(app.config['PAGE_SIZE'], 50)
+        self.assertEqual(app.config['MAX_PAGE_SIZE'], 500)
 
     def test_config_development(self):
         app = Flask(__name__)
@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from src.models.amenity import Amenity
+from src.models.country import Country
+from src.models.user import User
+from src.persistence.file import DataManager, convert_json_file
+
+
+class TestFileLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "data.jsonl")
+        self.log_filename = self.filename + ".log"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_repo(self):
+        return DataManager(filename=self.filename)
+
+    def log_lines(self):
+        with open(self.log_filename) as file:
+            return [json.loads(line) for line in file]
+
+    def test_writes_are_appended(self):
+        repo = self.open_repo()
+        wifi = repo.save(Amenity("Wifi"))
+        pool = repo.save(Amenity("Pool"))
+        wifi.name = "Fast wifi"
+        repo.update(wifi)
+        repo.delete(pool)
+
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertEqual(
+            [entry["op"] for entry in self.log_lines()],
+            ["save", "save", "update", "delete"],
+        )
+        self.assertEqual(self.log_lines()[3]["key"], pool.id)
+
+    def test_reload_replays_the_log(self):
+        repo = self.open_repo()
+        wifi = repo.save(Amenity("Wifi"))
+        pool = repo.save(Amenity("Pool"))
+        wifi.name = "Fast wifi"
+        repo.update(wifi)
+        repo.delete(pool)
+
+        reloaded = self.open_repo()
+        self.assertEqual(
+            [a.name for a in reloaded.get_all("amenity")], ["Fast wifi"]
+        )
+        self.assertIsNone(reloaded.get("amenity", pool.id))
+
+    def test_compaction_restarts_the_log(self):
+        repo = self.open_repo()
+        for name in ("a", "b", "c"):
+            repo.save(Amenity(name))
+        log_size = os.path.getsize(self.log_filename)
+        repo.compact()
+        repo.save(Amenity("d"))
+
+        with open(self.filename) as file:
+            snapshot = [json.loads(line) for line in file]
+        self.assertEqual(
+            [(e["model"], e["data"]["name"]) for e in snapshot],
+            [("amenity", "a"), ("amenity", "b"), ("amenity", "c")],
+        )
+        self.assertEqual([e["data"]["name"] for e in self.log_lines()], ["d"])
+        self.assertFalse(os.path.exists(self.log_filename + ".1"))
+        self.assertEqual(repo.compaction_metrics["compactions"], 1)
+        self.assertGreaterEqual(
+            repo.compaction_metrics["bytes_reclaimed"], 0
+        )
+        self.assertLess(os.path.getsize(self.filename), 2 * log_size)
+
+        reloaded = self.open_repo()
+        self.assertEqual(reloaded.count("amenity"), 4)
+
+    def test_compaction_runs_in_the_background(self):
+        repo = self.open_repo()
+        repo.compact_min_bytes = 500
+        wifi = repo.save(Amenity("Wifi"))
+        for i in range(20):
+            wifi.name = f"Wifi {i}"
+            repo.update(wifi)
+
+        deadline = time.monotonic() + 5
+        while (repo.compaction_metrics["compactions"] == 0
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        self.assertGreaterEqual(repo.compaction_metrics["compactions"], 1)
+        self.assertGreater(repo.compaction_metrics["bytes_reclaimed"], 0)
+
+        repo.compact()
+        reloaded = self.open_repo()
+        self.assertEqual(
+            [a.name for a in reloaded.get_all("amenity")], ["Wifi 19"]
+        )
+
+    def test_reload_after_an_interrupted_compaction(self):
+        repo = self.open_repo()
+        wifi = repo.save(Amenity("Wifi"))
+        # A compaction that crashed before writing the snapshot
+        os.replace(self.log_filename, self.log_filename + ".1")
+        pool = self.open_repo().save(Amenity("Pool"))
+        self.assertEqual(len(self.log_lines()), 1)
+
+        reloaded = self.open_repo()
+        self.assertEqual(
+            {a.id for a in reloaded.get_all("amenity")}, {wifi.id, pool.id}
+        )
+
+    def test_replay_is_idempotent_and_ignores_a_torn_line(self):
+        repo = self.open_repo()
+        wifi = repo.save(Amenity("Wifi"))
+        with open(self.log_filename) as file:
+            line = file.read()
+        with open(self.log_filename, "a") as file:
+            file.write(line)
+            file.write('{"op": "save", "mod')
+
+        reloaded = self.open_repo()
+        self.assertEqual(
+            [a.id for a in reloaded.get_all("amenity")], [wifi.id]
+        )
+
+        # The torn line is cut off, so later changes are replayed
+        pool = reloaded.save(Amenity("Pool"))
+        self.assertEqual(self.open_repo().count("amenity"), 2)
+        self.assertIsNotNone(self.open_repo().get("amenity", pool.id))
+
+    def test_reload_hydrates_without_constructors(self):
+        repo = self.open_repo()
+        user = User("ada@example.com", "Ada", "Lovelace", "secret")
+        repo.save(user)
+        repo.save(Country("Chile", "CL"))
+        repo.compact()
+
+        with patch.object(User, "__init__", side_effect=AssertionError):
+            reloaded = self.open_repo()
+        loaded = reloaded.get("user", user.id)
+        self.assertEqual(loaded.password, user.password)
+        self.assertTrue(loaded.check_password("secret"))
+        self.assertEqual(loaded.created_at, user.created_at)
+        self.assertEqual(reloaded.get("country", "CL").name, "Chile")
+
+    def test_legacy_json_file_is_converted(self):
+        legacy = os.path.join(self.directory.name, "data.json")
+        wifi = Amenity("Wifi")
+        with open(legacy, "w") as file:
+            json.dump({"amenity": [wifi.to_dict()]}, file)
+
+        reloaded = self.open_repo()
+        self.assertEqual(reloaded.get("amenity", wifi.id).name, "Wifi")
+        self.assertTrue(os.path.exists(self.filename))
+
+        # The snapshot is read back one line per object
+        self.assertEqual(convert_json_file(legacy, self.filename), 1)
+        self.assertEqual(self.open_repo().count("amenity"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+import uuid
+from flask import Flask
+from src import db
+from src.config import TestingConfig
+from src.models.review import Review
+from src.persistence.db import DBRepository
+from src.persistence.file import DataManager
+from src.persistence.memory import MemoryRepository
+from src.persistence.pickled import PickleRepository
+
+
+class FindTests:
+    """find and find_one of a repository, indexed or not, checked against
+    a scan of get_all"""
+
+    def make_repository(self):
+        raise NotImplementedError
+
+    def review_fields(self, index: int) -> dict:
+        """Other arguments of the index-th review"""
+        return {}
+
+    def setUp(self):
+        self.repo = self.make_repository()
+        self.places = [str(uuid.uuid4()) for _ in range(3)]
+        self.users = [str(uuid.uuid4()) for _ in range(2)]
+        self.reviews = [
+            Review(
+                place_id, user_id, f"comment {i}", 1 + i % 5,
+                **self.review_fields(i),
+            )
+            for i, (place_id, user_id) in enumerate(
+                (place_id, user_id)
+                for place_id in self.places
+                for user_id in self.users
+            )
+        ]
+        for review in self.reviews:
+            self.repo.save(review)
+
+    def scan(self, **criteria) -> list:
+        """Ids of the reviews matching criteria, from every review"""
+        return sorted(
+            review.id for review in self.repo.get_all("review")
+            if all(getattr(review, k) == v for k, v in criteria.items())
+        )
+
+    def assertFindsLikeAScan(self):
+        for criteria in [
+            *({"place_id": place_id} for place_id in self.places),
+            *({"user_id": user_id} for user_id in self.users),
+            {"place_id": self.places[0], "user_id": self.users[1]},
+            {"comment": "comment 3"},
+            {"place_id": "nope"},
+        ]:
+            with self.subTest(criteria=criteria):
+                found = self.repo.find("review", **criteria)
+                self.assertEqual(
+                    sorted(r.id for r in found), self.scan(**criteria)
+                )
+                one = self.repo.find_one("review", **criteria)
+                if found:
+                    self.assertIn(one.id, self.scan(**criteria))
+                else:
+                    self.assertIsNone(one)
+
+    def test_find_matches_a_scan(self):
+        self.assertFindsLikeAScan()
+        self.assertEqual(
+            len(self.repo.find("review", place_id=self.places[0])), 2
+        )
+
+    def test_find_follows_updates(self):
+        review = self.reviews[0]
+        review.place_id = self.places[2]
+        self.repo.update(review)
+
+        self.assertFindsLikeAScan()
+        self.assertNotIn(
+            review.id,
+            [r.id for r in self.repo.find("review", place_id=self.places[0])],
+        )
+        self.assertIn(
+            review.id,
+            [r.id for r in self.repo.find("review", place_id=self.places[2])],
+        )
+
+    def test_find_follows_deletes(self):
+        review = self.reviews[1]
+        self.repo.delete(review)
+
+        self.assertFindsLikeAScan()
+        self.assertNotIn(
+            review.id,
+            [r.id for r in self.repo.find("review", user_id=review.user_id)],
+        )
+
+
+class TestMemoryFind(FindTests, unittest.TestCase):
+
+    def make_repository(self):
+        return MemoryRepository()
+
+
+class TestFileFind(FindTests, unittest.TestCase):
+
+    def make_repository(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return DataManager(filename=os.path.join(directory.name, "data.json"))
+
+
+class TestPickleFind(FindTests, unittest.TestCase):
+
+    def make_repository(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return PickleRepository(os.path.join(directory.name, "data.pkl"))
+
+
+class TestDatabaseFind(FindTests, unittest.TestCase):
+
+    def make_repository(self):
+        app = Flask(__name__)
+        app.config.from_object(TestingConfig)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(app)
+        context = app.app_context()
+        context.push()
+        db.create_all()
+        self.addCleanup(context.pop)
+        self.addCleanup(db.drop_all)
+        self.addCleanup(db.session.remove)
+        return DBRepository()
+
+    def review_fields(self, index: int) -> dict:
+        # The id column of reviews is an integer
+        return {"id": index + 1}
+
+
+if __name__ == "__main__":
+    unittest.main()
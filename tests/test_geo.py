@@ -0,0 +1,130 @@
+import random
+import unittest
+from src import create_app
+from src.config import TestingConfig
+from src.models.city import City
+from src.models.place import Place
+from src.models.user import User
+from src.persistence import repo
+from src.persistence.geo import GeoIndex, check_point, haversine_km
+
+
+class TestGeoIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(42)
+        self.index = GeoIndex(cell_deg=1.0)
+        self.points = {}
+        for i in range(3000):
+            lat = self.random.uniform(-90, 90)
+            lng = self.random.uniform(-180, 180)
+            self.points[str(i)] = (lat, lng)
+            self.index.add(str(i), lat, lng)
+
+    def brute_radius(self, lat, lng, radius_km):
+        return sorted(
+            (haversine_km(lat, lng, plat, plng), key)
+            for key, (plat, plng) in self.points.items()
+            if haversine_km(lat, lng, plat, plng) <= radius_km
+        )
+
+    def test_haversine(self):
+        # Montevideo to Buenos Aires
+        self.assertAlmostEqual(
+            haversine_km(-34.9011, -56.1645, -34.6037, -58.3816), 204, delta=2
+        )
+
+    def test_within_radius_matches_brute_force(self):
+        centers = [(0, 0), (-34.9, -56.2), (0, 179.9), (0, -179.9),
+                   (89.5, 10), (-89.9, -150), (45, 90)]
+        for lat, lng in centers:
+            for radius in (50, 500, 3000, 25000):
+                self.assertEqual(
+                    self.index.within_radius(lat, lng, radius),
+                    self.brute_radius(lat, lng, radius),
+                    f"radius {radius} around {lat}, {lng}",
+                )
+
+    def test_within_bbox_matches_brute_force(self):
+        boxes = [(-10, -10, 10, 10), (30, 170, 60, -170), (-90, -180, 90, 180)]
+        for south, west, north, east in boxes:
+            expected = {
+                key for key, (lat, lng) in self.points.items()
+                if south <= lat <= north
+                and ((lng >= west or lng <= east) if west > east
+                     else west <= lng <= east)
+            }
+            self.assertEqual(
+                set(self.index.within_bbox(south, west, north, east)),
+                expected,
+            )
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lng in [(0, 0), (60, 179.5), (-80, 20)]:
+            expected = self.brute_radius(lat, lng, 30000)[:15]
+            self.assertEqual(self.index.nearest(lat, lng, 15), expected)
+
+    def test_move_and_remove(self):
+        self.index.add("0", 10, 10)
+        self.assertIn("0", [k for _, k in self.index.within_radius(10, 10, 1)])
+        self.assertTrue(self.index.remove("0"))
+        self.assertFalse(self.index.remove("0"))
+        self.assertNotIn("0", [k for _, k in self.index.within_radius(10, 10, 1)])
+        self.assertEqual(len(self.index), 2999)
+
+
+class TestCoordinates(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+
+        self.user = User("geo@example.com", "Geo", "User", "secret")
+        repo.save(self.user)
+        self.city = City.create({"name": "Montevideo", "country_code": "UY"})
+        self.data = {
+            "name": "Cabin", "address": "Rambla 1",
+            "user_id": self.user.id, "city_id": self.city.id,
+            "latitude": -34.9, "longitude": -56.1,
+        }
+
+    def test_check_point(self):
+        self.assertEqual(check_point("-34.9", 10), (-34.9, 10.0))
+        for lat, lng in (("nan", 0), (0, "inf"), (91, 0), (0, -181)):
+            with self.assertRaises(ValueError):
+                check_point(lat, lng)
+
+    def test_invalid_search_parameters(self):
+        for query in (
+            "lat=nan&lng=0&radius_km=1",
+            "lat=0&lng=0&radius_km=nan",
+            "lat=0&lng=inf&k=3",
+            "lat=0&lng=0&k=0",
+            "lat=0&lng=0&k=-1",
+            "lat=95&lng=0&radius_km=1",
+            "lat=0&lng=0&radius_km=-1",
+            "bbox=nan,0,1,1",
+            "bbox=-100,0,1,1",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f"/places/search?{query}")
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_coordinates_are_not_saved(self):
+        with self.assertRaises(ValueError):
+            Place.build({**self.data, "latitude": "nan"})
+
+        place = Place.create(self.data)
+        with self.assertRaises(ValueError):
+            Place.update(place.id, {"latitude": 120})
+        self.assertEqual(Place.get(place.id).latitude, -34.9)
+
+        place = Place.update(place.id, {"longitude": "-56.2"})
+        self.assertEqual(place.longitude, -56.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
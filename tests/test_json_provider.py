@@ -0,0 +1,121 @@
+import json
+import unittest
+from datetime import datetime
+from unittest import mock
+from flask import Flask
+from src import create_app, db, json_provider
+from src.config import TestingConfig
+from src.models.amenity import Amenity, PlaceAmenity
+from src.models.city import City
+from src.models.country import Country
+from src.models.place import Place
+from src.models.review import Review
+from src.models.user import User
+
+
+class TestModelJSONProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.context = self.app.app_context()
+        self.context.push()
+        self.addCleanup(self.context.pop)
+
+        place = Place({
+            "name": "Cabin",
+            "address": "Rambla 1",
+            "city_id": "c1",
+            "user_id": "u1",
+            "latitude": -34.9,
+            "longitude": -56.1,
+            "price_per_night": 80,
+        })
+        self.objs = [
+            place,
+            Amenity("Wifi"),
+            PlaceAmenity(place.id, "a1"),
+            City("Montevideo", "UY", id="c1"),
+            Country("Uruguay", "UY"),
+            Review(place.id, "u1", "Lovely, señor", 4.5),
+            User("ana@example.com", "Ana", "Pérez", "secret"),
+        ]
+
+    def assertEncodesLikeToDict(self):
+        for obj in self.objs:
+            with self.subTest(obj=obj):
+                body = self.app.json.dumps(obj)
+                self.assertEqual(json.loads(body), obj.to_dict())
+                self.assertEqual(self.app.json.loads(body), obj.to_dict())
+
+        body = self.app.json.dumps(self.objs)
+        self.assertEqual(
+            json.loads(body), [obj.to_dict() for obj in self.objs]
+        )
+
+    def test_models_are_encoded_like_their_dicts(self):
+        self.assertEncodesLikeToDict()
+
+    def test_stdlib_fallback(self):
+        with mock.patch.object(json_provider, "orjson", None):
+            self.assertEncodesLikeToDict()
+
+    def test_both_encoders_write_the_same_body(self):
+        encoded = self.app.json.dumps(self.objs)
+        with mock.patch.object(json_provider, "orjson", None):
+            self.assertEqual(self.app.json.dumps(self.objs), encoded)
+
+    def test_both_encoders_read_back_the_same_values(self):
+        values = {"floats": [1e-05, 1e16], "keys": {1: "one", 2: "two"}}
+        encoded = self.app.json.dumps(values)
+        with mock.patch.object(json_provider, "orjson", None):
+            self.assertEqual(
+                json.loads(self.app.json.dumps(values)), json.loads(encoded)
+            )
+
+    def test_datetimes_are_iso_strings(self):
+        moment = datetime(2024, 5, 1, 12, 30, 15, 250)
+        self.assertEqual(
+            self.app.json.loads(self.app.json.dumps({"at": moment})),
+            {"at": moment.isoformat()},
+        )
+
+    def test_list_endpoints_send_the_dicts(self):
+        client = self.app.test_client()
+        client.post("/amenities", json={"name": "Pool"})
+
+        response = client.get("/amenities")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json)
+        for amenity in response.json:
+            self.assertEqual(amenity, Amenity.get(amenity["id"]).to_dict())
+
+
+class TestExpiredObjects(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        self.app.json = json_provider.ModelJSONProvider(self.app)
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_expired_columns_are_loaded(self):
+        user = User("ana@example.com", "Ana", "Pérez", "secret")
+        db.session.add(user)
+        db.session.commit()
+        self.assertNotIn("email", user.__dict__)
+
+        body = self.app.json.dumps([user])
+        self.assertEqual(json.loads(body), [user.to_dict()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from flask import json
 from src import create_app, db
 from src.models.user import User
+from src.persistence import repo
 from src.config import TestingConfig
 
 class TestAuth(unittest.TestCase):
@@ -37,9 +38,9 @@ class TestAuth(unittest.TestCase):
                 is_admin=True
             )
             
-            db.session.add(self.normal_user)
-            db.session.add(self.admin_user)
-            db.session.commit()
+            # Saved through the repository login reads them from
+            repo.save(self.normal_user)
+            repo.save(self.admin_user)
             print("Test users created")
 
         print("Registered routes:")
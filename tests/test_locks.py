@@ -0,0 +1,118 @@
+import pickle
+import threading
+import time
+import unittest
+from src.persistence.locks import RWLock
+from src.persistence.store import ModelStore
+from tests.test_store import Review
+
+
+class TestRWLock(unittest.TestCase):
+
+    def test_readers_share_the_lock(self):
+        lock = RWLock()
+        inside = threading.Barrier(3, timeout=5)
+
+        def read():
+            with lock.read():
+                # Only passes if the three readers hold the lock together
+                inside.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(inside.broken)
+
+    def test_writer_excludes_readers(self):
+        lock = RWLock()
+        events = []
+
+        def read():
+            with lock.read():
+                events.append("read")
+
+        with lock.write():
+            reader = threading.Thread(target=read)
+            reader.start()
+            time.sleep(0.05)
+            events.append("write done")
+        reader.join()
+
+        self.assertEqual(events, ["write done", "read"])
+
+    def test_writers_are_serialized(self):
+        lock = RWLock()
+        counter = [0]
+
+        def write():
+            for _ in range(1000):
+                with lock.write():
+                    value = counter[0]
+                    time.sleep(0)
+                    counter[0] = value + 1
+
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter[0], 4000)
+
+
+class TestConcurrentStore(unittest.TestCase):
+
+    def test_concurrent_writes_and_reads(self):
+        store = ModelStore()
+        errors = []
+
+        def write(start):
+            for i in range(start, start + 500):
+                review = Review(str(i), f"p{i % 5}", "u1")
+                store.add(review)
+                review.place_id = f"p{(i + 1) % 5}"
+                store.replace(review)
+                if i % 2:
+                    store.remove(review)
+
+        def read():
+            try:
+                for _ in range(500):
+                    for review in store.lookup("review", place_id="p1"):
+                        assert review.place_id == "p1"
+                    store.all("review", limit=10, offset=5)
+                    store.page_after("review", 10)
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=write, args=(n * 500,)) for n in range(4)
+        ] + [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(store.count("review"), 1000)
+        self.assertEqual(
+            sum(len(store.lookup("review", place_id=f"p{n}"))
+                for n in range(5)),
+            1000,
+        )
+        self.assertEqual(len(store.page_after("review", 2000)), 1000)
+
+    def test_pickle_without_locks(self):
+        store = ModelStore()
+        store.add(Review("1", "p1", "u1"))
+
+        copy = pickle.loads(pickle.dumps(store))
+        copy.add(Review("2", "p1", "u1"))
+
+        self.assertEqual(len(copy.lookup("review", place_id="p1")), 2)
+        self.assertEqual(store.count("review"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import base64
+import unittest
+import uuid
+from datetime import datetime
+from flask import Flask
+from src import create_app, db
+from src.config import TestingConfig
+from src.controllers.pagination import encode_cursor
+from src.models.amenity import Amenity
+from src.persistence import repo
+from src.persistence.db import DBRepository
+
+# Shared by the objects of a batch, so that only their ids order them
+MOMENT = datetime(2024, 5, 1, 12, 0, 0)
+
+
+class TestOffsetPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config["PAGE_SIZE"] = 2
+        self.app.config["MAX_PAGE_SIZE"] = 3
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            for _ in range(4):
+                repo.save(Amenity(f"amenity {uuid.uuid4()}"))
+
+    def ids(self, limit=None, offset=0) -> list:
+        """Ids of the amenities of a page, read from the repository"""
+        with self.app.app_context():
+            return [a.id for a in repo.get_all("amenity", limit, offset)]
+
+    def test_default_limit_and_offset(self):
+        response = self.client.get("/amenities")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Limit"], "2")
+        self.assertEqual(response.headers["X-Offset"], "0")
+        self.assertEqual(
+            [a["id"] for a in response.json], self.ids(limit=2)
+        )
+
+    def test_page_contents_and_headers(self):
+        response = self.client.get("/amenities?limit=2&offset=1")
+        self.assertEqual(response.headers["X-Limit"], "2")
+        self.assertEqual(response.headers["X-Offset"], "1")
+        self.assertEqual(
+            response.headers["X-Total-Count"], str(len(self.ids()))
+        )
+        self.assertEqual(
+            [a["id"] for a in response.json], self.ids(limit=2, offset=1)
+        )
+
+    def test_limit_is_capped(self):
+        response = self.client.get("/amenities?limit=1000")
+        self.assertEqual(response.headers["X-Limit"], "3")
+        self.assertEqual(len(response.json), 3)
+
+    def test_offset_past_the_end(self):
+        offset = len(self.ids())
+        response = self.client.get(f"/amenities?offset={offset}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, [])
+
+    def test_invalid_arguments(self):
+        for query in ("limit=abc", "offset=1.5", "limit=-1", "offset=-2"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/amenities?{query}")
+                self.assertEqual(response.status_code, 400)
+
+
+class TestCursorPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            for _ in range(5):
+                repo.save(
+                    Amenity(f"amenity {uuid.uuid4()}", created_at=MOMENT)
+                )
+            amenities = repo.get_all("amenity")
+        self.ids = [
+            a.id for a in sorted(amenities, key=lambda a: (a.created_at, a.id))
+        ]
+
+    def walk(self, limit: int) -> tuple[list, list]:
+        """Ids of every page read by following X-Next-Cursor, and the
+        responses"""
+        ids, responses, cursor = [], [], ""
+        while cursor is not None:
+            response = self.client.get(
+                f"/amenities?limit={limit}&cursor={cursor}"
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json), limit)
+            ids += [a["id"] for a in response.json]
+            responses.append(response)
+            cursor = response.headers.get("X-Next-Cursor")
+        return ids, responses
+
+    def test_pages_cover_every_object_once(self):
+        for limit in (1, 2, 3, len(self.ids)):
+            with self.subTest(limit=limit):
+                ids, responses = self.walk(limit)
+                self.assertEqual(ids, self.ids)
+                self.assertNotIn("X-Total-Count", responses[0].headers)
+
+    def test_last_page_has_no_cursor(self):
+        limit = len(self.ids) + 1
+        response = self.client.get(f"/amenities?limit={limit}&cursor=")
+        self.assertEqual([a["id"] for a in response.json], self.ids)
+        self.assertNotIn("X-Next-Cursor", response.headers)
+
+    def test_cursor_within_equal_created_at(self):
+        with self.app.app_context():
+            after = repo.get("amenity", self.ids[-2])
+            cursor = encode_cursor(after)
+        response = self.client.get(f"/amenities?limit=5&cursor={cursor}")
+        self.assertEqual([a["id"] for a in response.json], self.ids[-1:])
+
+    def test_malformed_cursors(self):
+        for cursor in (
+            "not base64!",
+            base64.urlsafe_b64encode(b"[1, 2, 3]").decode(),
+            base64.urlsafe_b64encode(b'["yesterday", "x"]').decode(),
+            base64.urlsafe_b64encode(b"{}").decode(),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(f"/amenities?cursor={cursor}")
+                self.assertEqual(response.status_code, 400)
+
+
+class TestDatabaseKeyset(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.repo = DBRepository()
+
+        amenities = [
+            Amenity(f"amenity {i}", created_at=MOMENT) for i in range(5)
+        ]
+        amenities.append(Amenity("later", created_at=datetime(2024, 6, 1)))
+        self.repo.save_many(amenities)
+        self.ids = [
+            a.id for a in sorted(amenities, key=lambda a: (a.created_at, a.id))
+        ]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_pages_follow_created_at_then_id(self):
+        ids, after = [], None
+        while True:
+            page = self.repo.get_page("amenity", 2, after)
+            ids += [a.id for a in page]
+            if len(page) < 2:
+                break
+            after = (page[-1].created_at, page[-1].id)
+        self.assertEqual(ids, self.ids)
+
+    def test_first_page(self):
+        page = self.repo.get_page("amenity", 3)
+        self.assertEqual([a.id for a in page], self.ids[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
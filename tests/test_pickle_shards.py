@@ -0,0 +1,73 @@
+import os
+import pickle
+import tempfile
+import unittest
+from src.models.amenity import Amenity
+from src.models.country import Country
+from src.persistence.pickled import PickleRepository
+from src.persistence.store import ModelStore
+
+
+class TestPickleShards(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "data.pkl")
+        self.shards = self.filename + ".d"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open_repo(self):
+        return PickleRepository(self.filename)
+
+    def test_new_repository_writes_its_shards(self):
+        repo = self.open_repo()
+        self.assertIn("country.pkl", os.listdir(self.shards))
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertEqual(repo.get("country", "UY").name, "Uruguay")
+
+    def test_only_the_changed_shard_is_written(self):
+        repo = self.open_repo()
+        country_shard = os.path.join(self.shards, "country.pkl")
+        os.utime(country_shard, (0, 0))
+        written = repo.checkpoint_metrics["shards_written"]
+
+        wifi = Amenity("Wifi")
+        repo.save(wifi)
+        wifi.name = "Fast wifi"
+        repo.update(wifi)
+
+        self.assertEqual(
+            repo.checkpoint_metrics["shards_written"], written + 2
+        )
+        self.assertEqual(os.path.getmtime(country_shard), 0)
+
+    def test_shards_are_loaded_on_first_access(self):
+        repo = self.open_repo()
+        repo.save(Amenity("Wifi"))
+
+        reloaded = self.open_repo()
+        self.assertEqual(reloaded.loaded, set())
+        self.assertEqual(
+            [a.name for a in reloaded.get_all("amenity")], ["Wifi"]
+        )
+        self.assertEqual(reloaded.loaded, {"amenity"})
+
+    def test_single_pickle_file_is_split_into_shards(self):
+        store = ModelStore()
+        store.add(Country("Chile", "CL"))
+        store.add(Amenity("Pool"))
+        with open(self.filename, "wb") as file:
+            pickle.dump(store, file)
+
+        repo = self.open_repo()
+        self.assertEqual(repo.get("country", "CL").name, "Chile")
+        self.assertTrue(
+            os.path.exists(os.path.join(self.shards, "amenity.pkl"))
+        )
+        self.assertEqual(self.open_repo().count("amenity"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import unittest
+import uuid
+from unittest import mock
+from flask import Flask
+from flask_jwt_extended import create_access_token
+from src import create_app, db
+from src.config import TestingConfig
+from src.models.city import City
+from src.models.place import Place
+from src.models.review import Review
+from src.models.user import User
+from src.persistence import ratings, repo
+from src.persistence.ratings import (
+    DatabaseRatings,
+    RatingAggregates,
+    rating_aggregates,
+)
+
+
+class TestRatingAggregates(unittest.TestCase):
+
+    def setUp(self):
+        self.ratings = RatingAggregates()
+        self.ratings.add("p1", "u1", 5.0)
+        self.ratings.add("p1", "u2", 4.0)
+        self.ratings.add("p1", "u1", 4.0)
+        self.ratings.add("p2", "u2", 2.5)
+
+    def test_place_stats(self):
+        stats = self.ratings.place("p1")
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.total, 13.0)
+        self.assertAlmostEqual(stats.average, 13 / 3)
+        self.assertEqual(
+            stats.to_dict()["histogram"], {"4.0": 2, "5.0": 1}
+        )
+
+    def test_user_stats(self):
+        self.assertEqual(self.ratings.user("u1").count, 2)
+        self.assertEqual(self.ratings.user("u1").average, 4.5)
+        self.assertEqual(self.ratings.user("u2").total, 6.5)
+
+    def test_unknown_keys(self):
+        stats = self.ratings.place("nope")
+        self.assertEqual(stats.count, 0)
+        self.assertIsNone(stats.average)
+        self.assertEqual(stats.to_dict()["histogram"], {})
+
+    def test_remove(self):
+        self.ratings.remove("p1", "u1", 5.0)
+        stats = self.ratings.place("p1")
+        self.assertEqual(stats.count, 2)
+        self.assertEqual(stats.average, 4.0)
+        self.assertEqual(stats.to_dict()["histogram"], {"4.0": 2})
+        self.assertEqual(self.ratings.user("u1").count, 1)
+
+        self.ratings.remove("p2", "u2", 2.5)
+        self.assertEqual(self.ratings.place("p2").count, 0)
+        self.assertEqual(self.ratings.place("p2").total, 0.0)
+
+    def test_update_is_remove_then_add(self):
+        self.ratings.remove("p2", "u2", 2.5)
+        self.ratings.add("p2", "u2", 3.5)
+        self.assertEqual(self.ratings.place("p2").average, 3.5)
+        self.assertEqual(self.ratings.user("u2").total, 7.5)
+
+    def test_removing_an_uncounted_rating_changes_nothing(self):
+        self.ratings.remove("p1", "u1", 1.0)
+        self.ratings.remove("p2", "u2", 2.5)
+        self.ratings.remove("p2", "u2", 2.5)
+        stats = self.ratings.place("p1")
+        self.assertEqual((stats.count, stats.total), (3, 13.0))
+        self.assertEqual(
+            stats.to_dict()["histogram"], {"4.0": 2, "5.0": 1}
+        )
+        self.assertEqual(self.ratings.place("p2").count, 0)
+        self.assertEqual(self.ratings.user("u2").count, 1)
+        self.assertEqual(
+            self.ratings.user("u2").to_dict()["histogram"], {"4.0": 1}
+        )
+
+    def test_ratings_are_floats(self):
+        self.ratings.add("p3", "u3", 4)
+        self.ratings.add("p3", "u3", "4")
+        self.assertEqual(
+            self.ratings.place("p3").to_dict()["histogram"], {"4.0": 2}
+        )
+
+
+class TestDatabaseRatings(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        # Review ids are integers in the database; 9.0 is a legacy rating
+        for i, (place_id, user_id, rating) in enumerate((
+            ("p1", "u1", 5.0), ("p1", "u2", 4.0), ("p1", "u1", 4.0),
+            ("p2", "u2", 2.5), ("p2", "u1", 9.0),
+        )):
+            db.session.add(Review(place_id, user_id, "ok", rating, id=i + 1))
+        db.session.commit()
+        self.ratings = DatabaseRatings()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_place_stats(self):
+        stats = self.ratings.place("p1")
+        self.assertEqual((stats.count, stats.total), (3, 13.0))
+        self.assertEqual(
+            stats.to_dict()["histogram"], {"4.0": 2, "5.0": 1}
+        )
+        self.assertEqual(self.ratings.place("nope").count, 0)
+
+    def test_user_stats_skip_invalid_ratings(self):
+        self.assertEqual(self.ratings.user("u1").count, 2)
+        self.assertEqual(self.ratings.user("u1").average, 4.5)
+
+    def test_place_ratings_in_one_query(self):
+        self.assertEqual(
+            self.ratings.place_ratings(["p2", "nope", "p1"]),
+            [(1, 2.5), (0, None), (3, 13 / 3)],
+        )
+
+    def test_reads_the_committed_reviews(self):
+        # Written by another worker, without the hooks of this process
+        db.session.add(Review("p2", "u2", "ok", 3.5, id=10))
+        db.session.commit()
+        self.assertEqual(self.ratings.place("p2").average, 3.0)
+
+
+class TestRatingValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        self.addCleanup(self.ctx.pop)
+
+        self.user = User(f"{uuid.uuid4()}@example.com", "Ada", "L", "pw")
+        repo.save(self.user)
+        city = City.create({"name": "Montevideo", "country_code": "UY"})
+        self.place = Place.create({
+            "name": "Cabin", "address": "Rambla 1", "user_id": self.user.id,
+            "city_id": city.id, "latitude": -34.9, "longitude": -56.1,
+        })
+        self.url = f"/places/{self.place.id}/reviews"
+
+    def review(self, rating):
+        return {"user_id": self.user.id, "comment": "Nice", "rating": rating}
+
+    def test_check_rating(self):
+        self.assertEqual(Review.check_rating("4.5"), 4.5)
+        for rating in ("abc", None, "nan", 0, 6):
+            with self.assertRaises(ValueError):
+                Review.check_rating(rating)
+
+    def test_legacy_ratings_out_of_range_are_skipped(self):
+        for rating in (9.0, 0.0, 4.0):
+            repo.save(Review(self.place.id, self.user.id, "Old", rating))
+
+        with mock.patch.object(ratings, "_ratings", None):
+            stats = rating_aggregates().place(self.place.id)
+        self.assertEqual((stats.count, stats.total), (1, 4.0))
+
+    def test_invalid_rating_is_not_created(self):
+        response = self.client.post(self.url, json=self.review("abc"))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Review.find(place_id=self.place.id), [])
+
+    def test_invalid_rating_is_not_updated(self):
+        review_id = self.client.post(self.url, json=self.review(4)).json["id"]
+
+        response = self.client.put(
+            f"/reviews/{review_id}", json={"rating": "zzz"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Review.get(review_id).rating, 4.0)
+        stats = rating_aggregates().place(self.place.id)
+        self.assertEqual((stats.count, stats.total), (1, 4.0))
+
+    def test_invalid_rating_in_bulk_is_reported(self):
+        token = create_access_token(identity=self.user.id)
+        response = self.client.post(
+            "/reviews/bulk",
+            json=[self.review(5) | {"place_id": self.place.id},
+                  self.review("abc") | {"place_id": self.place.id}],
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            response.json["errors"],
+            [{"index": 1, "error": "rating must be a number"}],
+        )
+        self.assertEqual(len(Review.find(place_id=self.place.id)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import pickle
+import unittest
+from datetime import datetime
+from src.models.review import Review
+from src.models.user import User
+from src.persistence.records import Record, to_model, to_record
+from src.persistence.store import ModelStore
+
+
+class TestRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.review = Review(
+            place_id="place-1", user_id="user-1", comment="Nice", rating=4.5
+        )
+        self.review.id = "review-1"
+        self.review.created_at = datetime(2024, 1, 1)
+        self.review.updated_at = datetime(2024, 1, 2)
+
+    def test_round_trip(self):
+        record = to_record(self.review)
+        self.assertIsInstance(record, Record)
+        self.assertFalse(hasattr(record, "__dict__"))
+
+        review = to_model(record)
+        self.assertIsInstance(review, Review)
+        self.assertIsNot(review, self.review)
+        self.assertEqual(review.to_dict(), self.review.to_dict())
+
+    def test_ids_are_interned(self):
+        other = Review(
+            place_id="".join(["place", "-1"]), user_id="user-1",
+            comment="Meh", rating=2,
+        )
+        self.assertIs(
+            to_record(self.review).place_id, to_record(other).place_id
+        )
+
+    def test_hydration_skips_the_constructor(self):
+        user = User("a@b.c", "A", "B", "secret")
+        record = to_record(user)
+        self.assertEqual(to_model(record).password, user.password)
+
+    def test_pickle(self):
+        record = pickle.loads(pickle.dumps(to_record(self.review)))
+        self.assertEqual(to_model(record).to_dict(), self.review.to_dict())
+
+    def test_compact_store(self):
+        store = ModelStore(compact=True)
+        store.add(self.review)
+
+        stored = store.get("review", "review-1")
+        self.assertIsInstance(stored, Review)
+        self.assertEqual(stored.to_dict(), self.review.to_dict())
+
+        stored.comment = "Changed"
+        self.assertEqual(store.get("review", "review-1").comment, "Nice")
+        store.replace(stored)
+        self.assertEqual(store.get("review", "review-1").comment, "Changed")
+
+        self.assertEqual(
+            [r.id for r in store.lookup("review", place_id="place-1")],
+            ["review-1"],
+        )
+        self.assertEqual(len(store.page_after("review", 10)), 1)
+        self.assertTrue(store.remove(stored))
+        self.assertEqual(store.count("review"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
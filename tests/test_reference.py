@@ -0,0 +1,133 @@
+import time
+import unittest
+from unittest import mock
+from flask import Flask
+from src import create_app, db
+from src.config import TestingConfig
+from src.models.city import City
+from src.models.country import Country
+from src.persistence.db import DBRepository
+from src.persistence.reference import (
+    ReferenceData,
+    reference_data,
+    reset_reference_data,
+)
+
+
+class TestReferenceData(unittest.TestCase):
+
+    def setUp(self):
+        self.reference = ReferenceData()
+        self.reference.put_country(Country("Uruguay", "UY"))
+        self.reference.put_country(Country("Chile", "CL"))
+
+    def test_countries_by_code(self):
+        self.assertEqual(self.reference.country("CL").name, "Chile")
+        self.assertIsNone(self.reference.country("AR"))
+        self.assertEqual(len(self.reference.countries()), 2)
+
+    def test_cities_follow_their_country(self):
+        city = City("Montevideo", "UY", id="c1")
+        self.reference.put_city(city)
+        self.assertEqual(self.reference.cities("UY"), [city])
+
+        city.country_code = "CL"
+        self.reference.put_city(city)
+        self.assertEqual(self.reference.cities("UY"), [])
+        self.assertEqual(self.reference.cities("CL"), [city])
+
+        self.reference.remove_city("c1")
+        self.assertEqual(self.reference.cities("CL"), [])
+
+    def test_etag_changes_with_the_countries(self):
+        etag = self.reference.etag
+        self.reference.put_country(Country("Chile", "CL"))
+        self.assertEqual(self.reference.etag, etag)
+        self.reference.put_country(Country("Argentina", "AR"))
+        self.assertNotEqual(self.reference.etag, etag)
+
+
+class TestReferenceReload(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        repository = DBRepository()
+        for name in ("repo", "backend"):
+            patcher = mock.patch(f"src.persistence.{name}", repository)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        reset_reference_data()
+        self.addCleanup(reset_reference_data)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_writes_of_this_worker_are_applied(self):
+        db.session.add(Country("Uruguay", "UY"))
+        db.session.commit()
+        reference = reference_data()
+
+        City.create({"name": "Montevideo", "country_code": "UY", "id": 1})
+        self.assertEqual(
+            [city.name for city in reference.cities("UY")], ["Montevideo"]
+        )
+        City.delete(1)
+        self.assertEqual(reference.cities("UY"), [])
+        self.assertIs(reference_data(), reference)
+
+    def test_writes_of_other_workers_are_read_after_the_ttl(self):
+        db.session.add(Country("Uruguay", "UY"))
+        db.session.commit()
+        reference = reference_data()
+        self.assertEqual(reference.cities("UY"), [])
+
+        # Committed by another process, without the hooks of this one
+        db.session.add(City("Montevideo", "UY", id=1))
+        db.session.add(Country("Chile", "CL"))
+        db.session.commit()
+        self.assertIs(reference_data(), reference)
+        self.assertIsNone(reference.country("CL"))
+
+        later = time.monotonic() + TestingConfig.REFERENCE_DATA_TTL + 1
+        with mock.patch("time.monotonic", return_value=later):
+            reference = reference_data()
+        self.assertEqual(
+            [city.name for city in reference.cities("UY")], ["Montevideo"]
+        )
+        self.assertEqual(reference.country("CL").name, "Chile")
+
+
+class TestCountriesEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+
+    def test_countries_are_cacheable(self):
+        response = self.client.get("/countries")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("UY", [c["code"] for c in response.json])
+        self.assertIsNotNone(response.headers.get("ETag"))
+        self.assertIn("max-age=", response.headers["Cache-Control"])
+
+    def test_not_modified(self):
+        etag = self.client.get("/countries").headers["ETag"]
+        response = self.client.get(
+            "/countries", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from src.models.city import City
+from src.models.country import Country
+from src.models.place import Place
+from src.models.review import Review
+from src.models.user import User
+from src.persistence.relations import expand, parse_include
+from src.persistence.store import ModelStore
+
+
+class CountingRepository:
+    """Repository over a ModelStore counting its batched lookups"""
+
+    def __init__(self, store):
+        self.store = store
+        self.lookups = 0
+
+    def find_many(self, model_name, field, values):
+        self.lookups += 1
+        return self.store.lookup_many(model_name, field, values)
+
+
+class TestRelations(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ModelStore()
+        self.store.add(Country("Uruguay", "UY"))
+        self.host = User.from_record({
+            "id": "u1", "email": "ada@example.com", "first_name": "Ada",
+            "last_name": "Lovelace", "password": "hash", "is_admin": False,
+            "created_at": "2024-01-01T00:00:00",
+            "updated_at": "2024-01-01T00:00:00",
+        })
+        self.store.add(self.host)
+        self.city = City("Montevideo", "UY", id="c1")
+        self.store.add(self.city)
+        self.places = []
+        for i in range(20):
+            place = Place({"name": f"place {i}", "city_id": "c1",
+                           "user_id": "u1"}, id=f"p{i}")
+            self.store.add(place)
+            self.places.append(place)
+            if i % 2:
+                self.store.add(Review(place.id, "u1", "Nice", 4.0))
+
+    def test_parse_include(self):
+        self.assertEqual(
+            parse_include("place", "city.country, host,reviews"),
+            {"city": {"country": {}}, "host": {}, "reviews": {}},
+        )
+        self.assertEqual(parse_include("place", None), {})
+        with self.assertRaises(ValueError):
+            parse_include("place", "city.host")
+
+    def test_lookup_many(self):
+        self.assertEqual(
+            len(self.store.lookup_many("review", "place_id", ["p1", "p3"])), 2
+        )
+        self.assertEqual(
+            self.store.lookup_many("city", "id", ["c1", "missing"]),
+            [self.city],
+        )
+        self.assertEqual(self.store.lookup_many("place", "name", []), [])
+
+    def test_expand_does_one_lookup_per_relation(self):
+        repo = CountingRepository(self.store)
+        include = parse_include("place", "city,city.country,host,reviews")
+        dicts = expand(repo, "place", self.places, include)
+
+        self.assertEqual(repo.lookups, 4)
+        self.assertEqual(dicts[0]["city"]["country"]["name"], "Uruguay")
+        self.assertEqual(dicts[0]["host"]["email"], "ada@example.com")
+        self.assertEqual(
+            [len(d["reviews"]) for d in dicts[:4]], [0, 1, 0, 1]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
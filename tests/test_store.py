@@ -0,0 +1,222 @@
+import unittest
+from datetime import datetime, timedelta
+from src.persistence.store import ModelStore
+
+
+class Place:
+    """Minimal object stored under the "place" model"""
+
+    def __init__(self, id, name="Place", created_at=None):
+        self.id = id
+        self.name = name
+        self.created_at = created_at or datetime.now()
+
+
+class Review:
+    """Minimal object indexed by place_id and user_id"""
+
+    def __init__(self, id, place_id, user_id, rating=5):
+        self.id = id
+        self.place_id = place_id
+        self.user_id = user_id
+        self.rating = rating
+
+
+class PlaceAmenity:
+    """Minimal object indexed by the (place_id, amenity_id) pair"""
+
+    def __init__(self, id, place_id, amenity_id):
+        self.id = id
+        self.place_id = place_id
+        self.amenity_id = amenity_id
+
+
+class User:
+    """Minimal object in the unique index of emails"""
+
+    def __init__(self, id, email):
+        self.id = id
+        self.email = email
+
+
+class Country:
+    """Minimal object keyed by its code"""
+
+    def __init__(self, code, name="Country"):
+        self.code = code
+        self.name = name
+
+
+class TestModelStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = ModelStore()
+
+    def test_add_and_get(self):
+        place = Place("1")
+        self.assertTrue(self.store.add(place))
+        self.assertIs(self.store.get("place", "1"), place)
+        self.assertIsNone(self.store.get("place", "2"))
+
+    def test_add_duplicate_key(self):
+        self.store.add(Place("1"))
+        self.assertFalse(self.store.add(Place("1", "Other")))
+        self.assertEqual(self.store.get("place", "1").name, "Place")
+        self.assertEqual(self.store.count("place"), 1)
+
+    def test_all_keeps_insertion_order(self):
+        for i in range(5):
+            self.store.add(Place(str(4 - i)))
+        self.store.replace(Place("2", "Updated"))
+        self.assertEqual(
+            [p.id for p in self.store.all("place")], ["4", "3", "2", "1", "0"]
+        )
+        self.assertEqual(self.store.get("place", "2").name, "Updated")
+
+    def test_all_with_limit_and_offset(self):
+        for i in range(10):
+            self.store.add(Place(str(i)))
+        self.assertEqual(
+            [p.id for p in self.store.all("place", limit=3, offset=4)],
+            ["4", "5", "6"],
+        )
+        self.assertEqual(len(self.store.all("place", offset=8)), 2)
+        self.assertEqual(self.store.all("place", limit=5, offset=20), [])
+
+    def test_page_after(self):
+        start = datetime(2024, 1, 1)
+        # Saved out of creation order, with a tie on created_at
+        for i in (3, 0, 4, 1, 2):
+            created_at = start + timedelta(days=min(i, 3))
+            self.store.add(Place(str(i), created_at=created_at))
+
+        first = self.store.page_after("place", 2)
+        self.assertEqual([p.id for p in first], ["0", "1"])
+
+        last = first[-1]
+        second = self.store.page_after("place", 2, (last.created_at, last.id))
+        self.assertEqual([p.id for p in second], ["2", "3"])
+
+        last = second[-1]
+        third = self.store.page_after("place", 2, (last.created_at, last.id))
+        self.assertEqual([p.id for p in third], ["4"])
+
+    def test_page_after_follows_changes(self):
+        start = datetime(2024, 1, 1)
+        places = [
+            Place(str(i), created_at=start + timedelta(days=i))
+            for i in range(4)
+        ]
+        for place in places:
+            self.store.add(place)
+
+        self.store.remove(places[1])
+        places[0].created_at = start + timedelta(days=10)
+        self.store.replace(places[0])
+
+        self.assertEqual(
+            [p.id for p in self.store.page_after("place", 10)], ["2", "3", "0"]
+        )
+
+    def test_replace_unknown(self):
+        self.assertFalse(self.store.replace(Place("1")))
+        self.assertEqual(self.store.all("place"), [])
+
+    def test_remove(self):
+        place = Place("1")
+        self.store.add(place)
+        self.assertTrue(self.store.remove(place))
+        self.assertFalse(self.store.remove(place))
+        self.assertEqual(self.store.count("place"), 0)
+
+    def test_primary_key_by_model(self):
+        country = Country("UY")
+        self.store.add(country)
+        self.assertIs(self.store.get("country", "UY"), country)
+
+
+    def test_lookup_by_index(self):
+        reviews = [Review(str(i), f"p{i % 2}", f"u{i % 3}") for i in range(6)]
+        for review in reviews:
+            self.store.add(review)
+
+        self.assertEqual(
+            [r.id for r in self.store.lookup("review", place_id="p0")],
+            ["0", "2", "4"],
+        )
+        self.assertEqual(
+            [r.id for r in self.store.lookup("review", user_id="u1")],
+            ["1", "4"],
+        )
+        self.assertEqual(
+            [r.id for r in self.store.lookup(
+                "review", place_id="p1", user_id="u0"
+            )],
+            ["3"],
+        )
+        self.assertEqual(self.store.lookup("review", place_id="p9"), [])
+
+    def test_lookup_without_index(self):
+        self.store.add(Review("1", "p", "u", rating=3))
+        self.store.add(Review("2", "p", "u", rating=4))
+        self.assertEqual(
+            [r.id for r in self.store.lookup("review", rating=4)], ["2"]
+        )
+
+    def test_lookup_by_primary_key(self):
+        self.store.add(Country("UY"))
+        self.assertEqual(len(self.store.lookup("country", code="UY")), 1)
+        self.assertEqual(self.store.lookup("country", code="AR"), [])
+
+    def test_index_follows_replace_and_remove(self):
+        review = Review("1", "p1", "u1")
+        self.store.add(review)
+
+        review.place_id = "p2"
+        self.store.replace(review)
+        self.assertEqual(self.store.lookup("review", place_id="p1"), [])
+        self.assertEqual(self.store.lookup("review", place_id="p2"), [review])
+
+        self.store.remove(review)
+        self.assertEqual(self.store.lookup("review", place_id="p2"), [])
+        self.assertEqual(self.store.lookup("review", user_id="u1"), [])
+
+    def test_compound_index(self):
+        link = PlaceAmenity("1", "p1", "a1")
+        self.store.add(link)
+        self.store.add(PlaceAmenity("2", "p1", "a2"))
+        self.assertEqual(
+            self.store.lookup("placeamenity", place_id="p1", amenity_id="a1"),
+            [link],
+        )
+        self.assertEqual(len(self.store.lookup("placeamenity", place_id="p1")), 2)
+
+    def test_unique_email_index_ignores_case(self):
+        user = User("u1", "Ada@Example.com")
+        self.store.add(user)
+        self.assertIs(
+            self.store.get_unique("user", "email", " ada@example.COM"), user
+        )
+        self.assertIsNone(self.store.get_unique("user", "email", "bob@x.io"))
+
+    def test_unique_index_follows_replace_and_remove(self):
+        user = User("u1", "ada@example.com")
+        self.store.add(user)
+        user.email = "lovelace@example.com"
+        self.store.replace(user)
+        self.assertIsNone(
+            self.store.get_unique("user", "email", "ada@example.com")
+        )
+        self.assertIs(
+            self.store.get_unique("user", "email", "Lovelace@example.com"),
+            user,
+        )
+
+        self.store.remove(user)
+        self.assertIsNone(
+            self.store.get_unique("user", "email", "lovelace@example.com")
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from src.persistence.text import TextIndex, tokenize
+
+
+class TestTextIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TextIndex()
+        self.index.add("1", "Cozy cabin by the lake")
+        self.index.add("2", "Modern apartment in the city center")
+        self.index.add("3", "Lake house, lake view, lake access")
+        self.index.add("4", "Café près du lac")
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Café, PRÈS du lac!"),
+                         ["cafe", "pres", "du", "lac"])
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize(""), [])
+
+    def test_scores_only_matching_documents(self):
+        self.assertEqual(set(self.index.scores("lake")), {"1", "3"})
+        self.assertEqual(self.index.scores("castle"), {})
+        self.assertEqual(self.index.scores(""), {})
+
+    def test_accents_match(self):
+        self.assertEqual(set(self.index.scores("cafe")), {"4"})
+        self.assertEqual(set(self.index.scores("PRES")), {"4"})
+
+    def test_search_ranks_by_bm25(self):
+        results = self.index.search("lake", limit=10)
+        self.assertEqual([doc_id for _, doc_id in results], ["3", "1"])
+        self.assertGreater(results[0][0], results[1][0])
+
+    def test_rare_terms_weigh_more(self):
+        self.index.add("5", "city lake")
+        scores = self.index.scores("city cabin")
+        self.assertGreater(scores["1"], scores["5"])
+
+    def test_search_limit(self):
+        self.assertEqual(len(self.index.search("lake the", limit=1)), 1)
+
+    def test_replace_and_remove(self):
+        self.index.add("1", "Castle on a hill")
+        self.assertEqual(set(self.index.scores("lake")), {"3"})
+        self.assertEqual(set(self.index.scores("castle")), {"1"})
+
+        self.assertTrue(self.index.remove("1"))
+        self.assertFalse(self.index.remove("1"))
+        self.assertEqual(self.index.scores("castle"), {})
+        self.assertEqual(len(self.index), 3)
+
+    def test_group_scores(self):
+        reviews = TextIndex()
+        reviews.add("a", "great lake view", group="p1")
+        reviews.add("b", "lake was cold", group="p1")
+        reviews.add("c", "noisy street", group="p2")
+
+        grouped = reviews.group_scores("lake")
+        self.assertEqual(set(grouped), {"p1"})
+        scores = reviews.scores("lake")
+        self.assertAlmostEqual(grouped["p1"], scores["a"] + scores["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
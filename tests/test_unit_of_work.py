@@ -0,0 +1,109 @@
+import unittest
+from flask import Flask, abort
+from sqlalchemy.exc import IntegrityError
+from src import db
+from src.config import TestingConfig
+from src.models.country import Country
+from src.persistence.db import DBRepository
+from src.persistence.unit_of_work import (
+    ReadOnlyRequestError,
+    after_commit,
+    init_unit_of_work,
+    transaction_metrics,
+)
+
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        init_unit_of_work(self.app)
+        self.repo = DBRepository()
+
+        @self.app.post("/countries")
+        def create_countries():
+            self.repo.save(Country("Chile", "CL"))
+            self.repo.save(Country("Peru", "PE"))
+            return "", 201
+
+        @self.app.post("/failing")
+        def failing():
+            self.repo.save(Country("Chile", "CL"))
+            abort(400)
+
+        self.committed = []
+
+        @self.app.post("/countries/<code>")
+        def create_country(code):
+            country = Country(code, code)
+            self.repo.save(country)
+            after_commit(self.committed.append, country.code)
+            if code == "XX":
+                abort(400)
+            return "", 201
+
+        @self.app.get("/countries")
+        def list_countries():
+            return {"count": self.repo.count("country")}
+
+        @self.app.get("/writing")
+        def writing():
+            self.repo.save(Country("Chile", "CL"))
+            return "", 200
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_writes_of_a_request_are_committed_once(self):
+        commits = transaction_metrics["commits"]
+        self.assertEqual(self.client.post("/countries").status_code, 201)
+        self.assertEqual(transaction_metrics["commits"], commits + 1)
+        self.assertEqual(self.client.get("/countries").json["count"], 2)
+
+    def test_failed_request_is_rolled_back(self):
+        self.assertEqual(self.client.post("/failing").status_code, 400)
+        self.assertEqual(self.client.get("/countries").json["count"], 0)
+
+    def test_read_only_requests(self):
+        commits = transaction_metrics["commits"]
+        self.assertEqual(self.client.get("/countries").json["count"], 0)
+        self.assertEqual(transaction_metrics["commits"], commits)
+
+        self.app.testing = False
+        self.assertEqual(self.client.get("/writing").status_code, 500)
+        self.app.testing = True
+        with self.assertRaises(ReadOnlyRequestError):
+            self.client.get("/writing")
+        self.assertEqual(self.client.get("/countries").json["count"], 0)
+
+    def test_after_commit_calls_wait_for_the_commit(self):
+        self.assertEqual(self.client.post("/countries/CL").status_code, 201)
+        self.assertEqual(self.committed, ["CL"])
+
+        self.assertEqual(self.client.post("/countries/XX").status_code, 400)
+        with self.assertRaises(IntegrityError):
+            # The commit fails on the duplicate primary key
+            self.client.post("/countries/CL")
+        self.assertEqual(self.committed, ["CL"])
+
+        after_commit(self.committed.append, "outside")
+        self.assertEqual(self.committed, ["CL", "outside"])
+
+    def test_writes_outside_of_requests_commit_right_away(self):
+        commits = transaction_metrics["commits"]
+        self.repo.save(Country("Chile", "CL"))
+        self.assertEqual(transaction_metrics["commits"], commits + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
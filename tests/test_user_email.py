@@ -0,0 +1,53 @@
+import unittest
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+from src import db
+from src.config import TestingConfig
+from src.models.user import User
+from src.persistence.db import DBRepository
+from src.persistence.store import normalize_email
+
+
+class TestUserEmail(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.from_object(TestingConfig)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+        db.init_app(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.repo = DBRepository()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_emails_are_stored_like_the_stores_compare_them(self):
+        for email in (" Ada@Example.COM ", "STRASSE@x.io", "straße@X.io"):
+            with self.subTest(email=email):
+                user = User(email, "Ada", "Lovelace", "secret")
+                self.assertEqual(user.email, normalize_email(email))
+
+    def test_email_must_be_a_string(self):
+        with self.assertRaises(ValueError):
+            User(None, "Ada", "Lovelace", "secret")
+
+    def test_database_finds_any_case(self):
+        user = User("Ada@Example.com", "Ada", "Lovelace", "secret")
+        self.repo.save(user)
+
+        self.assertEqual(self.repo.get_by_email(" ADA@example.COM").id, user.id)
+        self.assertIsNone(self.repo.get_by_email("bob@example.com"))
+
+    def test_emails_differing_by_case_are_one_account(self):
+        self.repo.save(User("ada@example.com", "Ada", "Lovelace", "secret"))
+        db.session.add(User("ADA@Example.com", "Ada", "Byron", "secret"))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,17 @@
 """ Export constants for the application """
 
 REPOSITORY_ENV_VAR = "REPOSITORY"
+COMPACT_RECORDS_ENV_VAR = "COMPACT_RECORDS"
+GROUP_COMMIT_ENV_VAR = "GROUP_COMMIT"
+FSYNC_ENV_VAR = "FSYNC"
+FLUSH_INTERVAL_MS_ENV_VAR = "FLUSH_INTERVAL_MS"
+FLUSH_EVERY_ENV_VAR = "FLUSH_EVERY"
 
-FILE_STORAGE_FILENAME = "data.json"
+FILE_STORAGE_FILENAME = "data.jsonl"
+# Single JSON document written by the file storage before JSON Lines
+LEGACY_FILE_STORAGE_FILENAME = "data.json"
+# The log of the file storage is compacted into a new snapshot once it
+# holds FILE_COMPACT_MIN_BYTES and FILE_COMPACT_RATIO times the snapshot
+FILE_COMPACT_MIN_BYTES = 1 << 20
+FILE_COMPACT_RATIO = 1.0
 PICKLE_STORAGE_FILENAME = "data.pkl"
@@ -0,0 +1,25 @@
+""" Convert the JSON document of the file storage to JSON Lines
+
+Usage: python -m utils.convert_storage [data.json [data.jsonl]]
+"""
+
+import sys
+
+from src.persistence.file import convert_json_file
+from utils.constants import (
+    FILE_STORAGE_FILENAME,
+    LEGACY_FILE_STORAGE_FILENAME,
+)
+
+
+def main(
+    source: str = LEGACY_FILE_STORAGE_FILENAME,
+    target: str = FILE_STORAGE_FILENAME,
+) -> None:
+    """Convert source to target and print the number of objects"""
+    count = convert_json_file(source, target)
+    print(f"{count} objects converted from {source} to {target}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])